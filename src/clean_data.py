@@ -11,8 +11,14 @@ if SRC_DIR not in sys.path:
 
 
 from utils.logger import logger
-from tasks.extract_mssql import fetch_table_data
-from tasks.load_csv import load_all_csv
+from data_pipeline import enable_copy_on_write
+from tasks.extract_mssql import fetch_table_data, iter_table_chunks
+from tasks.load_csv import load_all_csv, iter_csv_chunks
+from utils.sampling import is_sampling_enabled, sample_order_items, sampled_path
+from config.settings import (
+    SAMPLE_RATE, SAMPLE_SEED, CLEAN_CHUNK_SIZE, CLEAN_STATS_MODE, CLEAN_SKETCH_K,
+    CLEAN_INCREMENTAL, CLEAN_STATS_REFRESH_DAYS
+)
 
 
 from data_pipeline.data_cleaning.clean_orders import clean_orders
@@ -22,36 +28,56 @@ from data_pipeline.data_cleaning.clean_marketing import clean_marketing_data
 from data_pipeline.data_cleaning.clean_products_data import clean_products_data
 from data_pipeline.data_cleaning.clean_weather import clean_weather_data
 from data_pipeline.data_cleaning.clean_inventory import clean_inventory_data
+from data_pipeline.data_cleaning.chunked_cleaning import run_chunked_cleaning
+from data_pipeline.data_cleaning.incremental_cleaning import run_incremental_cleaning, reset_incremental_state
+from data_pipeline.data_cleaning.cleaning_metrics import start_metrics_run, finish_metrics_run, record_stage
 
 
 def save_cleaned_data(df: pd.DataFrame, filename: str):
-    save_path = os.path.join(PROJECT_ROOT, "data", "processed", filename)
+    save_path = sampled_path(os.path.join(PROJECT_ROOT, "data", "processed", filename))
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
     df.to_csv(save_path, index=False)
+    # a full rewrite supersedes earlier incremental partitions and their key index
+    reset_incremental_state(save_path)
     print(f" Saved cleaned file: {filename}")
     return save_path
 
 
-# Load all CSV files once
-csv_files = load_all_csv()
+# Raw CSV fallback, loaded on first use so importing this module stays cheap
+_csv_files = None
+
+
+def get_csv_files() -> dict:
+    global _csv_files
+    if _csv_files is None:
+        _csv_files = load_all_csv()
+    return _csv_files
+
+
+CLEANING_TASKS = [
+    ("blinkit_orders", clean_orders, "blinkit_orders_clean.csv"),
+    ("blinkit_order_items", clean_order_items, "blinkit_order_items_clean.csv"),
+    ("blinkit_customers", clean_customers, "blinkit_customers_clean.csv"),
+    ("blinkit_marketing_performance", clean_marketing_data, "blinkit_marketing_clean.csv"),
+    ("blinkit_products", clean_products_data, "blinkit_products_clean.csv"),
+    ("blinkit_weather_data", clean_weather_data, "blinkit_weather_clean.csv"),
+    ("blinkit_inventory", clean_inventory_data, "blinkit_inventory_clean.csv"),
+]
 
 
 def run_cleaning_pipeline():
     print("\n Starting Full Data Cleaning Pipeline...\n")
     start_time = datetime.now()
+    start_metrics_run("full")
+    if is_sampling_enabled():
+        logger.info(f"Sampling {SAMPLE_RATE:.2%} of store-product series (seed={SAMPLE_SEED})")
+    raw_orders = None
 
-    tasks = [
-        ("blinkit_orders", clean_orders, "blinkit_orders_clean.csv"),
-        ("blinkit_order_items", clean_order_items, "blinkit_order_items_clean.csv"),
-        ("blinkit_customers", clean_customers, "blinkit_customers_clean.csv"),
-        ("blinkit_marketing_performance", clean_marketing_data, "blinkit_marketing_clean.csv"),
-        ("blinkit_products", clean_products_data, "blinkit_products_clean.csv"),
-        ("blinkit_weather_data", clean_weather_data, "blinkit_weather_clean.csv"),
-        ("blinkit_inventory", clean_inventory_data, "blinkit_inventory_clean.csv"),
-    ]
+    tasks = CLEANING_TASKS
 
     for table_name, cleaner_func, output_file in tasks:
         print(f"Fetching & Cleaning: {table_name} ...")
+        fetch_start = datetime.now()
         df = None
 
         # Try database
@@ -63,7 +89,7 @@ def run_cleaning_pipeline():
         # CSV fallback if DB fails or empty
         if df is None or df.empty:
             csv_name = table_name.replace("_performance", "")  # Marketing mapping fix
-            df = csv_files.get(csv_name)
+            df = get_csv_files().get(csv_name)
 
             if df is not None:
                 print(f" Fallback: Loaded {csv_name}.csv from local data folder")
@@ -72,11 +98,31 @@ def run_cleaning_pipeline():
                 logger.warning(f"{table_name}: No DB or CSV data available. Skipped.")
                 print("-" * 60)
                 continue
+        record_stage(table_name, "fetch", (datetime.now() - fetch_start).total_seconds(), rows_out=len(df))
+
+        # Sample order items by (store_id, product_id) series before cleaning.
+        # Orders are cleaned in full so their IQR limits match a full run.
+        if table_name == "blinkit_orders":
+            raw_orders = df
+        elif table_name == "blinkit_order_items" and is_sampling_enabled() and raw_orders is not None:
+            before = len(df)
+            df = sample_order_items(df, raw_orders)
+            logger.info(f"{table_name}: sampled {len(df)} of {before} rows")
 
         # Clean + Save output
         try:
+            table_start = datetime.now()
             df_clean = cleaner_func(df)
+            clean_secs = (datetime.now() - table_start).total_seconds()
+            record_stage(table_name, "clean", clean_secs, rows_in=len(df), rows_out=len(df_clean))
+            logger.info(
+                f"Cleaned {table_name}",
+                extra={"stage": "clean", "table": table_name, "rows": len(df_clean),
+                       "duration": round(clean_secs, 3)},
+            )
+            save_start = datetime.now()
             save_cleaned_data(df_clean, output_file)
+            record_stage(table_name, "save", (datetime.now() - save_start).total_seconds(), rows_out=len(df_clean))
             print(f" Completed: {table_name}")
         except Exception as e:
             logger.error(f"Cleaning failed for {table_name}: {e}")
@@ -84,10 +130,145 @@ def run_cleaning_pipeline():
 
         print("-" * 60)
 
+    finish_metrics_run()
     duration = (datetime.now() - start_time).total_seconds()
     print(f"\n Pipeline Finished in {duration:.2f} sec")
     print(" Full logs saved to logs/pipeline.log\n")
 
 
+def _chunk_source(table_name, chunksize):
+    """
+    Return a factory of chunk iterators from the DB, else the raw CSV, else None.
+    chunksize <= 0 yields the whole table as a single chunk.
+    """
+    if chunksize <= 0:
+        df = None
+        try:
+            df = fetch_table_data(table_name)
+        except Exception as e:
+            logger.error(f"DB fetch failed for {table_name}: {e}")
+        if df is None or df.empty:
+            df = get_csv_files().get(table_name.replace("_performance", ""))  # Marketing mapping fix
+        return (lambda: iter([df])) if df is not None else None
+
+    try:
+        probe = iter_table_chunks(table_name, chunksize)
+        has_rows = next(probe, None) is not None
+        probe.close()
+        if has_rows:
+            return lambda: iter_table_chunks(table_name, chunksize)
+    except Exception as e:
+        logger.error(f"DB chunked fetch failed for {table_name}: {e}")
+
+    csv_name = table_name.replace("_performance", "")  # Marketing mapping fix
+    csv_path = os.path.join(PROJECT_ROOT, "data", "raw_data", f"{csv_name}.csv")
+    if os.path.exists(csv_path):
+        print(f" Fallback: Streaming {csv_name}.csv from local data folder")
+        return lambda: iter_csv_chunks(csv_path, chunksize)
+    return None
+
+
+def run_chunked_cleaning_pipeline(chunksize=CLEAN_CHUNK_SIZE, mode=CLEAN_STATS_MODE, k=CLEAN_SKETCH_K):
+    """
+    Clean every table chunk by chunk: table-wide statistics come from a first
+    pass (exact, or KLL sketches in "approx" mode), fills and filters from a second.
+    """
+    print(f"\n Starting Chunked Data Cleaning Pipeline ({chunksize} rows/chunk, {mode} stats)...\n")
+    start_time = datetime.now()
+    start_metrics_run("chunked")
+    store_by_order = None
+
+    for table_name, cleaner_func, output_file in CLEANING_TASKS:
+        print(f"Streaming & Cleaning: {table_name} ...")
+        make_chunks = _chunk_source(table_name, chunksize)
+        if make_chunks is None:
+            print(f" Skipping {table_name} — No DB or CSV data found")
+            logger.warning(f"{table_name}: No DB or CSV data available. Skipped.")
+            print("-" * 60)
+            continue
+
+        transform = None
+        if table_name == "blinkit_orders" and is_sampling_enabled():
+            store_by_order = pd.concat(
+                chunk[["order_id", "store_id"]] for chunk in make_chunks()
+            )
+        elif table_name == "blinkit_order_items" and store_by_order is not None:
+            transform = lambda chunk: sample_order_items(chunk, store_by_order)
+
+        try:
+            output_path = sampled_path(os.path.join(PROJECT_ROOT, "data", "processed", output_file))
+            run_chunked_cleaning(
+                table_name, cleaner_func, make_chunks, output_path,
+                mode=mode, k=k, transform=transform,
+            )
+            # a full rewrite supersedes earlier incremental partitions and their key index
+            reset_incremental_state(output_path)
+            print(f" Completed: {table_name}")
+        except Exception as e:
+            logger.error(f"Chunked cleaning failed for {table_name}: {e}")
+            print(f" ERROR cleaning {table_name}")
+
+        print("-" * 60)
+
+    finish_metrics_run()
+    duration = (datetime.now() - start_time).total_seconds()
+    print(f"\n Pipeline Finished in {duration:.2f} sec")
+
+
+def run_incremental_cleaning_pipeline(chunksize=CLEAN_CHUNK_SIZE, refresh_days=CLEAN_STATS_REFRESH_DAYS):
+    """
+    Clean only rows not seen by earlier runs, appending them as new partitions
+    of the processed outputs; see run_incremental_cleaning.
+    """
+    print("\n Starting Incremental Data Cleaning Pipeline...\n")
+    start_time = datetime.now()
+    start_metrics_run("incremental")
+    store_by_order = None
+
+    for table_name, cleaner_func, output_file in CLEANING_TASKS:
+        print(f"Fetching & Cleaning new rows: {table_name} ...")
+        make_chunks = _chunk_source(table_name, chunksize)
+        if make_chunks is None:
+            print(f" Skipping {table_name} — No DB or CSV data found")
+            logger.warning(f"{table_name}: No DB or CSV data available. Skipped.")
+            print("-" * 60)
+            continue
+
+        transform = None
+        if table_name == "blinkit_orders" and is_sampling_enabled():
+            store_by_order = pd.concat(
+                chunk[["order_id", "store_id"]] for chunk in make_chunks()
+            )
+        elif table_name == "blinkit_order_items" and store_by_order is not None:
+            transform = lambda chunk: sample_order_items(chunk, store_by_order)
+
+        try:
+            output_path = sampled_path(os.path.join(PROJECT_ROOT, "data", "processed", output_file))
+            run_incremental_cleaning(
+                table_name, cleaner_func, make_chunks, output_path,
+                refresh_days=refresh_days, transform=transform,
+            )
+            print(f" Completed: {table_name}")
+        except Exception as e:
+            logger.error(f"Incremental cleaning failed for {table_name}: {e}")
+            print(f" ERROR cleaning {table_name}")
+
+        print("-" * 60)
+
+    finish_metrics_run()
+    duration = (datetime.now() - start_time).total_seconds()
+    print(f"\n Pipeline Finished in {duration:.2f} sec")
+
+
+def main():
+    enable_copy_on_write()
+    if CLEAN_INCREMENTAL:
+        run_incremental_cleaning_pipeline()
+    elif CLEAN_CHUNK_SIZE > 0:
+        run_chunked_cleaning_pipeline()
+    else:
+        run_cleaning_pipeline()
+
+
 if __name__ == "__main__":
-    run_cleaning_pipeline()
+    main()
@@ -1,5 +1,4 @@
 # config/db_config.py
-import pyodbc
 from config.settings import DB_DRIVER, DB_SERVER, DB_NAME
 
 def get_mssql_connection():
@@ -11,6 +10,7 @@ def get_mssql_connection():
         f"Trusted_Connection=yes;"
     )
     try:
+        import pyodbc  # driver loads on first connection
         conn = pyodbc.connect(conn_str)
         return conn
     except Exception as e:
@@ -1,23 +1,181 @@
 # config/settings.py
 import os
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+
+def _find_env_file():
+    """Nearest .env from this directory upwards, as python-dotenv's find_dotenv looks it up."""
+    current = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(current, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+# Load environment variables from .env file; python-dotenv is only imported
+# when there is one, so processes configured through the environment skip it
+_env_file = _find_env_file()
+if _env_file is not None:
+    from dotenv import load_dotenv
+    load_dotenv(_env_file)
+
+# Project root: the data, cache and model artifact paths below default to
+# locations under it rather than under the working directory
+PROJECT_ROOT = os.getenv("PROJECT_ROOT", "D:/demand_forecasting_system")
+ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", os.path.join(PROJECT_ROOT, "artifacts"))
 
 # Logging
 LOG_PATH = os.getenv("LOG_PATH", "logs")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# "json" (one structured record per line) or "text" for the log file
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Per-module overrides, keyed by module file name:
+# LOG_MODULE_LEVELS="weather_enrichment=WARNING,clean_orders=DEBUG"
+# LOG_SAMPLE_RATES="geocode_enrichment=0.1" keeps 1 in 10 records below WARNING
+LOG_MODULE_LEVELS = os.getenv("LOG_MODULE_LEVELS", "")
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+# Series sampling for dev/CI runs: keep SAMPLE_RATE of (store_id, product_id) series
+SAMPLE_RATE = float(os.getenv("SAMPLE_RATE", 1.0))
+SAMPLE_SEED = int(os.getenv("SAMPLE_SEED", 0))
+
+# Import-time budget per entry point, checked by utils/import_time.py
+IMPORT_TIME_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", 800))
 
 # Database
 DB_DRIVER = os.getenv("DB_DRIVER")
 DB_SERVER = os.getenv("DB_SERVER")
 DB_NAME = os.getenv("DB_NAME")
+# Days per window when fetching pushed-down daily aggregates
+PUSHDOWN_WINDOW_DAYS = int(os.getenv("PUSHDOWN_WINDOW_DAYS", 31))
+
+# Chunked cleaning: rows per chunk (0 = clean whole tables in memory),
+# "exact" or "approx" (KLL sketch) quantiles, and sketch size k
+CLEAN_CHUNK_SIZE = int(os.getenv("CLEAN_CHUNK_SIZE", 0))
+CLEAN_STATS_MODE = os.getenv("CLEAN_STATS_MODE", "exact")
+CLEAN_SKETCH_K = int(os.getenv("CLEAN_SKETCH_K", 200))
+
+# Incremental cleaning: clean only rows whose keys are not yet in the persisted
+# index, reusing frozen table statistics until they are older than the refresh age
+CLEAN_INCREMENTAL = os.getenv("CLEAN_INCREMENTAL", "false").lower() == "true"
+CLEAN_STATS_REFRESH_DAYS = int(os.getenv("CLEAN_STATS_REFRESH_DAYS", 7))
+# Per-run cleaning metrics (audit counts, stage timings), one Parquet file per run
+CLEAN_METRICS_PATH = os.getenv("CLEAN_METRICS_PATH", os.path.join(PROJECT_ROOT, "data", "metrics", "cleaning_metrics"))
+
+# Schema validation: "full" or "fast" (value checks on a sample of
+# SCHEMA_SAMPLE_ROWS rows), and examples kept per violation
+SCHEMA_VALIDATION_MODE = os.getenv("SCHEMA_VALIDATION_MODE", "full")
+SCHEMA_SAMPLE_ROWS = int(os.getenv("SCHEMA_SAMPLE_ROWS", 100000))
+SCHEMA_MAX_EXAMPLES = int(os.getenv("SCHEMA_MAX_EXAMPLES", 5))
+# Parallel validation of the Parquet final dataset (0 = one worker per CPU)
+# and the rows per Parquet row group it is written with
+VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", 0))
+FINAL_ROW_GROUP_ROWS = int(os.getenv("FINAL_ROW_GROUP_ROWS", 1_000_000))
+
+# Feature generator processes (0 = one per generator up to the CPU count, 1 = in-process)
+FEATURE_WORKERS = int(os.getenv("FEATURE_WORKERS", 0))
+
+# Training: XGBoost native categorical features with hist, and the cache of
+# encoded training data keyed by dataset hash
+TRAIN_NATIVE_CATEGORICAL = os.getenv("TRAIN_NATIVE_CATEGORICAL", "true").lower() == "true"
+TRAIN_CACHE_DIR = os.getenv("TRAIN_CACHE_DIR", os.path.join(PROJECT_ROOT, "data", "cache", "training"))
+TRAIN_MAX_BIN = int(os.getenv("TRAIN_MAX_BIN", 256))
+# ID columns with more distinct values than this stay numeric
+TRAIN_MAX_CATEGORIES = int(os.getenv("TRAIN_MAX_CATEGORIES", 1024))
+# External-memory training: stream the Parquet final dataset row group by
+# row group and let XGBoost page the training matrix to this directory
+TRAIN_EXTERNAL_MEMORY = os.getenv("TRAIN_EXTERNAL_MEMORY", "false").lower() == "true"
+TRAIN_EXTERNAL_CACHE_DIR = os.getenv("TRAIN_EXTERNAL_CACHE_DIR", os.path.join(PROJECT_ROOT, "data", "cache", "xgb_external"))
+
+# Rolling-origin backtest: folds of BACKTEST_HORIZON_DAYS cut on order_date,
+# "expanding" or "sliding" (BACKTEST_WINDOW_DAYS of history) training windows,
+# fold processes (0 = one per fold up to the CPU count)
+BACKTEST_FOLDS = int(os.getenv("BACKTEST_FOLDS", 6))
+BACKTEST_HORIZON_DAYS = int(os.getenv("BACKTEST_HORIZON_DAYS", 30))
+BACKTEST_WINDOW = os.getenv("BACKTEST_WINDOW", "expanding")
+BACKTEST_WINDOW_DAYS = int(os.getenv("BACKTEST_WINDOW_DAYS", 365))
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", 0))
+
+# Hyperparameter search over the backtest folds: trial processes (0 = one per
+# CPU), XGBoost threads per trial (0 = CPU count split between workers),
+# early stopping, and pruning of trials worse than the median after the first
+# TUNE_PRUNE_AFTER_FOLDS folds (once TUNE_PRUNE_MIN_TRIALS trials finished)
+TUNE_TRIALS = int(os.getenv("TUNE_TRIALS", 100))
+TUNE_WORKERS = int(os.getenv("TUNE_WORKERS", 0))
+TUNE_THREADS_PER_TRIAL = int(os.getenv("TUNE_THREADS_PER_TRIAL", 0))
+TUNE_MAX_ROUNDS = int(os.getenv("TUNE_MAX_ROUNDS", 1000))
+TUNE_EARLY_STOPPING_ROUNDS = int(os.getenv("TUNE_EARLY_STOPPING_ROUNDS", 30))
+# days at the end of each fold's training window held out for early stopping
+TUNE_VALIDATION_DAYS = int(os.getenv("TUNE_VALIDATION_DAYS", 30))
+TUNE_PRUNE_AFTER_FOLDS = int(os.getenv("TUNE_PRUNE_AFTER_FOLDS", 2))
+TUNE_PRUNE_MIN_TRIALS = int(os.getenv("TUNE_PRUNE_MIN_TRIALS", 5))
+TUNE_SEED = int(os.getenv("TUNE_SEED", 42))
+TUNE_BEST_PARAMS_PATH = os.getenv("TUNE_BEST_PARAMS_PATH", os.path.join(ARTIFACTS_DIR, "best_params.json"))
+# Train with the tuned parameters from TUNE_BEST_PARAMS_PATH when it exists
+TRAIN_USE_TUNED_PARAMS = os.getenv("TRAIN_USE_TUNED_PARAMS", "false").lower() == "true"
+
+# Current model (Booster saved by native training and daily updates)
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join(ARTIFACTS_DIR, "model.json"))
+# Daily updates: continue the current model for UPDATE_ROUNDS rounds on the
+# days added since it was last trained, up to UPDATE_MAX_ROUNDS in total. Every
+# UPDATE_CHECK_EVERY_DAYS a backtest on the newest UPDATE_HOLDOUT_DAYS compares
+# warm-starting on the UPDATE_WINDOW_DAYS before them with a full retrain;
+# beyond UPDATE_MAX_DEGRADATION (relative RMSE) the update becomes a full retrain.
+# Updates need native categorical (or external-memory) training's Booster
+UPDATE_WINDOW_DAYS = int(os.getenv("UPDATE_WINDOW_DAYS", 7))
+UPDATE_ROUNDS = int(os.getenv("UPDATE_ROUNDS", 20))
+UPDATE_MAX_ROUNDS = int(os.getenv("UPDATE_MAX_ROUNDS", 600))
+UPDATE_CHECK_EVERY_DAYS = int(os.getenv("UPDATE_CHECK_EVERY_DAYS", 7))
+UPDATE_HOLDOUT_DAYS = int(os.getenv("UPDATE_HOLDOUT_DAYS", 7))
+UPDATE_MAX_DEGRADATION = float(os.getenv("UPDATE_MAX_DEGRADATION", 0.05))
+
+# Sharded training: one model per SHARD_KEY value ("category" from the products
+# table, "store_cluster" = store_id bucket, or a final-dataset column); shards
+# with fewer than SHARD_MIN_ROWS training rows are served by the global model
+SHARD_KEY = os.getenv("SHARD_KEY", "category")
+SHARD_STORE_CLUSTERS = int(os.getenv("SHARD_STORE_CLUSTERS", 8))
+SHARD_PRODUCTS_PATH = os.getenv(
+    "SHARD_PRODUCTS_PATH", os.path.join(PROJECT_ROOT, "data", "processed", "blinkit_products_clean.csv")
+)
+SHARD_MIN_ROWS = int(os.getenv("SHARD_MIN_ROWS", 500))
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", 0))
+SHARD_BUNDLE_DIR = os.getenv("SHARD_BUNDLE_DIR", os.path.join(ARTIFACTS_DIR, "shards"))
+
+# Direct multi-horizon forecasting: days ahead per model, training processes
+# (0 = one per horizon up to the CPU count) and where the models are saved
+FORECAST_HORIZONS = [int(h) for h in os.getenv("FORECAST_HORIZONS", "1,7,14,30").split(",")]
+HORIZON_WORKERS = int(os.getenv("HORIZON_WORKERS", 0))
+HORIZON_MODEL_DIR = os.getenv("HORIZON_MODEL_DIR", os.path.join(ARTIFACTS_DIR, "horizons"))
+# Recursive forecast: days ahead, one batched predict per day
+RECURSIVE_STEPS = int(os.getenv("RECURSIVE_STEPS", 30))
+
+# Label-encoded model: category -> code tables (JSON) and the code given to
+# categories not seen in training
+ENCODER_PATH = os.getenv("ENCODER_PATH", os.path.join(ARTIFACTS_DIR, "label_encoders.json"))
+ENCODER_UNSEEN_CODE = int(os.getenv("ENCODER_UNSEEN_CODE", -1))
+
+# Model data: the final dataset, forecast outputs, and the prepared float32
+# feature matrix (memory-mapped by train, evaluate and forecast)
+FINAL_DATA_PATH = os.getenv("FINAL_DATA_PATH", os.path.join(PROJECT_ROOT, "data", "final_data", "final_store_product.csv"))
+FORECAST_DIR = os.getenv("FORECAST_DIR", os.path.join(PROJECT_ROOT, "data", "forecasts"))
+FEATURE_MATRIX_DIR = os.getenv("FEATURE_MATRIX_DIR", os.path.join(PROJECT_ROOT, "data", "cache", "feature_matrix"))
 
 # Redis
 REDIS_HOST = os.getenv("REDIS_HOST")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 REDIS_KEY = os.getenv("REDIS_KEY")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 10))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2))
+
+# Set cache used for area/weather membership checks ("redis", "sqlite" or "memory").
+# Redis falls back to SQLite when the server is unreachable.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis")
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", os.path.join(PROJECT_ROOT, "data", "cache", "set_cache.sqlite"))
+CACHE_BATCH_SIZE = int(os.getenv("CACHE_BATCH_SIZE", 10000))
 
 # Geocode API
 GEOCODE_URL = os.getenv("GEOCODE_URL")
@@ -27,3 +185,8 @@ USER_AGENT = os.getenv("USER_AGENT")
 WEATHER_URL = os.getenv("WEATHER_API_URL", "https://api.open-meteo.com/v1/forecast")
 USER_AGENT = os.getenv("USER_AGENT", "DevdipDemandForecasting/1.0 (devdipmallick22@gmail.com)")
 
+# HTTP response cache for enrichment APIs (TTL in seconds, 0 = never expires)
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", os.path.join(PROJECT_ROOT, "data", "cache", "http_cache.sqlite"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", 0))
+WEATHER_FORECAST_CACHE_TTL = int(os.getenv("WEATHER_FORECAST_CACHE_TTL", 6 * 3600))
@@ -0,0 +1,14 @@
+import pandas as pd
+
+
+def enable_copy_on_write() -> None:
+    """
+    Turn on pandas Copy-on-Write for this process. Cleaning and feature
+    functions reassign instead of modifying frames in place, so they leave
+    the caller's frames untouched either way; with Copy-on-Write their
+    column selections share memory instead of copying it.
+    Entry points call this from main() (and process pool workers on start);
+    it is always on from pandas 3, where the option is deprecated.
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
@@ -0,0 +1,159 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+from data_pipeline.data_cleaning.cleaning_metrics import record_stage
+from utils.streaming_stats import StatsCollector
+from data_pipeline.data_cleaning.clean_orders import ORDERS_STATS, collect_orders_stats
+from data_pipeline.data_cleaning.clean_customer_data import CUSTOMERS_STATS, collect_customers_stats
+from data_pipeline.data_cleaning.clean_weather import WEATHER_STATS, collect_weather_stats
+from data_pipeline.data_cleaning.clean_inventory import INVENTORY_STATS, collect_inventory_stats
+
+# Keys each cleaner deduplicates on; chunked runs dedup across chunks too
+DEDUP_KEYS = {
+    "blinkit_orders": ["order_id"],
+    "blinkit_order_items": ["order_id", "product_id"],
+    "blinkit_customers": ["customer_id"],
+    "blinkit_marketing_performance": ["campaign_id", "date"],
+    "blinkit_products": ["product_id"],
+    "blinkit_weather_data": ["area", "date"],
+    "blinkit_inventory": ["product_id", "date"],
+}
+
+# Cleaners with table-wide statistics: (stats spec, collect function,
+# whether the cleaner deduplicates before computing its statistics)
+STATS_PASS = {
+    "blinkit_orders": (ORDERS_STATS, collect_orders_stats, True),
+    "blinkit_customers": (CUSTOMERS_STATS, collect_customers_stats, False),
+    "blinkit_weather_data": (WEATHER_STATS, collect_weather_stats, True),
+    "blinkit_inventory": (INVENTORY_STATS, collect_inventory_stats, True),
+}
+
+
+def hash_keys(df: pd.DataFrame, keys: list) -> np.ndarray:
+    """64-bit hash per row of the key columns, stable across chunk dtypes."""
+    normalized = pd.DataFrame({
+        col: df[col].astype("float64") if pd.api.types.is_numeric_dtype(df[col]) else df[col].astype(str)
+        for col in keys
+    })
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+class SeenKeys:
+    """
+    Key hashes already emitted by earlier chunks, kept as sorted runs of
+    decreasing size. A new run is merged into the runs before it only once it
+    has grown to their size (as in an LSM tree), so each hash is re-sorted
+    O(log n) times in total instead of once per chunk.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    @property
+    def hashes(self) -> np.ndarray:
+        """All hashes as one sorted array (the runs are compacted into it)."""
+        if len(self.runs) > 1:
+            self.runs = [np.sort(np.concatenate(self.runs))]
+        return self.runs[0] if self.runs else np.empty(0, dtype=np.uint64)
+
+    @hashes.setter
+    def hashes(self, hashes: np.ndarray) -> None:
+        self.runs = [hashes] if hashes.size else []
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        seen = np.zeros(hashes.size, dtype=bool)
+        for run in self.runs:
+            idx = np.searchsorted(run, hashes).clip(max=run.size - 1)
+            seen |= run[idx] == hashes
+        return seen
+
+    def add(self, hashes: np.ndarray) -> None:
+        """Add hashes not seen yet (runs stay disjoint, so merging is a plain sort)."""
+        run = np.unique(hashes)
+        if not run.size:
+            return
+        while self.runs and self.runs[-1].size <= run.size:
+            run = np.sort(np.concatenate([self.runs.pop(), run]))
+        self.runs.append(run)
+
+    def drop_seen(self, chunk: pd.DataFrame, keys: list) -> pd.DataFrame:
+        hashes = hash_keys(chunk, keys)
+        seen = self.contains(hashes)
+        self.add(hashes[~seen])
+        return chunk[~seen]
+
+
+def collect_table_stats(table_name, make_chunks, mode="exact", k=200, transform=None):
+    """
+    Accumulate a table's cleaning statistics over all chunks of make_chunks().
+    Returns None for tables whose cleaner needs no table-wide statistics.
+    """
+    stats_pass = STATS_PASS.get(table_name)
+    if stats_pass is None:
+        return None
+
+    spec, collect, dedup_first = stats_pass
+    collector = StatsCollector(spec, mode=mode, k=k)
+    seen = SeenKeys()
+    for chunk in make_chunks():
+        if transform is not None:
+            chunk = transform(chunk)
+        if dedup_first:
+            chunk = seen.drop_seen(chunk, DEDUP_KEYS[table_name])
+        if not chunk.empty:
+            collect(chunk, collector)
+    stats = collector.result()
+    logger.info(f"{table_name}: {mode} stats over all chunks: {stats}")
+    return stats
+
+
+def run_chunked_cleaning(table_name, cleaner, make_chunks, output_path, mode="exact", k=200, transform=None):
+    """
+    Clean a table chunk by chunk in two passes, keeping memory bounded by the
+    chunk size (plus the quantile columns in "exact" mode).
+
+    Pass one accumulates the cleaner's table-wide statistics (quantiles, means)
+    across chunks; pass two cleans each chunk with those statistics and appends
+    it to output_path. make_chunks() must return a fresh chunk iterator per call.
+    """
+    keys = DEDUP_KEYS[table_name]
+    start = time.perf_counter()
+    stats = collect_table_stats(table_name, make_chunks, mode=mode, k=k, transform=transform)
+    if stats is not None:
+        record_stage(table_name, "stats", time.perf_counter() - start)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    seen = SeenKeys()
+    rows_in = rows_out = cross_chunk_duplicates = 0
+    clean_secs = save_secs = 0.0
+    first = True
+    for chunk in make_chunks():
+        if transform is not None:
+            chunk = transform(chunk)
+        rows_in += len(chunk)
+        before = len(chunk)
+        chunk = seen.drop_seen(chunk, keys)
+        cross_chunk_duplicates += before - len(chunk)
+        if chunk.empty:
+            continue
+
+        start = time.perf_counter()
+        cleaned = cleaner(chunk, stats=stats) if stats is not None else cleaner(chunk)
+        clean_secs += time.perf_counter() - start
+        start = time.perf_counter()
+        cleaned.to_csv(output_path, mode="w" if first else "a", header=first, index=False)
+        save_secs += time.perf_counter() - start
+        first = False
+        rows_out += len(cleaned)
+
+    record_stage(table_name, "clean", clean_secs, rows_in=rows_in - cross_chunk_duplicates, rows_out=rows_out)
+    record_stage(table_name, "save", save_secs, rows_out=rows_out)
+
+    logger.info(
+        f"{table_name}: chunked cleaning wrote {rows_out} of {rows_in} rows "
+        f"({cross_chunk_duplicates} cross-chunk duplicates) to {output_path}"
+    )
+    return output_path
@@ -1,21 +1,18 @@
-import os
-import logging
 import pandas as pd
+from utils.streaming_stats import compute_stats
+from data_pipeline.data_cleaning.typed_ingest import parse_schema_dates, cast_schema_dtypes
+from data_pipeline.data_cleaning.cleaning_metrics import report_cleaning
 
-# Log Directory Setup
-LOG_DIR = r"D:\demand_forecasting_system\logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 
-logging.basicConfig(
-    filename=os.path.join(LOG_DIR, "pipeline.log"),
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Global statistics clean_customers depends on (median fills)
+CUSTOMERS_STATS = {
+    "total_orders_median": ("quantile", "total_orders", 0.5),
+    "avg_order_value_median": ("quantile", "avg_order_value", 0.5),
+}
 
 
-def clean_customers(df_customers: pd.DataFrame) -> pd.DataFrame:
-    df = df_customers.copy()
-    logs = {}
+def _prepare_customers(df_customers: pd.DataFrame, logs: dict) -> pd.DataFrame:
+    df = df_customers
 
     logs["initial_rows"] = len(df)
 
@@ -25,7 +22,18 @@ def clean_customers(df_customers: pd.DataFrame) -> pd.DataFrame:
         "registration_date", "customer_segment",
         "total_orders", "avg_order_value"
     ]
-    df = df[keep_cols].copy()
+    df = df.loc[:, keep_cols]
+    return df
+
+
+def collect_customers_stats(df_customers: pd.DataFrame, collector) -> None:
+    """Feed one chunk into a StatsCollector built from CUSTOMERS_STATS."""
+    collector.update(_prepare_customers(df_customers, {}))
+
+
+def clean_customers(df_customers: pd.DataFrame, stats: dict = None) -> pd.DataFrame:
+    logs = {}
+    df = _prepare_customers(df_customers, logs)
 
     # Missing values before cleaning
     logs["missing_before"] = df.isnull().sum().to_dict()
@@ -35,11 +43,14 @@ def clean_customers(df_customers: pd.DataFrame) -> pd.DataFrame:
     df["customer_segment"] = df["customer_segment"].fillna("Regular")
 
     # Fill missing numeric fields
-    df["total_orders"] = df["total_orders"].fillna(df["total_orders"].median())
-    df["avg_order_value"] = df["avg_order_value"].fillna(df["avg_order_value"].median())
+    # Chunked runs pass stats accumulated over the whole table
+    if stats is None:
+        stats = compute_stats(df, CUSTOMERS_STATS)
+    df["total_orders"] = df["total_orders"].fillna(stats["total_orders_median"])
+    df["avg_order_value"] = df["avg_order_value"].fillna(stats["avg_order_value_median"])
 
     # Convert dates
-    df["registration_date"] = pd.to_datetime(df["registration_date"], errors="coerce")
+    df = parse_schema_dates(df, "customers")
 
     # Fix data types
     df = df.astype({
@@ -50,15 +61,15 @@ def clean_customers(df_customers: pd.DataFrame) -> pd.DataFrame:
     })
 
     before = len(df)
-    df.drop_duplicates(subset="customer_id", inplace=True)
+    df = df.drop_duplicates(subset="customer_id")
     logs["duplicates_removed"] = before - len(df)
 
+    df = cast_schema_dtypes(df, "customers")
+
     logs["final_rows"] = len(df)
     logs["rows_removed_total"] = logs["initial_rows"] - logs["final_rows"]
 
     # Log everything cleanly
-    logging.info("CLEANING REPORT: blinkit_customers")
-    for k, v in logs.items():
-        logging.info(f"{k}: {v}")
+    report_cleaning("blinkit_customers", logs)
 
     return df
@@ -1,21 +1,18 @@
-import os
-import logging
 import pandas as pd
+from utils.streaming_stats import compute_stats
+from data_pipeline.data_cleaning.typed_ingest import parse_schema_dates, cast_schema_dtypes
+from data_pipeline.data_cleaning.cleaning_metrics import report_cleaning
 
-# Logs directory setup
-LOG_DIR = r"D:\demand_forecasting_system\logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 
-logging.basicConfig(
-    filename=os.path.join(LOG_DIR, "pipeline.log"),
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Global statistics clean_inventory_data depends on (99th percentile caps)
+INVENTORY_STATS = {
+    "stock_received_p99": ("quantile", "stock_received", 0.99),
+    "damaged_stock_p99": ("quantile", "damaged_stock", 0.99),
+}
 
 
-def clean_inventory_data(df_inventory: pd.DataFrame) -> pd.DataFrame:
-    df = df_inventory.copy()
-    logs = {}
+def _prepare_inventory(df_inventory: pd.DataFrame, logs: dict) -> pd.DataFrame:
+    df = df_inventory
 
     logs["initial_rows"] = len(df)
 
@@ -23,11 +20,11 @@ def clean_inventory_data(df_inventory: pd.DataFrame) -> pd.DataFrame:
     usable_cols = [
         "product_id", "date", "stock_received", "damaged_stock"
     ]
-    df = df[usable_cols].copy()
+    df = df[usable_cols]
 
     #  Remove duplicates based on product_id + date
     before = len(df)
-    df.drop_duplicates(subset=["product_id", "date"], inplace=True)
+    df = df.drop_duplicates(subset=["product_id", "date"])
     logs["duplicates_removed"] = before - len(df)
 
     #  Missing value report before cleaning
@@ -40,18 +37,34 @@ def clean_inventory_data(df_inventory: pd.DataFrame) -> pd.DataFrame:
 
     #  Remove rows where product_id OR date is missing
     before = len(df)
-    df.dropna(subset=["product_id", "date"], inplace=True)
+    df = df.dropna(subset=["product_id", "date"])
     logs["rows_removed_missing_pk"] = before - len(df)
 
     #  Convert datatypes
     df["product_id"] = df["product_id"].astype(int)
-    df["date"] = pd.to_datetime(df["date"], format="%d-%m-%Y", errors="coerce")
+    df = parse_schema_dates(df, "inventory")
+    return df
+
+
+def collect_inventory_stats(df_inventory: pd.DataFrame, collector) -> None:
+    """Feed one chunk into a StatsCollector built from INVENTORY_STATS."""
+    collector.update(_prepare_inventory(df_inventory, {}))
+
+
+def clean_inventory_data(df_inventory: pd.DataFrame, stats: dict = None) -> pd.DataFrame:
+    logs = {}
+    df = _prepare_inventory(df_inventory, logs)
 
     #  Treat outliers using 99th percentile cap
-    for col in num_cols:
-        upper_limit = df[col].quantile(0.99)
+    # Chunked runs pass stats accumulated over the whole table
+    if stats is None:
+        stats = compute_stats(df, INVENTORY_STATS)
+    for col in ["stock_received", "damaged_stock"]:
+        upper_limit = stats[f"{col}_p99"]
         df.loc[df[col] > upper_limit, col] = upper_limit
 
+    df = cast_schema_dtypes(df, "inventory")
+
     #  Missing report after cleaning
     logs["missing_after"] = df.isnull().sum().to_dict()
 
@@ -59,8 +72,6 @@ def clean_inventory_data(df_inventory: pd.DataFrame) -> pd.DataFrame:
     logs["rows_removed_total"] = logs["initial_rows"] - logs["final_rows"]
 
     #  Log cleaning performance
-    logging.info(" CLEANING REPORT: Inventory Data")
-    for k, v in logs.items():
-        logging.info(f"{k}: {v}")
+    report_cleaning("blinkit_inventory", logs)
 
     return df
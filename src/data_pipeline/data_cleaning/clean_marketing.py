@@ -1,9 +1,10 @@
-import logging
 import pandas as pd
+from data_pipeline.data_cleaning.typed_ingest import parse_schema_dates, cast_schema_dtypes
+from data_pipeline.data_cleaning.cleaning_metrics import report_cleaning
 
 
 def clean_marketing_data(df_marketing: pd.DataFrame) -> pd.DataFrame:
-    df = df_marketing.copy()
+    df = df_marketing
     logs = {}
 
     logs["initial_rows"] = len(df)
@@ -14,11 +15,11 @@ def clean_marketing_data(df_marketing: pd.DataFrame) -> pd.DataFrame:
         "channel", "impressions", "clicks",
         "conversions", "spend", "revenue_generated"
     ]
-    df = df[usable_cols].copy()
+    df = df[usable_cols]
 
     # Drop duplicates by campaign + date
     before = len(df)
-    df.drop_duplicates(subset=["campaign_id", "date"], inplace=True)
+    df = df.drop_duplicates(subset=["campaign_id", "date"])
     logs["duplicates_removed"] = before - len(df)
 
     # Track missing before cleaning
@@ -35,22 +36,22 @@ def clean_marketing_data(df_marketing: pd.DataFrame) -> pd.DataFrame:
 
     # Remove rows where campaign_id is missing
     before = len(df)
-    df.dropna(subset=["campaign_id"], inplace=True)
+    df = df.dropna(subset=["campaign_id"])
     logs["rows_removed_missing_id"] = before - len(df)
 
     # Fix dtypes
-    df["date"] = pd.to_datetime(df["date"], errors="coerce", dayfirst=True)
+    df = parse_schema_dates(df, "marketing")
     df["campaign_id"] = df["campaign_id"].astype("Int64")
 
     for col in numeric_cols:
         df[col] = df[col].astype("float64")
 
+    df = cast_schema_dtypes(df, "marketing")
+
     logs["final_rows"] = len(df)
     logs["rows_removed_total"] = logs["initial_rows"] - logs["final_rows"]
 
     # Logging entry
-    logging.info("CLEANING REPORT: blinkit_marketing_performance")
-    for k, v in logs.items():
-        logging.info(f"{k}: {v}")
+    report_cleaning("blinkit_marketing_performance", logs)
 
     return df
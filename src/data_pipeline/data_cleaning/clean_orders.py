@@ -1,20 +1,17 @@
-import os
-import logging
 import pandas as pd
+from utils.streaming_stats import compute_stats
+from data_pipeline.data_cleaning.typed_ingest import parse_schema_dates, cast_schema_dtypes
+from data_pipeline.data_cleaning.cleaning_metrics import report_cleaning
 
-# Configure logging once for the whole pipeline
-LOG_DIR = r"D:\demand_forecasting_system\logs"
-os.makedirs(LOG_DIR, exist_ok=True)
+# Global statistics clean_orders depends on (IQR limits on order_total)
+ORDERS_STATS = {
+    "order_total_q1": ("quantile", "order_total", 0.25),
+    "order_total_q3": ("quantile", "order_total", 0.75),
+}
 
-logging.basicConfig(
-    filename=os.path.join(LOG_DIR, "pipeline.log"),
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
-def clean_orders(df_orders: pd.DataFrame) -> pd.DataFrame:
-    df = df_orders.copy()
-    logs = {}
+def _prepare_orders(df_orders: pd.DataFrame, logs: dict) -> pd.DataFrame:
+    df = df_orders
 
     logs["initial_rows"] = len(df)
 
@@ -27,8 +24,19 @@ def clean_orders(df_orders: pd.DataFrame) -> pd.DataFrame:
     df = df[keep_cols]
 
     before = len(df)
-    df.drop_duplicates(subset="order_id", keep="first", inplace=True)
+    df = df.drop_duplicates(subset="order_id", keep="first")
     logs["duplicates_removed"] = before - len(df)
+    return df
+
+
+def collect_orders_stats(df_orders: pd.DataFrame, collector) -> None:
+    """Feed one chunk into a StatsCollector built from ORDERS_STATS."""
+    collector.update(_prepare_orders(df_orders, {}))
+
+
+def clean_orders(df_orders: pd.DataFrame, stats: dict = None) -> pd.DataFrame:
+    logs = {}
+    df = _prepare_orders(df_orders, logs)
 
     logs["missing_before"] = df.isnull().sum().to_dict()
 
@@ -36,9 +44,7 @@ def clean_orders(df_orders: pd.DataFrame) -> pd.DataFrame:
     df['delivery_status'] = df['delivery_status'].fillna('Pending')
     df['actual_delivery_time'] = df['actual_delivery_time'].fillna(df['promised_delivery_time'])
     # df['order_date'] = df['order_date'].dt.date
-    datetime_cols = ["order_date", "promised_delivery_time", "actual_delivery_time"]
-    for col in datetime_cols:
-        df[col] = pd.to_datetime(df[col], errors='coerce')
+    df = parse_schema_dates(df, "orders")
 
     df['payment_method'] = df['payment_method'].str.title().replace({
         'Cod': 'COD',
@@ -48,8 +54,11 @@ def clean_orders(df_orders: pd.DataFrame) -> pd.DataFrame:
 
     df['delivery_status'] = df['delivery_status'].str.strip().str.title()
 
-    Q1 = df['order_total'].quantile(0.25)
-    Q3 = df['order_total'].quantile(0.75)
+    # Chunked runs pass stats accumulated over the whole table
+    if stats is None:
+        stats = compute_stats(df, ORDERS_STATS)
+    Q1 = stats["order_total_q1"]
+    Q3 = stats["order_total_q3"]
     IQR = Q3 - Q1
     upper_limit = Q3 + 1.5 * IQR
     lower_limit = Q1 - 1.5 * IQR
@@ -63,12 +72,12 @@ def clean_orders(df_orders: pd.DataFrame) -> pd.DataFrame:
         .dt.total_seconds() / 3600
     )
 
+    df = cast_schema_dtypes(df, "orders")
+
     logs["final_rows"] = len(df)
     logs["rows_removed_total"] = logs["initial_rows"] - logs["final_rows"]
 
     # Write audit to pipeline.log
-    logging.info("CLEANING REPORT: blinkit_orders")
-    for k, v in logs.items():
-        logging.info(f"{k}: {v}")
+    report_cleaning("blinkit_orders", logs)
 
     return df
@@ -1,60 +1,71 @@
-import os
-import logging
+import numpy as np
 import pandas as pd
+from data_pipeline.data_cleaning.typed_ingest import cast_schema_dtypes, downcast_integer
+from data_pipeline.data_cleaning.cleaning_metrics import report_cleaning
 
-# Log Directory Setup
-LOG_DIR = r"D:\demand_forecasting_system\logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 
-logging.basicConfig(
-    filename=os.path.join(LOG_DIR, "pipeline.log"),
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+def _duplicate_pairs(first: pd.Series, second: pd.Series) -> np.ndarray:
+    """
+    Mask of rows repeating an earlier (first, second) pair, like
+    DataFrame.duplicated(keep="first") but from one stable sort instead of
+    pandas' per-column hash tables, which peak at about twice this table's
+    memory. Pairs with a missing value never match; those rows are dropped
+    as missing IDs instead.
+    """
+    first, second = first.to_numpy(), second.to_numpy()
+    order = np.lexsort((second, first))
+    first, second = first[order], second[order]
+    repeated = np.zeros(len(order), dtype=bool)
+    repeated[1:] = (first[1:] == first[:-1]) & (second[1:] == second[:-1])
+    duplicated = np.empty(len(order), dtype=bool)
+    duplicated[order] = repeated
+    return duplicated
 
 
 def clean_order_items(df_order_items: pd.DataFrame) -> pd.DataFrame:
-    df = df_order_items.copy()
+    df = df_order_items
     logs = {}
 
     logs["initial_rows"] = len(df)
 
     # Keep only relevant columns
     usable_cols = ['order_id', 'product_id', 'quantity', 'unit_price']
-    df = df[usable_cols].copy()
+    df = df[usable_cols]
 
     # Remove duplicates
-    before = len(df)
-    df.drop_duplicates(subset=['order_id', 'product_id'], inplace=True)
-    logs["duplicates_removed"] = before - len(df)
+    duplicated = _duplicate_pairs(df['order_id'], df['product_id'])
+    logs["duplicates_removed"] = int(duplicated.sum())
 
     # Track missing before cleaning
-    logs["missing_before"] = df.isnull().sum().to_dict()
-
-    # Fill missing numeric values
-    df['quantity'] = df['quantity'].fillna(0)
-    df['unit_price'] = df['unit_price'].fillna(0)
+    logs["missing_before"] = df.isnull()[~duplicated].sum().to_dict()
 
     # Remove rows missing important IDs
-    before = len(df)
-    df.dropna(subset=['order_id', 'product_id'], inplace=True)
-    logs["rows_removed_missing_id"] = before - len(df)
+    missing_id = (df['order_id'].isna() | df['product_id'].isna()).to_numpy() & ~duplicated
+    logs["rows_removed_missing_id"] = int(missing_id.sum())
+    keep = ~(duplicated | missing_id)
+
+    # Copy the kept rows one column at a time, filling and narrowing each
+    # before the next: filtering the whole frame at once holds a full-width
+    # copy next to its row indexer and index, about 1.5x the input
+    def kept(col: str) -> pd.Series:
+        return pd.Series(df[col].to_numpy()[keep], name=col)
 
-    # Fix dtypes
-    df['order_id'] = df['order_id'].astype(int)
-    df['product_id'] = df['product_id'].astype(int)
-    df['quantity'] = df['quantity'].astype(int)
-    df['unit_price'] = df['unit_price'].astype(float)
+    df = pd.DataFrame({
+        'order_id': downcast_integer(kept('order_id').astype(int)),
+        'product_id': downcast_integer(kept('product_id').astype(int)),
+        'quantity': downcast_integer(kept('quantity').fillna(0).astype(int)),
+        'unit_price': kept('unit_price').fillna(0).astype(float),
+    }, copy=False)
 
     # Calculate total price
     df['total_price'] = df['quantity'] * df['unit_price']
 
+    df = cast_schema_dtypes(df, "order_items")
+
     logs["final_rows"] = len(df)
     logs["rows_removed_total"] = logs["initial_rows"] - logs["final_rows"]
 
     # Write logs to file
-    logging.info("CLEANING REPORT: blinkit_order_items")
-    for k, v in logs.items():
-        logging.info(f"{k}: {v}")
+    report_cleaning("blinkit_order_items", logs)
 
     return df
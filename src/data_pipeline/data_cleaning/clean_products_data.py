@@ -1,20 +1,10 @@
-import os
-import logging
 import pandas as pd
 import numpy as np
-
-# Logs directory setup
-LOG_DIR = r"D:\demand_forecasting_system\logs"
-os.makedirs(LOG_DIR, exist_ok=True)
-
-logging.basicConfig(
-    filename=os.path.join(LOG_DIR, "pipeline.log"),
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from data_pipeline.data_cleaning.typed_ingest import cast_schema_dtypes
+from data_pipeline.data_cleaning.cleaning_metrics import report_cleaning
 
 def clean_products_data(df_products: pd.DataFrame) -> pd.DataFrame:
-    df = df_products.copy()
+    df = df_products
     logs = {}
 
     logs["initial_rows"] = len(df)
@@ -25,11 +15,11 @@ def clean_products_data(df_products: pd.DataFrame) -> pd.DataFrame:
         'price', 'mrp', 'margin_percentage',
         'shelf_life_days', 'min_stock_level', 'max_stock_level'
     ]
-    df = df[usable_cols].copy()
+    df = df[usable_cols]
 
     # Remove duplicates
     before = len(df)
-    df.drop_duplicates(subset='product_id', inplace=True)
+    df = df.drop_duplicates(subset='product_id')
     logs["duplicates_removed"] = before - len(df)
 
     # Missing value report before cleaning
@@ -61,12 +51,12 @@ def clean_products_data(df_products: pd.DataFrame) -> pd.DataFrame:
         (df['mrp'] - df['price']) / df['mrp']
     ).replace([np.inf, -np.inf, np.nan], 0)
 
+    df = cast_schema_dtypes(df, "products")
+
     logs["final_rows"] = len(df)
     logs["rows_removed_total"] = logs["initial_rows"] - logs["final_rows"]
 
     # Log results to file
-    logging.info("CLEANING REPORT: blinkit_products")
-    for k, v in logs.items():
-        logging.info(f"{k}: {v}")
+    report_cleaning("blinkit_products", logs)
 
     return df
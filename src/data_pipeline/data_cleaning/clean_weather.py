@@ -1,20 +1,28 @@
-import logging
 import pandas as pd
+from utils.streaming_stats import compute_stats
+from data_pipeline.data_cleaning.typed_ingest import parse_schema_dates, cast_schema_dtypes
+from data_pipeline.data_cleaning.cleaning_metrics import report_cleaning
 
-def clean_weather_data(df_weather: pd.DataFrame) -> pd.DataFrame:
-    df = df_weather.copy()
-    logs = {}
+# Global statistics clean_weather_data depends on (mean fills)
+WEATHER_STATS = {
+    "temperature_mean": ("mean", "temperature"),
+    "precipitation_mean": ("mean", "precipitation"),
+}
+
+
+def _prepare_weather(df_weather: pd.DataFrame, logs: dict) -> pd.DataFrame:
+    df = df_weather
 
     logs["initial_rows"] = len(df)
     logs["initial_missing"] = df.isnull().sum().to_dict()
 
     # Keep only relevant columns safely
     usable_cols = ["area", "date", "temperature", "precipitation"]
-    df = df[[col for col in usable_cols if col in df.columns]].copy()
+    df = df[[col for col in usable_cols if col in df.columns]]
 
     # Drop duplicates (area + date defines unique record)
     before = len(df)
-    df.drop_duplicates(subset=["area", "date"], inplace=True)
+    df = df.drop_duplicates(subset=["area", "date"])
     logs["duplicates_removed"] = before - len(df)
 
     # Handle categorical columns
@@ -22,26 +30,42 @@ def clean_weather_data(df_weather: pd.DataFrame) -> pd.DataFrame:
         df["area"] = df["area"].fillna("Unknown")
 
     # Numeric columns
+    for col in ["temperature", "precipitation"]:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def collect_weather_stats(df_weather: pd.DataFrame, collector) -> None:
+    """Feed one chunk into a StatsCollector built from WEATHER_STATS."""
+    collector.update(_prepare_weather(df_weather, {}))
+
+
+def clean_weather_data(df_weather: pd.DataFrame, stats: dict = None) -> pd.DataFrame:
+    logs = {}
+    df = _prepare_weather(df_weather, logs)
+
+    # Chunked runs pass stats accumulated over the whole table
     numeric_cols = [col for col in ["temperature", "precipitation"] if col in df.columns]
+    if stats is None:
+        stats = compute_stats(df, {k: v for k, v in WEATHER_STATS.items() if v[1] in numeric_cols})
     for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-        df[col] = df[col].fillna(df[col].mean())
+        df[col] = df[col].fillna(stats[f"{col}_mean"])
 
     # Remove rows where date is missing
     before = len(df)
-    df.dropna(subset=["date"], inplace=True)
+    df = df.dropna(subset=["date"])
     logs["rows_removed_missing_date"] = before - len(df)
 
     # Convert date dtype properly
-    df["date"] = pd.to_datetime(df["date"], errors="coerce", dayfirst=True)
+    df = parse_schema_dates(df, "weather")
+    df = cast_schema_dtypes(df, "weather")
 
     logs["final_rows"] = len(df)
     logs["rows_removed_total"] = logs["initial_rows"] - logs["final_rows"]
     logs["final_missing"] = df.isnull().sum().to_dict()
 
     # Logging report
-    logging.info(" CLEANING REPORT: Weather Data")
-    for k, v in logs.items():
-        logging.info(f"{k}: {v}")
+    report_cleaning("blinkit_weather_data", logs)
 
     return df
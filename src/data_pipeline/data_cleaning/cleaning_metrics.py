@@ -0,0 +1,165 @@
+import os
+import sys
+import argparse
+import threading
+import pandas as pd
+from datetime import datetime
+
+from utils.logger import logger
+from config.settings import CLEAN_METRICS_PATH, SAMPLE_RATE
+
+# Per-run metrics, accumulated while a run is active and written as one
+# Parquet file per run under CLEAN_METRICS_PATH (long format: one row per
+# table, stage and metric).
+_lock = threading.Lock()
+_run = None
+
+
+def start_metrics_run(mode: str) -> str:
+    """Start collecting cleaning metrics for a pipeline run; returns the run id."""
+    global _run
+    started_at = datetime.now()
+    with _lock:
+        _run = {
+            "run_id": f"{started_at:%Y%m%dT%H%M%S%f}",
+            "started_at": started_at,
+            "mode": mode,
+            "values": {},
+        }
+    logger.info(f"Collecting cleaning metrics for run {_run['run_id']} ({mode})")
+    return _run["run_id"]
+
+
+def _flatten(logs: dict, prefix: str = ""):
+    for key, value in logs.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{name}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def _add(table: str, stage: str, metrics) -> None:
+    # chunked runs report once per chunk: counts and durations add up per table
+    with _lock:
+        if _run is None:
+            return
+        values = _run["values"]
+        for metric, value in metrics:
+            key = (table, stage, metric)
+            values[key] = values.get(key, 0.0) + value
+
+
+def report_cleaning(table: str, logs: dict) -> None:
+    """Write a cleaner's audit dict to the log and to the active metrics run."""
+    logger.info(
+        f"CLEANING REPORT: {table}",
+        extra={"stage": "clean", "table": table, "rows": logs.get("final_rows")},
+    )
+    for k, v in logs.items():
+        logger.info(f"{k}: {v}")
+    _add(table, "clean", _flatten(logs))
+
+
+def record_stage(table: str, stage: str, duration: float, rows_in: int = None, rows_out: int = None) -> None:
+    """Record the wall time and row counts of one pipeline stage for a table."""
+    metrics = [("duration_sec", duration)]
+    if rows_in is not None:
+        metrics.append(("rows_in", float(rows_in)))
+    if rows_out is not None:
+        metrics.append(("rows_out", float(rows_out)))
+    _add(table, stage, metrics)
+
+
+def finish_metrics_run(metrics_path: str = CLEAN_METRICS_PATH):
+    """Write the active run's metrics to Parquet; returns the file path (None if nothing was recorded)."""
+    global _run
+    with _lock:
+        run, _run = _run, None
+    if run is None or not run["values"]:
+        return None
+
+    rows = [
+        {"table": table, "stage": stage, "metric": metric, "value": value}
+        for (table, stage, metric), value in run["values"].items()
+    ]
+    # throughput is derived once the per-chunk durations and counts are summed
+    totals = {(r["table"], r["stage"], r["metric"]): r["value"] for r in rows}
+    for (table, stage, metric), duration in list(totals.items()):
+        rows_in = totals.get((table, stage, "rows_in"))
+        if metric == "duration_sec" and rows_in is not None and duration > 0:
+            rows.append({"table": table, "stage": stage, "metric": "rows_per_sec", "value": rows_in / duration})
+
+    df = pd.DataFrame(rows)
+    df.insert(0, "run_id", run["run_id"])
+    df.insert(1, "started_at", run["started_at"])
+    df.insert(2, "mode", run["mode"])
+    df.insert(3, "sample_rate", SAMPLE_RATE)
+
+    os.makedirs(metrics_path, exist_ok=True)
+    out_path = os.path.join(metrics_path, f"run-{run['run_id']}.parquet")
+    df.to_parquet(out_path, index=False)
+    logger.info(f"Cleaning metrics saved: {out_path} ({len(df)} metrics)")
+    return out_path
+
+
+def load_metrics(metrics_path: str = CLEAN_METRICS_PATH) -> pd.DataFrame:
+    """All recorded runs as one frame, oldest first."""
+    if not os.path.isdir(metrics_path) or not any(f.endswith(".parquet") for f in os.listdir(metrics_path)):
+        return pd.DataFrame(columns=["run_id", "started_at", "mode", "sample_rate", "table", "stage", "metric", "value"])
+    return pd.read_parquet(metrics_path).sort_values(["started_at", "table", "stage", "metric"], ignore_index=True)
+
+
+def compare_runs(metrics: pd.DataFrame, baseline: str, current: str, threshold: float = 2.0) -> pd.DataFrame:
+    """
+    Metrics of two runs side by side with their ratio. A metric is flagged when
+    it moved by threshold× or more in either direction, or appeared/vanished.
+    """
+    pivot = (
+        metrics[metrics["run_id"].isin([baseline, current])]
+        .pivot_table(index=["table", "stage", "metric"], columns="run_id", values="value", aggfunc="sum")
+        .reindex(columns=[baseline, current])
+    )
+    pivot.columns = ["baseline", "current"]
+    pivot["ratio"] = pivot["current"] / pivot["baseline"]
+
+    both_zero = (pivot["baseline"] == 0) & (pivot["current"] == 0)
+    moved = (pivot["ratio"] >= threshold) | (pivot["ratio"] <= 1 / threshold)
+    missing = pivot["baseline"].isna() | pivot["current"].isna()
+    pivot["flagged"] = (moved | missing) & ~both_zero
+    return pivot.reset_index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List and compare cleaning metrics across pipeline runs")
+    parser.add_argument("--path", default=CLEAN_METRICS_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("runs", help="list recorded runs")
+    compare = subparsers.add_parser("compare", help="compare two runs (default: the last two)")
+    compare.add_argument("--baseline")
+    compare.add_argument("--current")
+    compare.add_argument("--threshold", type=float, default=2.0)
+    compare.add_argument("--all", action="store_true", help="show unflagged metrics too")
+    args = parser.parse_args()
+
+    metrics = load_metrics(args.path)
+    runs = metrics.drop_duplicates("run_id")[["run_id", "started_at", "mode", "sample_rate"]]
+
+    if args.command == "runs":
+        print(runs.to_string(index=False) if len(runs) else "No cleaning runs recorded.")
+        sys.exit(0)
+
+    run_ids = runs["run_id"].tolist()
+    baseline = args.baseline or (run_ids[-2] if len(run_ids) >= 2 else None)
+    current = args.current or (run_ids[-1] if run_ids else None)
+    if baseline is None or current is None:
+        print("Need at least two recorded runs to compare.")
+        sys.exit(1)
+
+    report = compare_runs(metrics, baseline, current, args.threshold)
+    shown = report if args.all else report[report["flagged"]]
+    print(f"Baseline {baseline} vs current {current} (threshold {args.threshold}x)")
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(shown.to_string(index=False, float_format=lambda v: f"{v:,.3f}") if len(shown)
+              else "No metric moved beyond the threshold.")
+    sys.exit(1 if report["flagged"].any() else 0)
@@ -0,0 +1,136 @@
+import os
+import glob
+import json
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from utils.logger import logger
+from data_pipeline.data_cleaning.cleaning_metrics import record_stage
+from data_pipeline.data_cleaning.chunked_cleaning import DEDUP_KEYS, STATS_PASS, SeenKeys, collect_table_stats
+
+STATE_DIRNAME = "_state"
+
+
+def partition_dir(output_path: str) -> str:
+    """Directory holding the incremental partitions of a processed CSV."""
+    return os.path.splitext(output_path)[0]
+
+
+def processed_paths(output_path: str) -> list:
+    """Files making up a processed table: its partitions if any, else the single CSV."""
+    parts = sorted(glob.glob(os.path.join(partition_dir(output_path), "part-*.csv")))
+    return parts or [output_path]
+
+
+def reset_incremental_state(output_path: str) -> None:
+    """Drop partitions, key index and frozen stats, e.g. after a full rewrite."""
+    part_dir = partition_dir(output_path)
+    if os.path.isdir(part_dir):
+        shutil.rmtree(part_dir)
+        logger.info(f"Removed incremental state: {part_dir}")
+
+
+class KeyIndex(SeenKeys):
+    """SeenKeys persisted on disk as a sorted uint64 .npy array."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        if os.path.exists(path):
+            self.hashes = np.load(path)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npy"
+        np.save(tmp_path, self.hashes)
+        os.replace(tmp_path, self.path)
+
+
+def load_frozen_stats(path: str, refresh_days: int):
+    """Return frozen stats if present and younger than refresh_days, else None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        frozen = json.load(f)
+    computed_at = datetime.fromisoformat(frozen["computed_at"])
+    if datetime.now() - computed_at > timedelta(days=refresh_days):
+        logger.info(f"Frozen stats from {computed_at:%Y-%m-%d} are due for refresh")
+        return None
+    return frozen["stats"]
+
+
+def save_frozen_stats(path: str, stats: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "computed_at": datetime.now().isoformat(timespec="seconds"),
+            "stats": {name: float(value) for name, value in stats.items()},
+        }, f, indent=2)
+
+
+def run_incremental_cleaning(table_name, cleaner, make_chunks, output_path, refresh_days=7, transform=None):
+    """
+    Clean only the rows whose dedup keys are not in the table's persisted key
+    index and append them as a new partition next to output_path.
+
+    Table-wide statistics are frozen on first use and reused until they are
+    older than refresh_days; a refresh recomputes them over the whole source
+    but does not re-clean partitions already written.
+    Returns the new partition path, or None when there were no new rows.
+    """
+    part_dir = partition_dir(output_path)
+    state_dir = os.path.join(part_dir, STATE_DIRNAME)
+    keys = DEDUP_KEYS[table_name]
+    index = KeyIndex(os.path.join(state_dir, "keys.npy"))
+    indexed_before = index.hashes.size
+
+    stats = None
+    if table_name in STATS_PASS:
+        stats_path = os.path.join(state_dir, "stats.json")
+        stats = load_frozen_stats(stats_path, refresh_days)
+        if stats is None:
+            start = time.perf_counter()
+            stats = collect_table_stats(table_name, make_chunks, transform=transform)
+            save_frozen_stats(stats_path, stats)
+            record_stage(table_name, "stats", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    new_rows = []
+    rows_in = 0
+    for chunk in make_chunks():
+        if transform is not None:
+            chunk = transform(chunk)
+        rows_in += len(chunk)
+        chunk = index.drop_seen(chunk, keys)
+        if not chunk.empty:
+            new_rows.append(chunk)
+    record_stage(table_name, "dedup", time.perf_counter() - start, rows_in=rows_in,
+                 rows_out=sum(len(chunk) for chunk in new_rows))
+
+    if not new_rows:
+        logger.info(f"{table_name}: no new rows among {rows_in} source rows")
+        return None
+
+    delta = pd.concat(new_rows, ignore_index=True)
+    start = time.perf_counter()
+    cleaned = cleaner(delta, stats=stats) if stats is not None else cleaner(delta)
+    record_stage(table_name, "clean", time.perf_counter() - start, rows_in=len(delta), rows_out=len(cleaned))
+
+    # Write the partition before persisting the index: a crash in between
+    # repeats the delta next run instead of losing it.
+    start = time.perf_counter()
+    os.makedirs(part_dir, exist_ok=True)
+    part_path = os.path.join(part_dir, f"part-{datetime.now():%Y%m%dT%H%M%S%f}.csv")
+    cleaned.to_csv(f"{part_path}.tmp", index=False)
+    os.replace(f"{part_path}.tmp", part_path)
+    index.save()
+    record_stage(table_name, "save", time.perf_counter() - start, rows_out=len(cleaned))
+
+    logger.info(
+        f"{table_name}: cleaned {len(delta)} new of {rows_in} source rows "
+        f"({indexed_before} keys already indexed), wrote {len(cleaned)} rows to {part_path}"
+    )
+    return part_path
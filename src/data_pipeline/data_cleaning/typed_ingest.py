@@ -0,0 +1,145 @@
+import os
+import time
+import yaml
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, is_datetime64_any_dtype, is_numeric_dtype
+
+from utils.logger import logger
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingest_schema.yaml")
+
+_schema = None
+
+
+def load_ingest_schema() -> dict:
+    """Return the per-table ingest schema, loaded once per process."""
+    global _schema
+    if _schema is None:
+        with open(SCHEMA_PATH, "r") as f:
+            _schema = yaml.safe_load(f)["tables"]
+    return _schema
+
+
+def _table_schema(table: str) -> dict:
+    schema = load_ingest_schema()
+    if table not in schema:
+        raise KeyError(f"No ingest schema declared for table '{table}'")
+    return schema[table]
+
+
+def parse_dates(values: pd.Series, formats: list, dayfirst: bool = False) -> pd.Series:
+    """
+    Parse a date column with explicit formats. Each distinct string is parsed
+    once and the result broadcast back, so repeated dates cost nothing extra.
+    Values matching none of the formats get an inferred parse as a last resort.
+    """
+    if is_datetime64_any_dtype(values):
+        return values
+
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Index(uniques).astype(str)
+    parsed = np.full(len(uniques), np.datetime64("NaT"), dtype="datetime64[ns]")
+    remaining = np.ones(len(uniques), dtype=bool)
+
+    for fmt in formats:
+        if not remaining.any():
+            break
+        attempt = pd.to_datetime(uniques[remaining], format=fmt, errors="coerce")
+        parsed[remaining] = attempt.to_numpy(dtype="datetime64[ns]")
+        remaining = np.isnat(parsed)
+
+    if remaining.any():
+        logger.warning(
+            f"{values.name}: {int(remaining.sum())} distinct values match none of {formats}, inferring format"
+        )
+        fallback = pd.to_datetime(uniques[remaining], format="mixed", dayfirst=dayfirst, errors="coerce")
+        parsed[remaining] = fallback.to_numpy(dtype="datetime64[ns]")
+
+    result = parsed[codes]
+    result[codes == -1] = np.datetime64("NaT")
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def parse_schema_dates(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Parse every declared date column of `table` present in df."""
+    schema = _table_schema(table)
+    start = time.perf_counter()
+    parsed = 0
+    for col, formats in schema.get("dates", {}).items():
+        if col in df.columns:
+            df[col] = parse_dates(df[col], formats, dayfirst=schema.get("dayfirst", False))
+            parsed += 1
+    if parsed:
+        logger.info(f"{table}: parsed {parsed} date columns in {time.perf_counter() - start:.3f}s")
+    return df
+
+
+def _stable_categories(series: pd.Series, declared) -> list:
+    observed = series.dropna().unique()
+    if declared == "infer":
+        return sorted(observed)
+    extra = sorted(set(observed) - set(declared))
+    if extra:
+        logger.warning(f"{series.name}: values outside the declared categories {extra[:10]}")
+    return list(declared) + extra
+
+
+def downcast_integer(values: pd.Series) -> pd.Series:
+    """
+    pd.to_numeric(downcast="integer"), but for signed integer columns the
+    smallest dtype is picked from one min/max scan and cast once, instead of
+    trial casts that each allocate and compare a full copy.
+    """
+    if values.empty or not (isinstance(values.dtype, np.dtype) and values.dtype.kind == "i"):
+        return pd.to_numeric(values, downcast="integer")
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def cast_schema_dtypes(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Cast declared categorical columns and downcast declared numeric columns."""
+    schema = _table_schema(table)
+    memory_before = df.memory_usage(deep=True).sum()
+
+    for col, declared in schema.get("categories", {}).items():
+        if col in df.columns:
+            df[col] = df[col].astype(CategoricalDtype(_stable_categories(df[col], declared)))
+
+    for col, kind in schema.get("numeric", {}).items():
+        if col not in df.columns or not is_numeric_dtype(df[col]):
+            continue
+        if kind == "integer":
+            df[col] = downcast_integer(df[col])
+        elif kind == "float32":
+            df[col] = df[col].astype("float32")
+        else:
+            raise ValueError(f"Unsupported numeric kind '{kind}' for {table}.{col}")
+
+    memory_after = df.memory_usage(deep=True).sum()
+    logger.info(
+        f"{table}: typed columns, memory {memory_before / 1e6:.2f} MB -> {memory_after / 1e6:.2f} MB"
+    )
+    return df
+
+
+def apply_ingest_schema(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Parse dates and cast dtypes of `table` as declared in ingest_schema.yaml."""
+    return cast_schema_dtypes(parse_schema_dates(df, table), table)
+
+
+def read_typed_csv(path, table: str) -> pd.DataFrame:
+    """
+    Read a CSV written by the pipeline, or a list of its partitions, and
+    restore the dtypes of `table`.
+    """
+    if isinstance(path, (list, tuple)):
+        df = pd.concat([pd.read_csv(p) for p in path], ignore_index=True)
+    else:
+        categories = _table_schema(table).get("categories", {})
+        df = pd.read_csv(path, dtype={col: "category" for col in categories})
+    return apply_ingest_schema(df, table)
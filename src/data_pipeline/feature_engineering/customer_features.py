@@ -4,46 +4,40 @@ from utils.logger import logger
 def generate_customer_features(df: pd.DataFrame, orders_df: pd.DataFrame = None) -> pd.DataFrame:
     logger.info("Generating customer features...")
 
-    df = df.copy()
-    df["registration_date"] = pd.to_datetime(df["registration_date"], errors="coerce")
+    # the cleaned table has one row per customer: counting rows gives nunique without hashing every ID
+    count_customers = "count" if df["customer_id"].is_unique else "nunique"
 
-    # customer tenure
-    df["customer_tenure_days"] = (pd.Timestamp.now().normalize() - df["registration_date"]).dt.days
+    # per-customer values only feed the area aggregates, so they are kept as
+    # separate series instead of widening the input frame
+    today = pd.Timestamp.now().normalize()
 
-    # frequency
-    df["order_frequency"] = df["total_orders"] / (df["customer_tenure_days"] + 1)
-
-    # avg spend
-    df["avg_spend_per_order"] = df["avg_order_value"]
+    # frequency over the customer tenure (days since registration)
+    order_frequency = df["total_orders"] / (
+        (today - pd.to_datetime(df["registration_date"], errors="coerce")).dt.days + 1
+    )
 
     # premium flag
-    df["is_premium_segment"] = (df["customer_segment"].str.lower() == "premium").astype(int)
-
-    # numeric encoded segment
-    df["customer_segment_encoded"] = df["customer_segment"].astype("category").cat.codes
+    is_premium_segment = df["customer_segment"].str.lower() == "premium"
 
     # compute last order date if order table is provided
     if orders_df is not None:
-        orders_df = orders_df.copy()
-        orders_df["order_date"] = pd.to_datetime(orders_df["order_date"])
-        last_order = (
-            orders_df.groupby("customer_id")["order_date"].max().reset_index()
-                      .rename(columns={"order_date": "last_order_date"})
-        )
-
-        df = df.merge(last_order, on="customer_id", how="left")
-        df["days_since_last_order"] = (
-            pd.Timestamp.now().normalize() - df["last_order_date"]
-        ).dt.days
-        df["days_since_last_order"] = df["days_since_last_order"].fillna(999)
+        order_dates = pd.to_datetime(orders_df["order_date"])
+        last_order_date = df["customer_id"].map(order_dates.groupby(orders_df["customer_id"]).max())
+        days_since_last_order = (today - last_order_date).dt.days.fillna(999)
     else:
-        df["days_since_last_order"] = 999
+        days_since_last_order = 999
+
+    customers = df[["area", "customer_id", "total_orders", "avg_order_value"]].assign(
+        order_frequency=order_frequency,
+        is_premium_segment=is_premium_segment,
+        days_since_last_order=days_since_last_order,
+    )
 
     # area-level aggregates
     area_features = (
-        df.groupby("area")
+        customers.groupby("area", observed=True)
         .agg(
-            customers_count_area=("customer_id", "nunique"),
+            customers_count_area=("customer_id", count_customers),
             avg_customer_orders_area=("total_orders", "mean"),
             avg_customer_aov_area=("avg_order_value", "mean"),
             avg_customer_frequency_area=("order_frequency", "mean"),
@@ -0,0 +1,117 @@
+import os
+import time
+import shutil
+import tempfile
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.logger import logger, flushes_logs
+from data_pipeline import enable_copy_on_write
+from config.settings import FEATURE_WORKERS
+
+
+def _write_feather(df: pd.DataFrame, path: str) -> None:
+    import pyarrow.feather as feather
+
+    # uncompressed, so readers can memory-map the file instead of decoding it
+    feather.write_feather(df, path, compression="uncompressed")
+
+
+def _read_feather(path: str) -> pd.DataFrame:
+    import pyarrow.feather as feather
+
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+@flushes_logs
+def _run_generator(name, func, input_path, output_path, result_path):
+    """
+    Worker: map the input frame, generate features, hand the result back as
+    Feather and write the feature CSV, so the write overlaps other generators.
+    """
+    # spawned workers do not inherit Copy-on-Write from the parent
+    enable_copy_on_write()
+    timings = {}
+    start = time.perf_counter()
+    df = _read_feather(input_path)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = func(df)
+    timings["compute"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _write_feather(features, result_path)
+    timings["handoff"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features.to_csv(output_path, index=False)
+    timings["write"] = time.perf_counter() - start
+    return name, result_path, len(features), timings
+
+
+def _log_timings(name, rows, timings, output_path):
+    breakdown = ", ".join(f"{stage} {secs:.2f}s" for stage, secs in timings.items())
+    logger.info(
+        f"Saved feature table: {output_path} ({rows} rows; {breakdown})",
+        extra={"stage": "features", "table": name, "rows": rows, "duration": round(sum(timings.values()), 3)},
+    )
+
+
+def run_feature_generators(datasets: dict, generators: list, output_paths: dict, workers: int = FEATURE_WORKERS) -> tuple:
+    """
+    Run independent feature generators and write each result to its CSV.
+
+    generators is a list of (name, func, input dataset name). With more than
+    one worker each generator runs in its own process: inputs are handed over
+    as memory-mapped Feather files instead of pickled frames, and every worker
+    writes its own output. workers=0 uses one process per generator, up to
+    the CPU count; workers=1 runs them in this process.
+    Returns ({name: features}, {name: {stage: seconds}}).
+    """
+    workers = workers or min(len(generators), os.cpu_count() or 1)
+    features_map, timings = {}, {}
+
+    if workers <= 1:
+        for name, func, input_name in generators:
+            start = time.perf_counter()
+            features = func(datasets[input_name])
+            compute = time.perf_counter() - start
+            start = time.perf_counter()
+            features.to_csv(output_paths[name], index=False)
+            timings[name] = {"compute": compute, "write": time.perf_counter() - start}
+            features_map[name] = features
+            _log_timings(name, len(features), timings[name], output_paths[name])
+        return features_map, timings
+
+    handoff_dir = tempfile.mkdtemp(prefix="feature_handoff_")
+    try:
+        start = time.perf_counter()
+        input_paths = {}
+        for input_name in dict.fromkeys(input_name for _, _, input_name in generators):
+            input_paths[input_name] = os.path.join(handoff_dir, f"{input_name}.input.feather")
+            _write_feather(datasets[input_name], input_paths[input_name])
+        logger.info(
+            f"Handed {len(input_paths)} inputs to {workers} feature workers in {time.perf_counter() - start:.2f}s"
+        )
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _run_generator, name, func, input_paths[input_name], output_paths[name],
+                    os.path.join(handoff_dir, f"{name}.features.feather"),
+                )
+                for name, func, input_name in generators
+            ]
+            for future in as_completed(futures):
+                name, result_path, rows, generator_timings = future.result()
+                start = time.perf_counter()
+                features_map[name] = _read_feather(result_path)
+                generator_timings["collect"] = time.perf_counter() - start
+                timings[name] = generator_timings
+                _log_timings(name, rows, generator_timings, output_paths[name])
+    finally:
+        shutil.rmtree(handoff_dir, ignore_errors=True)
+
+    # keep the generators' order, not completion order
+    return {name: features_map[name] for name, _, _ in generators}, timings
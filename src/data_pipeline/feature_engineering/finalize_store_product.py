@@ -1,12 +1,16 @@
 # finalize_store_product.py
 import pandas as pd
+import numpy as np
 from utils.logger import logger
 from utils.schema_validator import SchemaValidator
 import os
 
-def generate_store_product_timeseries_features(df: pd.DataFrame, feature_dir: str) -> pd.DataFrame:
+DAILY_KEYS = ["store_id", "product_id", "order_date"]
+DAILY_VALUE_COLUMNS = ["daily_qty", "daily_revenue", "orders_count", "high_value_item_ratio", "avg_unit_price"]
 
-    logger.info("Starting final store-product time-series feature generation...")
+
+def aggregate_store_product_daily(df: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate merged item-level rows to the store-product daily grain."""
 
     # ===============================
     # 1. Ensure datatypes + sorting
@@ -30,11 +34,68 @@ def generate_store_product_timeseries_features(df: pd.DataFrame, feature_dir: st
         .reset_index()
     )
 
+    daily_df = add_avg_unit_price(daily_df)
+
+    logger.info("Daily aggregation completed.")
+    return daily_df
+
+
+def add_avg_unit_price(daily_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive avg_unit_price from the daily revenue and quantity (days with zero
+    quantity divide by 1). Shared by the pandas path and the DB pushdown,
+    whose query returns the other daily columns only.
+    """
     daily_df["avg_unit_price"] = (
         daily_df["daily_revenue"] / daily_df["daily_qty"].replace(0, 1)
     )
+    return daily_df
 
-    logger.info("Daily aggregation completed.")
+
+def compare_daily_aggregates(expected: pd.DataFrame, actual: pd.DataFrame, rtol: float = 1e-6) -> bool:
+    """
+    Check that two store-product daily aggregates (e.g. pandas path vs DB pushdown)
+    contain the same keys and numerically equal values. Logs the first mismatches.
+    """
+    merged = expected[DAILY_KEYS + DAILY_VALUE_COLUMNS].merge(
+        actual[DAILY_KEYS + DAILY_VALUE_COLUMNS],
+        on=DAILY_KEYS,
+        how="outer",
+        suffixes=("_expected", "_actual"),
+        indicator=True,
+    )
+    missing = merged["_merge"] != "both"
+    if missing.any():
+        logger.error(f"Daily aggregates differ in keys: {int(missing.sum())} unmatched rows")
+        logger.error(merged.loc[missing, DAILY_KEYS + ["_merge"]].head(10).to_string())
+        return False
+
+    equal = True
+    for col in DAILY_VALUE_COLUMNS:
+        close = np.isclose(merged[f"{col}_expected"], merged[f"{col}_actual"], rtol=rtol, equal_nan=True)
+        if not close.all():
+            equal = False
+            logger.error(f"Daily aggregates differ in '{col}': {int((~close).sum())} rows")
+            logger.error(merged.loc[~close, DAILY_KEYS + [f"{col}_expected", f"{col}_actual"]].head(10).to_string())
+
+    if equal:
+        logger.info(f"Daily aggregates match ({len(merged)} rows)")
+    return equal
+
+
+def generate_store_product_timeseries_features(df: pd.DataFrame, feature_dir: str) -> pd.DataFrame:
+
+    logger.info("Starting final store-product time-series feature generation...")
+
+    daily_df = aggregate_store_product_daily(df)
+    return add_store_product_timeseries_features(daily_df, feature_dir)
+
+
+def add_store_product_timeseries_features(daily_df: pd.DataFrame, feature_dir: str) -> pd.DataFrame:
+    """
+    Add lag, rolling, cumulative and calendar features to a store-product daily
+    aggregate sorted by (store_id, product_id, order_date), then validate it.
+    """
 
     # ===============================
     # 3. Time-series Features
@@ -4,7 +4,7 @@ from utils.logger import logger
 def generate_inventory_features(df: pd.DataFrame) -> pd.DataFrame:
     logger.info(" Generating inventory features...")
 
-    df = df.copy()
+    df = df.copy(deep=False)
     df["date"] = pd.to_datetime(df["date"], errors='coerce')
     df["net_stock"] = df["stock_received"] - df["damaged_stock"]
 
@@ -1,9 +1,5 @@
 import pandas as pd
-import logging
-
-logger = logging.getLogger("data_pipeline")
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s | %(levelname)s | %(name)s | %(message)s')
+from utils.logger import logger
 
 
 def merge_tables(
@@ -3,10 +3,28 @@ import numpy as np
 from utils.logger import logger
 
 
+def _lowercase_category(values: pd.Series) -> pd.Series:
+    """
+    values.astype(str).str.lower().astype("category"); for categorical input
+    (the cleaned table) each category is lower-cased once instead of building
+    a string per row.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(str).str.lower().astype("category")
+    codes = values.cat.codes.to_numpy()
+    # labels per code; code -1 (missing) picks the trailing "nan", as astype(str) would
+    labels = np.append(values.cat.categories.astype(str).str.lower(), "nan")
+    observed = np.unique(codes)
+    categories, positions = np.unique(labels[observed], return_inverse=True)
+    code_map = np.full(len(labels), -1, dtype=np.int64)
+    code_map[observed] = positions
+    return pd.Series(pd.Categorical.from_codes(code_map[codes], categories), index=values.index, name=values.name)
+
+
 def generate_orders_features(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Generating orders features...")
 
-    df = df.copy()
+    df = df.copy(deep=False)
 
 
     # 1. STANDARD DATETIME CLEANING
@@ -47,7 +65,7 @@ def generate_orders_features(df: pd.DataFrame) -> pd.DataFrame:
 
     # 4. PAYMENT FEATURES
 
-    df["payment_method"] = df["payment_method"].astype(str).str.lower()
+    df["payment_method"] = _lowercase_category(df["payment_method"])
     df["is_cod"] = (df["payment_method"] == "cod").astype(int)
 
 
@@ -10,7 +10,7 @@ def generate_order_items_features(df: pd.DataFrame) -> pd.DataFrame:
         logger.warning("order_items dataframe is empty. Returning empty feature set.")
         return pd.DataFrame()
 
-    df = df.copy()
+    df = df.copy(deep=False)
 
    
     # 1. BASIC CLEANING
@@ -44,8 +44,9 @@ def generate_order_items_features(df: pd.DataFrame) -> pd.DataFrame:
     df["item_cost_estimation"] = df["unit_price"] * 0.7  # placeholder, replaced after product join
     df["item_profit_estimation"] = df["item_revenue"] - df["item_cost_estimation"]
 
-    df.replace([np.inf, -np.inf], 0, inplace=True)
-    df.fillna(0, inplace=True)
+    for col in df.select_dtypes(include="floating").columns:
+        if not np.isfinite(df[col]).all():
+            df[col] = df[col].replace([np.inf, -np.inf], 0).fillna(0)
 
     logger.info(f"order_items features generated: {df.shape}")
     return df
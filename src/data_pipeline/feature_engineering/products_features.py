@@ -10,7 +10,7 @@ def generate_products_features(df: pd.DataFrame) -> pd.DataFrame:
         logger.warning("products dataframe is empty. Returning empty feature set.")
         return pd.DataFrame()
 
-    df = df.copy()
+    df = df.copy(deep=False)
 
      
 
@@ -21,13 +21,15 @@ def generate_products_features(df: pd.DataFrame) -> pd.DataFrame:
     for col in numeric_cols:
         df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    df.fillna({
+    fill_values = {
         "discount_percentage": 0,
         "margin_percentage": 0,
         "shelf_life_days": df["shelf_life_days"].median(),
         "min_stock_level": 0,
         "max_stock_level": df["max_stock_level"].median(),
-    }, inplace=True)
+    }
+    for col, value in fill_values.items():
+        df[col] = df[col].fillna(value)
 
     # Profit value (per unit)
     df["profit_margin_value"] = df["price"] * (df["margin_percentage"] / 100)
@@ -46,8 +48,9 @@ def generate_products_features(df: pd.DataFrame) -> pd.DataFrame:
     df["stock_volatility"] = df["stock_range"] / (df["min_stock_level"] + 1)
 
     # 4. CATEGORY / BRAND POSITIONING 
-    df["is_top_brand"] = df["brand"].isin(df["brand"].value_counts().nlargest(5).index).astype(int)
-    df["is_top_category"] = df["category"].isin(df["category"].value_counts().nlargest(5).index).astype(int)
+    # count as object so ties keep first-seen order rather than category order
+    df["is_top_brand"] = df["brand"].isin(df["brand"].astype(object).value_counts().nlargest(5).index).astype(int)
+    df["is_top_category"] = df["category"].isin(df["category"].astype(object).value_counts().nlargest(5).index).astype(int)
 
     # 5. DEMAND-FORECASTING FLAGS
 
@@ -64,8 +67,10 @@ def generate_products_features(df: pd.DataFrame) -> pd.DataFrame:
     )
 
 
-    df.replace([np.inf, -np.inf], 0, inplace=True)
-    df.fillna(0, inplace=True)
+    # only float columns can hold inf/NaN; rewrite just the ones that do
+    for col in df.select_dtypes(include="floating").columns:
+        if not np.isfinite(df[col]).all():
+            df[col] = df[col].replace([np.inf, -np.inf], 0).fillna(0)
 
     logger.info(f"Product features generated: {df.shape}")
     return df
@@ -4,7 +4,7 @@ from utils.logger import logger
 def generate_weather_features(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Generating weather features...")
 
-    df = df.copy()
+    df = df.copy(deep=False)
     
     # --- Basic cleanup ---
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
@@ -4,7 +4,8 @@ import sys
 import pandas as pd
 import yaml
 from utils.logger import logger
-from utils.schema_validator import SchemaValidator
+from data_pipeline.data_cleaning.typed_ingest import read_typed_csv
+from data_pipeline.data_cleaning.incremental_cleaning import processed_paths
 
 PROJECT_ROOT = r"D:\demand_forecasting_system"
 SRC_DIR = os.path.join(PROJECT_ROOT, "src")
@@ -23,95 +24,155 @@ from data_pipeline.feature_engineering.customer_features import generate_custome
 from data_pipeline.feature_engineering.orders_features import generate_orders_features
 from data_pipeline.feature_engineering.orders_items_features import generate_order_items_features
 from data_pipeline.feature_engineering.products_features import generate_products_features
-from data_pipeline.feature_engineering.finalize_store_product import generate_store_product_timeseries_features
+from data_pipeline.feature_engineering.finalize_store_product import (
+    generate_store_product_timeseries_features,
+    aggregate_store_product_daily,
+    add_store_product_timeseries_features,
+    add_avg_unit_price,
+    compare_daily_aggregates,
+)
 from data_pipeline.feature_engineering.merge_and_aggregate import build_final_dataset
+from data_pipeline.feature_engineering.feature_executor import run_feature_generators
+from data_pipeline import enable_copy_on_write
+from tasks.extract_mssql import fetch_store_product_daily
+from utils.sampling import is_sampling_enabled, sample_order_items, sample_orders, sampled_path
+from config.settings import FINAL_ROW_GROUP_ROWS
 
 
-# Load configuration
+# Item-level tables are only needed when aggregating in pandas
+ITEM_LEVEL_TABLES = {"orders", "order_items"}
 
-logger.info("Loading configuration...")
-config_path = os.path.join(FEATURE_DIR, "config.yaml")
-with open(config_path, "r") as f:
-    config = yaml.safe_load(f)
 
-base_path = config["data_paths"]["base_path"]
-logger.info("Configuration loaded successfully.")
+# Load configuration
+
+def load_config() -> dict:
+    logger.info("Loading configuration...")
+    config_path = os.path.join(FEATURE_DIR, "config.yaml")
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    logger.info(
+        f"Configuration loaded successfully "
+        f"(aggregation mode: {config.get('aggregation', {}).get('mode', 'pandas')})."
+    )
+    return config
 
 
 # Load clean datasets
 
-def load_data(path: str) -> pd.DataFrame:
-    if not os.path.exists(path):
+def load_data(path: str, table: str) -> pd.DataFrame:
+    # incremental cleaning writes partitions next to the single-file output
+    paths = processed_paths(path)
+    if not os.path.exists(paths[0]):
         raise FileNotFoundError(path)
-    logger.info(f"Loading: {path}")
-    return pd.read_csv(path)
-
-datasets = {}
-for name, rel_path in config["data_paths"].items():
-    if name == "base_path":
-        continue
-    full_path = os.path.join(base_path, rel_path)
-    datasets[name] = load_data(full_path)
-    logger.info(f"{name} loaded: {datasets[name].shape}")
-
-
-# Feature Engineering
-logger.info("Running individual feature engineering...")
-features_map = {
-    "customers": generate_customer_features(datasets["customers"]),
-    "products": generate_products_features(datasets["products"]),
-    "orders": generate_orders_features(datasets["orders"]),
-    "order_items": generate_order_items_features(datasets["order_items"])
-}
-
-# Ensure folders exist
-os.makedirs(FEATURE_OUTPUT_DIR, exist_ok=True)
-os.makedirs(MERGE_OUTPUT_DIR, exist_ok=True)
-os.makedirs(FINAL_OUTPUT_DIR, exist_ok=True)
-
-# Save individual feature tables
-for name, df in features_map.items():
-    out_path = os.path.join(FEATURE_OUTPUT_DIR, f"{name}_features.csv")
-    df.to_csv(out_path, index=False)
-    logger.info(f"Saved feature table: {out_path}")
-
-
-# Merge feature tables
-logger.info("Building final joined dataset...")
-merged_df = build_final_dataset(
-    orders_df=features_map["orders"],
-    order_items_df=features_map["order_items"],
-    products_df=features_map["products"],
-    customer_feature=features_map["customers"],
-    weather_feature=None,
-    output_path=None
-)
-
-# Save merged dataset in the merge folder
-merge_output_path = os.path.join(MERGE_OUTPUT_DIR, "merged_store_product.csv")
-merged_df.to_csv(merge_output_path, index=False)
-logger.info(f"Merged dataset saved: {merge_output_path}")
-
-# Time-Series Feature Engineering
-
-logger.info("Running store-product time-series feature engineering...")
-final_df = generate_store_product_timeseries_features(merged_df, FEATURE_DIR)
-
-# Schema Validation
-
-schema_path = os.path.join(FEATURE_DIR, "final_schema.yaml")
-validator = SchemaValidator(schema_path)
-
-try:
-    final_df = validator.validate(final_df)
-except Exception as e:
-    logger.error(f"Schema validation failed: {e}")
-    raise
-
-# Save final dataset
-
-final_output_path = os.path.join(FINAL_OUTPUT_DIR, "final_store_product.csv")
-final_df.to_csv(final_output_path, index=False)
-logger.info(f"Final dataset saved: {final_output_path}")
-
-print("\nPIPELINE EXECUTION FINISHED")
+    logger.info(f"Loading: {path} ({len(paths)} file(s))")
+    return read_typed_csv(paths if len(paths) > 1 else paths[0], table)
+
+
+def load_datasets(config: dict, load_item_level: bool) -> dict:
+    base_path = config["data_paths"]["base_path"]
+    datasets = {}
+    for name, rel_path in config["data_paths"].items():
+        if name == "base_path":
+            continue
+        if name in ITEM_LEVEL_TABLES and not load_item_level:
+            logger.info(f"Skipping {name}: store-product aggregate is pushed down to the DB")
+            continue
+        full_path = sampled_path(os.path.join(base_path, rel_path))
+        datasets[name] = load_data(full_path, name)
+        logger.info(f"{name} loaded: {datasets[name].shape}")
+
+    # Sampling keeps whole (store_id, product_id) series, so their time-series
+    # features match a full run; cross-series stats (e.g. price quantiles) do not.
+    if is_sampling_enabled() and load_item_level:
+        datasets["order_items"] = sample_order_items(datasets["order_items"], datasets["orders"])
+        datasets["orders"] = sample_orders(datasets["orders"], datasets["order_items"])
+        logger.info(f"Sampled series: {len(datasets['order_items'])} order items, {len(datasets['orders'])} orders")
+    return datasets
+
+
+def main():
+    enable_copy_on_write()
+    config = load_config()
+    aggregation_mode = config.get("aggregation", {}).get("mode", "pandas")
+    verify_pushdown = config.get("aggregation", {}).get("verify_pushdown", False)
+    load_item_level = aggregation_mode != "pushdown" or verify_pushdown
+
+    datasets = load_datasets(config, load_item_level)
+
+    # Ensure folders exist
+    os.makedirs(FEATURE_OUTPUT_DIR, exist_ok=True)
+    os.makedirs(MERGE_OUTPUT_DIR, exist_ok=True)
+    os.makedirs(FINAL_OUTPUT_DIR, exist_ok=True)
+
+    # Feature Engineering: independent generators run in parallel and save their own tables
+    logger.info("Running individual feature engineering...")
+    generators = [
+        ("customers", generate_customer_features, "customers"),
+        ("products", generate_products_features, "products"),
+    ]
+    if load_item_level:
+        generators += [
+            ("orders", generate_orders_features, "orders"),
+            ("order_items", generate_order_items_features, "order_items"),
+        ]
+    output_paths = {
+        name: sampled_path(os.path.join(FEATURE_OUTPUT_DIR, f"{name}_features.csv"))
+        for name, _, _ in generators
+    }
+    features_map, _ = run_feature_generators(datasets, generators, output_paths)
+
+    # Merge feature tables
+    merged_df = None
+    if load_item_level:
+        logger.info("Building final joined dataset...")
+        merged_df = build_final_dataset(
+            orders_df=features_map["orders"],
+            order_items_df=features_map["order_items"],
+            products_df=features_map["products"],
+            customer_feature=features_map["customers"],
+            weather_feature=None,
+            output_path=None
+        )
+
+        # Save merged dataset in the merge folder
+        merge_output_path = sampled_path(os.path.join(MERGE_OUTPUT_DIR, "merged_store_product.csv"))
+        merged_df.to_csv(merge_output_path, index=False)
+        logger.info(f"Merged dataset saved: {merge_output_path}")
+
+    # Time-Series Feature Engineering
+
+    logger.info("Running store-product time-series feature engineering...")
+    if aggregation_mode == "pushdown":
+        # sampled runs select their series in the query itself
+        daily_df = fetch_store_product_daily()
+        if daily_df is None:
+            raise RuntimeError("Store-product daily pushdown failed")
+        daily_df = add_avg_unit_price(daily_df)
+
+        if verify_pushdown:
+            expected_df = aggregate_store_product_daily(merged_df)
+            if not compare_daily_aggregates(expected_df, daily_df):
+                raise ValueError("Pushdown daily aggregate does not match the pandas path")
+
+        final_df = add_store_product_timeseries_features(daily_df, FEATURE_DIR)
+    else:
+        final_df = generate_store_product_timeseries_features(merged_df, FEATURE_DIR)
+
+    # Schema validation runs inside add_store_product_timeseries_features
+
+    # Save final dataset
+
+    final_output_path = sampled_path(os.path.join(FINAL_OUTPUT_DIR, "final_store_product.csv"))
+    final_df.to_csv(final_output_path, index=False)
+    logger.info(f"Final dataset saved: {final_output_path}")
+
+    # Columnar copy in row groups, for chunked/parallel validation (utils.parallel_validation)
+    final_parquet_path = os.path.splitext(final_output_path)[0] + ".parquet"
+    final_df.to_parquet(final_parquet_path, index=False, row_group_size=FINAL_ROW_GROUP_ROWS)
+    logger.info(f"Final dataset saved: {final_parquet_path}")
+
+    print("\nPIPELINE EXECUTION FINISHED")
+
+
+if __name__ == "__main__":
+    main()
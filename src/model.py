@@ -2,10 +2,12 @@ from models.train import train_model
 from models.evaluate import evaluate_model
 from models.forecast import generate_forecast
 from utils.mlflow_utils import init_mlflow
-import mlflow
 from utils.logger import logger
 
-if __name__ == "__main__":
+
+def main():
+    import mlflow
+
     print("Starting full ML pipeline...")
 
     # Initialize MLflow
@@ -35,3 +37,7 @@ if __name__ == "__main__":
 
     print("Pipeline executed successfully!")
     logger.info("Pipeline completed successfully.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.logger import logger, flushes_logs
+from utils.sampling import sampled_path
+from models.train import FINAL_DATA_PATH, NATIVE_PARAMS, NUM_BOOST_ROUND
+from models.training_data import load_training_data
+from config.settings import (
+    TRAIN_CACHE_DIR, BACKTEST_FOLDS, BACKTEST_HORIZON_DAYS, BACKTEST_WINDOW,
+    BACKTEST_WINDOW_DAYS, BACKTEST_WORKERS, ARTIFACTS_DIR,
+)
+
+
+def make_folds(dates: pd.Series, n_folds=BACKTEST_FOLDS, horizon_days=BACKTEST_HORIZON_DAYS,
+               window=BACKTEST_WINDOW, window_days=BACKTEST_WINDOW_DAYS, validation_days=0) -> list:
+    """
+    Rolling-origin folds cut on order_date, oldest first. Each fold tests the
+    horizon_days after its cutoff and trains on everything before it
+    ("expanding") or on the window_days before it ("sliding"). With
+    validation_days, the training rows are also split into "fit_rows" and the
+    last validation_days before the cutoff, "val_rows", for early stopping
+    without touching the test rows. Folds without train or test rows (or,
+    when split, fit or validation rows) are dropped.
+    """
+    if window not in ("expanding", "sliding"):
+        raise ValueError(f"Unknown backtest window: {window}")
+
+    horizon = pd.Timedelta(days=horizon_days)
+    end = dates.max().normalize() + pd.Timedelta(days=1)
+    folds = []
+    for k in range(n_folds):
+        test_end = end - (n_folds - 1 - k) * horizon
+        cutoff = test_end - horizon
+        train_start = cutoff - pd.Timedelta(days=window_days) if window == "sliding" else dates.min()
+        train_mask = ((dates >= train_start) & (dates < cutoff)).to_numpy()
+        train_rows = np.flatnonzero(train_mask).astype(np.int32)
+        test_rows = np.flatnonzero(((dates >= cutoff) & (dates < test_end)).to_numpy()).astype(np.int32)
+        if len(train_rows) == 0 or len(test_rows) == 0:
+            logger.warning(f"Skipping backtest fold at cutoff {cutoff.date()}: {len(train_rows)} train / {len(test_rows)} test rows")
+            continue
+        fold = {"cutoff": cutoff, "test_end": test_end, "train_rows": train_rows, "test_rows": test_rows}
+        if validation_days:
+            in_tail = (dates >= cutoff - pd.Timedelta(days=validation_days)).to_numpy()
+            fold["fit_rows"] = np.flatnonzero(train_mask & ~in_tail).astype(np.int32)
+            fold["val_rows"] = np.flatnonzero(train_mask & in_tail).astype(np.int32)
+            if len(fold["fit_rows"]) == 0 or len(fold["val_rows"]) == 0:
+                logger.warning(
+                    f"Skipping backtest fold at cutoff {cutoff.date()}: {len(fold['fit_rows'])} fit / "
+                    f"{len(fold['val_rows'])} validation rows"
+                )
+                continue
+        folds.append(fold)
+    return folds
+
+
+@flushes_logs
+def _run_fold(buffer_path, fold_id, fold, params, num_boost_round):
+    """Worker: slice one fold out of the shared matrix, fit and score it."""
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    full = xgb.DMatrix(buffer_path)
+    dtrain = full.slice(fold["train_rows"])
+    dtest = full.slice(fold["test_rows"])
+    booster = xgb.train(params, dtrain, num_boost_round=num_boost_round)
+
+    preds = booster.predict(dtest)
+    errors = preds - dtest.get_label()
+    return {
+        "fold": fold_id,
+        "cutoff": fold["cutoff"],
+        "test_end": fold["test_end"],
+        "train_rows": len(fold["train_rows"]),
+        "test_rows": len(fold["test_rows"]),
+        "mae": float(np.mean(np.abs(errors))),
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def save_full_matrix(data: dict) -> str:
+    """
+    Save the whole encoded dataset from load_training_data as a binary
+    DMatrix (once per dataset hash) for worker processes to load and slice.
+    """
+    import xgboost as xgb
+
+    buffer_path = os.path.join(TRAIN_CACHE_DIR, data["dataset_hash"], "full.buffer")
+    if not os.path.exists(buffer_path):
+        X = pd.concat([data["X_train"], data["X_test"]])
+        y = pd.concat([data["y_train"], data["y_test"]])
+        os.makedirs(os.path.dirname(buffer_path), exist_ok=True)
+        full = xgb.DMatrix(X, y, feature_types=data["feature_types"], enable_categorical=True)
+        full.save_binary(f"{buffer_path}.tmp{os.getpid()}")
+        os.replace(f"{buffer_path}.tmp{os.getpid()}", buffer_path)
+    return buffer_path
+
+
+def prepare_folds(path: str, n_folds=BACKTEST_FOLDS, horizon_days=BACKTEST_HORIZON_DAYS, window=BACKTEST_WINDOW,
+                  window_days=BACKTEST_WINDOW_DAYS, validation_days=0) -> tuple:
+    """
+    Folds of the final dataset plus the path of the binary DMatrix they slice.
+    The encoded features come from the training cache and the matrix is saved
+    once per dataset hash, so folds (and trials) neither re-parse nor re-encode.
+    """
+    data = load_training_data(path)
+    dates = pd.to_datetime(pd.read_csv(path, usecols=["order_date"])["order_date"])
+    folds = make_folds(dates, n_folds, horizon_days, window, window_days, validation_days)
+    if not folds:
+        raise ValueError(f"No backtest folds with data for {n_folds} x {horizon_days} days")
+    return save_full_matrix(data), folds
+
+
+def run_backtest(path: str, n_folds=BACKTEST_FOLDS, horizon_days=BACKTEST_HORIZON_DAYS, window=BACKTEST_WINDOW,
+                 window_days=BACKTEST_WINDOW_DAYS, workers=BACKTEST_WORKERS, params=NATIVE_PARAMS,
+                 num_boost_round=NUM_BOOST_ROUND) -> pd.DataFrame:
+    """
+    Rolling-origin backtest of the native-categorical model on the final
+    dataset. Folds train concurrently (workers=0: one per fold up to the CPU
+    count), splitting the CPU threads between them.
+    Returns one row of metrics per fold.
+    """
+    buffer_path, folds = prepare_folds(path, n_folds, horizon_days, window, window_days)
+
+    workers = workers or min(len(folds), os.cpu_count() or 1)
+    params = {**params, "nthread": max(1, (os.cpu_count() or 1) // workers)}
+    logger.info(
+        f"Backtest: {len(folds)} {window} folds of {horizon_days} days, {workers} workers x {params['nthread']} threads"
+    )
+
+    start = time.perf_counter()
+    if workers <= 1:
+        results = [_run_fold(buffer_path, i, fold, params, num_boost_round) for i, fold in enumerate(folds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_fold, buffer_path, i, fold, params, num_boost_round)
+                for i, fold in enumerate(folds)
+            ]
+            results = [future.result() for future in as_completed(futures)]
+
+    report = pd.DataFrame(results).sort_values("fold", ignore_index=True)
+    for row in report.itertuples():
+        logger.info(
+            f"Fold {row.fold} (cutoff {row.cutoff.date()}): MAE {row.mae:.4f}, RMSE {row.rmse:.4f}, "
+            f"{row.train_rows} train / {row.test_rows} test rows in {row.seconds:.1f}s"
+        )
+    logger.info(
+        f"Backtest done in {time.perf_counter() - start:.1f}s: "
+        f"MAE {report['mae'].mean():.4f} ± {report['mae'].std():.4f}, RMSE {report['rmse'].mean():.4f} ± {report['rmse'].std():.4f}"
+    )
+    return report
+
+
+def log_backtest(report: pd.DataFrame, window: str, horizon_days: int) -> None:
+    """Log per-fold metrics (step = fold) and their aggregates to the active MLflow run."""
+    import mlflow
+
+    mlflow.log_param("backtest_folds", len(report))
+    mlflow.log_param("backtest_window", window)
+    mlflow.log_param("backtest_horizon_days", horizon_days)
+    for row in report.itertuples():
+        mlflow.log_metric("fold_mae", row.mae, step=row.fold)
+        mlflow.log_metric("fold_rmse", row.rmse, step=row.fold)
+    for metric in ("mae", "rmse"):
+        mlflow.log_metric(f"backtest_{metric}_mean", report[metric].mean())
+        mlflow.log_metric(f"backtest_{metric}_std", report[metric].std())
+
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    report.to_csv(os.path.join(ARTIFACTS_DIR, "backtest_folds.csv"), index=False)
+    mlflow.log_artifact(os.path.join(ARTIFACTS_DIR, "backtest_folds.csv"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the forecasting model")
+    parser.add_argument("--folds", type=int, default=BACKTEST_FOLDS)
+    parser.add_argument("--horizon-days", type=int, default=BACKTEST_HORIZON_DAYS)
+    parser.add_argument("--window", choices=["expanding", "sliding"], default=BACKTEST_WINDOW)
+    parser.add_argument("--window-days", type=int, default=BACKTEST_WINDOW_DAYS)
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    args = parser.parse_args()
+
+    import mlflow
+    from utils.mlflow_utils import init_mlflow
+
+    init_mlflow()
+    mlflow.set_experiment("store_brand_product_forecast")
+    with mlflow.start_run(run_name="backtest"):
+        report = run_backtest(
+            sampled_path(FINAL_DATA_PATH), args.folds, args.horizon_days, args.window, args.window_days, args.workers
+        )
+        log_backtest(report, args.window, args.horizon_days)
+    print(report.to_string(index=False))
@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+from config.settings import ENCODER_PATH, ENCODER_UNSEEN_CODE, ARTIFACTS_DIR
+
+# Category -> code tables for the label-encoded model, as JSON: a code is the
+# category's position in its sorted list, the same codes LabelEncoder assigns.
+ENCODER_VERSION = 1
+
+
+def fit_encoders(X: pd.DataFrame, columns: list) -> dict:
+    """Sorted categories per column, as LabelEncoder.fit would find them."""
+    return {c: sorted(X[c].dropna().unique().tolist()) for c in columns}
+
+
+def transform(X: pd.DataFrame, encoders: dict, unseen_code: int = ENCODER_UNSEEN_CODE) -> pd.DataFrame:
+    """
+    Replace every encoded column by its codes in one vectorized lookup per
+    column; unseen and missing values get unseen_code instead of raising.
+    """
+    codes = {}
+    for c, categories in encoders.items():
+        column = pd.Categorical(X[c], categories=categories).codes.astype(np.int64)
+        codes[c] = np.where(column < 0, unseen_code, column)
+    return X.assign(**codes)
+
+
+def save_encoders(encoders: dict, path: str = ENCODER_PATH) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"version": ENCODER_VERSION, "columns": encoders}, f)
+
+
+def load_encoders(path: str = ENCODER_PATH) -> dict:
+    with open(path, "r") as f:
+        payload = json.load(f)
+    if payload.get("version") != ENCODER_VERSION:
+        raise ValueError(f"Unsupported encoder artifact version {payload.get('version')} in {path}")
+    return payload["columns"]
+
+
+def from_label_encoders(label_encoders: dict) -> dict:
+    """Category tables of fitted sklearn LabelEncoders (for migrating old artifacts)."""
+    return {c: le.classes_.tolist() for c, le in label_encoders.items()}
+
+
+def benchmark(rows: int = 1_000_000, columns: int = 4, cardinality: int = 1000, repeats: int = 3) -> dict:
+    """
+    Compare the pickled LabelEncoder path (pickle load + le.transform per
+    column through X.loc) with this artifact (JSON load + vectorized lookup).
+    """
+    import pickle
+    import tempfile
+    from sklearn.preprocessing import LabelEncoder
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({f"cat_{i}": rng.integers(0, cardinality, rows).astype(str) for i in range(columns)})
+    label_encoders = {c: LabelEncoder().fit(X[c]) for c in X.columns}
+
+    def best(func):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, "label_encoders.pkl")
+        json_path = os.path.join(tmp, "label_encoders.json")
+        with open(pickle_path, "wb") as f:
+            pickle.dump(label_encoders, f)
+        save_encoders(from_label_encoders(label_encoders), json_path)
+        encoders = load_encoders(json_path)
+
+        def pickle_transform():
+            encoded = X.copy()
+            for c, le in label_encoders.items():
+                encoded.loc[:, c] = le.transform(encoded[c])
+
+        def load_pickle():
+            with open(pickle_path, "rb") as f:
+                pickle.load(f)
+
+        report = {
+            "pickle_load_ms": best(load_pickle) * 1000,
+            "json_load_ms": best(lambda: load_encoders(json_path)) * 1000,
+            "pickle_rows_per_sec": rows / best(pickle_transform),
+            "vectorized_rows_per_sec": rows / best(lambda: transform(X, encoders)),
+            "pickle_bytes": os.path.getsize(pickle_path),
+            "json_bytes": os.path.getsize(json_path),
+        }
+
+    # both paths must agree on every code
+    expected = np.column_stack([label_encoders[c].transform(X[c]) for c in X.columns])
+    if not np.array_equal(transform(X, encoders).to_numpy(), expected):
+        raise AssertionError("Vectorized encoder codes differ from LabelEncoder")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Label encoder artifact tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate = subparsers.add_parser("migrate", help="convert a trusted label_encoders.pkl to the JSON artifact")
+    migrate.add_argument("pickle_path", nargs="?", default=os.path.join(ARTIFACTS_DIR, "label_encoders.pkl"))
+    migrate.add_argument("--out", default=ENCODER_PATH)
+    bench = subparsers.add_parser("benchmark", help="compare with the pickled LabelEncoder path")
+    bench.add_argument("--rows", type=int, default=1_000_000)
+    bench.add_argument("--columns", type=int, default=4)
+    bench.add_argument("--cardinality", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        import pickle
+
+        with open(args.pickle_path, "rb") as f:
+            label_encoders = pickle.load(f)
+        save_encoders(from_label_encoders(label_encoders), args.out)
+        logger.info(f"Encoders migrated: {args.pickle_path} -> {args.out}")
+        sys.exit(0)
+
+    report = benchmark(args.rows, args.columns, args.cardinality)
+    print(f"Load:      pickle {report['pickle_load_ms']:.2f} ms, JSON {report['json_load_ms']:.2f} ms")
+    print(f"Transform: pickle {report['pickle_rows_per_sec']:,.0f} rows/s, "
+          f"vectorized {report['vectorized_rows_per_sec']:,.0f} rows/s")
+    print(f"Size:      pickle {report['pickle_bytes']:,} B, JSON {report['json_bytes']:,} B")
@@ -1,12 +1,36 @@
-from sklearn.metrics import mean_absolute_error, mean_squared_error
 import numpy as np
-import mlflow
+from models.feature_matrix import cached_predict
+from models.training_data import predict
+
+
+def streamed_metrics(model, batches):
+    """(MAE, RMSE) accumulated over (X, y) batches, scoring one batch at a time."""
+    abs_error, squared_error, rows = 0.0, 0.0, 0
+    for X, y in batches:
+        errors = np.asarray(y, dtype=np.float64) - predict(model, X)
+        abs_error += np.abs(errors).sum()
+        squared_error += np.square(errors).sum()
+        rows += len(errors)
+    return abs_error / rows, np.sqrt(squared_error / rows)
+
 
 def evaluate_model(model, X_test, y_test):
-    preds = model.predict(X_test)
+    """
+    Log MAE and RMSE on the test rows. With y_test None, X_test is an
+    iterable of (X, y) batches (the external-memory test set) and the
+    metrics are accumulated batch by batch.
+    """
+    import mlflow
+    from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+    if y_test is None:
+        mae, rmse = streamed_metrics(model, X_test)
+    else:
+        # reuses the test predictions when X_test is the shared feature matrix
+        preds = cached_predict(model, X_test)
 
-    mae = mean_absolute_error(y_test, preds)
-    rmse = np.sqrt(mean_squared_error(y_test, preds))
+        mae = mean_absolute_error(y_test, preds)
+        rmse = np.sqrt(mean_squared_error(y_test, preds))
 
     print(f"MAE: {mae}")
     print(f"RMSE: {rmse}")
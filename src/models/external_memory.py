@@ -0,0 +1,167 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+from models.training_data import (
+    TARGET, TEST_SIZE, CATEGORICAL_FEATURES, add_date_features, encode_features, dataset_hash,
+)
+from config.settings import TRAIN_EXTERNAL_CACHE_DIR, TRAIN_MAX_CATEGORIES
+
+
+def external_tree_method() -> str:
+    """
+    hist on XGBoost 2.0+; older releases crash building hist pages from
+    external memory with missing values, so they use approx (same binning
+    and native categorical support, sketched per iteration).
+    """
+    import xgboost as xgb
+
+    major = int(xgb.__version__.split(".")[0])
+    return "hist" if major >= 2 else "approx"
+
+
+def _row_group_spans(parquet_file, start_row: int, stop_row: int):
+    """(row group, first row, last row) slices covering rows [start_row, stop_row) of the file."""
+    offset = 0
+    for rg in range(parquet_file.num_row_groups):
+        rows = parquet_file.metadata.row_group(rg).num_rows
+        lo, hi = max(start_row, offset), min(stop_row, offset + rows)
+        if lo < hi:
+            yield rg, lo - offset, hi - offset
+        offset += rows
+
+
+def scan_categories(parquet_path: str) -> dict:
+    """
+    Categories of the dataset's categorical columns, reading only those
+    columns row group by row group. ID columns with more than
+    TRAIN_MAX_CATEGORIES distinct values stay numeric, as in training_data.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(parquet_path)
+    schema = parquet_file.schema_arrow
+    string_cols = [
+        f.name for f in schema
+        if f.name != TARGET and (str(f.type) in ("string", "large_string") or str(f.type).startswith("dictionary"))
+    ]
+    candidates = string_cols + [c for c in CATEGORICAL_FEATURES if c in schema.names and c not in string_cols]
+
+    seen = {c: set() for c in candidates}
+    for rg in range(parquet_file.num_row_groups):
+        table = parquet_file.read_row_group(rg, columns=list(seen))
+        for c in list(seen):
+            seen[c].update(str(v) for v in pd.unique(table.column(c).to_pandas().dropna()))
+            if c not in string_cols and len(seen[c]) > TRAIN_MAX_CATEGORIES:
+                del seen[c]
+    return {c: sorted(values) for c, values in seen.items()}
+
+
+def _encoded_batch(table, categories: dict):
+    df = add_date_features(table.to_pandas()).drop(columns=["order_date"])
+    y = df.pop(TARGET).to_numpy(dtype=np.float32)
+    X, _, feature_types = encode_features(df, categories)
+    return X, y, feature_types
+
+
+def _make_iter_class():
+    import xgboost as xgb
+
+    class ParquetBatchIter(xgb.DataIter):
+        """Feeds rows [start_row, stop_row) of a Parquet file to XGBoost one row group at a time."""
+
+        def __init__(self, parquet_path, categories, start_row, stop_row, cache_prefix):
+            import pyarrow.parquet as pq
+
+            self.parquet_file = pq.ParquetFile(parquet_path)
+            self.categories = categories
+            self.spans = list(_row_group_spans(self.parquet_file, start_row, stop_row))
+            self.position = 0
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data):
+            if self.position == len(self.spans):
+                return 0
+            rg, lo, hi = self.spans[self.position]
+            table = self.parquet_file.read_row_group(rg).slice(lo, hi - lo)
+            X, y, feature_types = _encoded_batch(table, self.categories)
+            input_data(data=X, label=y, feature_types=feature_types)
+            self.position += 1
+            return 1
+
+        def reset(self):
+            self.position = 0
+
+    return ParquetBatchIter
+
+
+class ParquetTestSet:
+    """
+    Rows [start_row, stop_row) of a Parquet file, iterated as encoded (X, y)
+    batches one row group at a time, so evaluation never holds them all.
+    """
+
+    def __init__(self, parquet_path, categories, start_row, stop_row):
+        import pyarrow.parquet as pq
+
+        self.parquet_file = pq.ParquetFile(parquet_path)
+        self.categories = categories
+        self.spans = list(_row_group_spans(self.parquet_file, start_row, stop_row))
+        self.rows = stop_row - start_row
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def feature_columns(self) -> list:
+        X, _, _ = _encoded_batch(self.parquet_file.read_row_group(0).slice(0, 0), self.categories)
+        return X.columns.tolist()
+
+    def __iter__(self):
+        for rg, lo, hi in self.spans:
+            X, y, _ = _encoded_batch(self.parquet_file.read_row_group(rg).slice(lo, hi - lo), self.categories)
+            yield X, y
+
+
+def load_external_training_data(parquet_path: str, cache_dir: str = TRAIN_EXTERNAL_CACHE_DIR) -> dict:
+    """
+    Build an external-memory training DMatrix over the first (1 - TEST_SIZE)
+    rows of the final Parquet dataset, the same temporal split as
+    train_test_split(shuffle=False). Only one row group is decoded at a time;
+    XGBoost pages the quantized data to cache_dir, under a prefix naming the
+    dataset hash and this process so concurrent or later runs on other data
+    do not share pages. The test rows are returned as a ParquetTestSet,
+    encoded batch by batch when evaluated.
+    """
+    import xgboost as xgb
+    import pyarrow.parquet as pq
+
+    start = time.perf_counter()
+    parquet_file = pq.ParquetFile(parquet_path)
+    total_rows = parquet_file.metadata.num_rows
+    n_train = int(total_rows * (1 - TEST_SIZE))
+
+    categories = scan_categories(parquet_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_prefix = os.path.join(cache_dir, f"train-{dataset_hash(parquet_path)}-{os.getpid()}")
+    iter_class = _make_iter_class()
+    train_iter = iter_class(parquet_path, categories, 0, n_train, cache_prefix)
+    dtrain = xgb.DMatrix(train_iter)
+    # XGBoost iterates again when training starts, so the iterator has to outlive this call
+    dtrain.batch_iter = train_iter
+
+    test_set = ParquetTestSet(parquet_path, categories, n_train, total_rows)
+
+    logger.info(
+        f"External-memory training data: {n_train} train rows in {len(train_iter.spans)} row groups, "
+        f"{len(test_set)} test rows, cache {cache_prefix} ({time.perf_counter() - start:.2f}s)"
+    )
+    return {
+        "dtrain": dtrain,
+        "test_set": test_set,
+        "categories": categories,
+        "feature_columns": test_set.feature_columns,
+        "train_rows": n_train,
+    }
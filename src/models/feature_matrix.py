@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import shutil
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+from data_pipeline.data_cleaning.typed_ingest import read_typed_csv
+from models.training_data import TARGET, add_date_features, dataset_hash, load_training_data, predict
+from config.settings import FEATURE_MATRIX_DIR
+
+# Model-ready matrix of the final dataset, written once per dataset hash:
+# features.npy (float32, rows x features), target.npy, frame.feather (the
+# source features with their own dtypes, for output) and manifest.json.
+# Readers memory-map them.
+
+# Matrices opened in this process by dataset hash, so train, evaluate and
+# forecast share the same frames (and the current model's predictions on them)
+_opened = {}
+_hashes = {}
+
+
+def _hash(path: str) -> str:
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _hashes:
+        _hashes[key] = dataset_hash(path)
+    return _hashes[key]
+
+
+def prepare_feature_matrix(data: dict, path: str, matrix_dir: str = FEATURE_MATRIX_DIR) -> dict:
+    """
+    Materialize the encoded dataset from load_training_data as memory-mappable
+    files (skipped when this dataset hash is already prepared) and open it.
+    """
+    key = data["dataset_hash"]
+    entry_dir = os.path.join(matrix_dir, key)
+    if not os.path.exists(os.path.join(entry_dir, "manifest.json")):
+        import pyarrow.feather as feather
+
+        start = time.perf_counter()
+        tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        X = pd.concat([data["X_train"], data["X_test"]])
+        y = pd.concat([data["y_train"], data["y_test"]])
+        features = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+        np.save(os.path.join(tmp_dir, "features.npy"), features)
+        np.save(os.path.join(tmp_dir, "target.npy"), y.to_numpy(dtype=np.float32))
+        # float32 features round the source values; output reads them from here
+        source = add_date_features(read_typed_csv(path, "final_store_product")).drop(columns=["order_date", TARGET])
+        feather.write_feather(source, os.path.join(tmp_dir, "frame.feather"), compression="uncompressed")
+        with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+            json.dump({
+                "dataset_hash": key,
+                "rows": len(X),
+                "n_train": len(data["X_train"]),
+                "feature_columns": data["feature_columns"],
+                "feature_types": data["feature_types"],
+                "categories": data["categories"],
+            }, f)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # another process prepared the same dataset first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.info(f"Feature matrix {key[:12]} prepared: {len(X)} x {X.shape[1]} in {time.perf_counter() - start:.2f}s")
+    return open_feature_matrix(entry_dir)
+
+
+def open_feature_matrix(entry_dir: str) -> dict:
+    """Map a prepared matrix: frames over the memory-mapped arrays, without copying them."""
+    with open(os.path.join(entry_dir, "manifest.json"), "r") as f:
+        manifest = json.load(f)
+    key = manifest["dataset_hash"]
+    if key in _opened:
+        return _opened[key]
+
+    features = np.load(os.path.join(entry_dir, "features.npy"), mmap_mode="r")
+    target = np.load(os.path.join(entry_dir, "target.npy"), mmap_mode="r")
+    X = pd.DataFrame(features, columns=manifest["feature_columns"], copy=False)
+    y = pd.Series(target, name=TARGET, copy=False)
+    n_train = manifest["n_train"]
+    _opened[key] = {
+        **manifest,
+        "X": X,
+        "y": y,
+        "X_train": X.iloc[:n_train],
+        "y_train": y.iloc[:n_train],
+        "X_test": X.iloc[n_train:],
+        "y_test": y.iloc[n_train:],
+        "entry_dir": entry_dir,
+        # predictions of the last model used on this matrix, by frame name
+        "predictions": {},
+    }
+    return _opened[key]
+
+
+def feature_matrix(path: str, matrix_dir: str = FEATURE_MATRIX_DIR) -> dict:
+    """The prepared matrix of the dataset at path, preparing it on first use."""
+    key = _hash(path)
+    if key in _opened:
+        return _opened[key]
+    entry_dir = os.path.join(matrix_dir, key)
+    if os.path.exists(os.path.join(entry_dir, "manifest.json")):
+        return open_feature_matrix(entry_dir)
+    return prepare_feature_matrix(load_training_data(path), path, matrix_dir)
+
+
+def decoded_frame(matrix: dict) -> pd.DataFrame:
+    """
+    The dataset's feature rows as a regular frame for output, with the source
+    values and dtypes (categories, integers, booleans, float64) the CSV path
+    reads, rather than decoded from the float32 matrix.
+    """
+    import pyarrow.feather as feather
+
+    return feather.read_table(os.path.join(matrix["entry_dir"], "frame.feather"), memory_map=True).to_pandas()
+
+
+def cached_predict(model, X: pd.DataFrame):
+    """
+    predict(), reusing earlier predictions of the same model on a frame of an
+    opened matrix (read-only, so they cannot go stale); other frames are
+    always predicted. Each matrix keeps the predictions of one model only, so
+    a newly trained model replaces them instead of adding to them.
+    """
+    for matrix in _opened.values():
+        part = next((name for name in ("X", "X_train", "X_test") if matrix[name] is X), None)
+        if part is None:
+            continue
+        cache = matrix["predictions"]
+        if cache.get("model") is not model:
+            cache.clear()
+            cache["model"] = model
+        if part not in cache:
+            cache[part] = predict(model, X)
+        return cache[part]
+    return predict(model, X)
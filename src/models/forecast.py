@@ -1,39 +1,63 @@
-import pandas as pd, json, os, mlflow, pickle
+import numpy as np, json, os
 from utils.logger import logger
+from utils.sampling import sampled_path
+from data_pipeline.data_cleaning.typed_ingest import read_typed_csv
+from models.training_data import add_date_features, encode_features, predict
+from models.encoders import load_encoders, transform
+from models.feature_matrix import feature_matrix, decoded_frame, cached_predict
+from config.settings import FINAL_DATA_PATH, FORECAST_DIR, ARTIFACTS_DIR
 
 def generate_forecast(model):
+    import mlflow
+    import xgboost as xgb
+    from models.sharding import ShardRouter
+
     logger.info("Generating forecast...")
 
-    df = pd.read_csv("D:/demand_forecasting_system/data/final_data/final_store_product.csv")
+    path = sampled_path(FINAL_DATA_PATH)
+
+    model_categories = None
+    if os.path.exists(os.path.join(ARTIFACTS_DIR, "categories.json")):
+        with open(os.path.join(ARTIFACTS_DIR, "categories.json"), "r") as f:
+            model_categories = json.load(f)
 
-    # Date features
-    df["order_date"] = pd.to_datetime(df["order_date"])
-    df["year"] = df["order_date"].dt.year
-    df["month"] = df["order_date"].dt.month
-    df["week"] = df["order_date"].dt.isocalendar().week.astype(int)
-    df["day"] = df["order_date"].dt.day
-    df["dayofweek"] = df["order_date"].dt.dayofweek
-    df["is_weekend"] = (df["dayofweek"] >= 5).astype(int)
+    matrix = feature_matrix(path) if isinstance(model, xgb.Booster) else None
+    if matrix is not None and matrix["categories"] == model_categories:
+        # native model on the matrix it was trained from: map it and reuse the
+        # test predictions made during evaluation
+        df = decoded_frame(matrix)
+        df["predicted_qty"] = np.concatenate([
+            cached_predict(model, matrix["X_train"]), cached_predict(model, matrix["X_test"]),
+        ])
+    else:
+        df = read_typed_csv(path, "final_store_product")
 
-    df = df.drop(columns=["order_date", "daily_qty"])
+        # Date features
+        df = add_date_features(df)
 
-    # Load encoders & columns
-    with open("artifacts/feature_columns.json", "r") as f:
-        feature_cols = json.load(f)
+        df = df.drop(columns=["order_date", "daily_qty"])
 
-    with open("artifacts/label_encoders.pkl", "rb") as f:
-        encoders = pickle.load(f)
+        if isinstance(model, ShardRouter):
+            # shard bundle: encodes with its own categories and batches rows per shard
+            df["predicted_qty"] = model.predict(df)
+        else:
+            # Load encoders & columns
+            with open(os.path.join(ARTIFACTS_DIR, "feature_columns.json"), "r") as f:
+                feature_cols = json.load(f)
 
-    X = df[feature_cols].copy()
+            X = df[feature_cols].copy()
 
-    for c, le in encoders.items():
-        X.loc[:, c] = le.transform(X[c])
+            if isinstance(model, xgb.Booster):
+                # native categorical model: same category codes as in training
+                X, _, _ = encode_features(X, model_categories)
+            else:
+                X = transform(X, load_encoders())
 
-    df["predicted_qty"] = model.predict(X)
+            df["predicted_qty"] = predict(model, X)
 
     # Save forecast
-    os.makedirs("data/forecasts", exist_ok=True)
-    out_path = "D:/demand_forecasting_system/data/forecasts/store_product_forecast.csv"
+    os.makedirs(FORECAST_DIR, exist_ok=True)
+    out_path = sampled_path(os.path.join(FORECAST_DIR, "store_product_forecast.csv"))
     df.to_csv(out_path, index=False)
 
     mlflow.log_artifact(out_path)
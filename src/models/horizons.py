@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.logger import logger, flushes_logs
+from utils.sampling import sampled_path
+from data_pipeline.data_cleaning.typed_ingest import read_typed_csv
+from models.train import FINAL_DATA_PATH, training_params
+from models.training_data import TARGET, load_training_data, add_date_features, encode_features
+from models.backtest import make_folds, save_full_matrix
+from config.settings import (
+    FORECAST_HORIZONS, HORIZON_WORKERS, HORIZON_MODEL_DIR, FORECAST_DIR, BACKTEST_HORIZON_DAYS,
+)
+
+SERIES_KEYS = ["store_id", "product_id"]
+HORIZON_FORECAST_PATH = os.path.join(FORECAST_DIR, "store_product_horizon_forecast.csv")
+
+
+def horizon_targets(df: pd.DataFrame, horizons=FORECAST_HORIZONS) -> pd.DataFrame:
+    """
+    daily_qty of each row's series h days after its order_date, one column per
+    horizon, built with one merge per horizon instead of per-series loops.
+    Days without a row inside the dataset's date range count as zero demand;
+    targets past the last date are unknown (NaN).
+    """
+    days = df[SERIES_KEYS].assign(day=df["order_date"].dt.normalize(), qty=df[TARGET])
+    daily = days.groupby(SERIES_KEYS + ["day"], as_index=False, sort=False)["qty"].sum()
+    last_day = days["day"].max()
+
+    targets = {}
+    for h in horizons:
+        ahead = days[SERIES_KEYS].assign(day=days["day"] + pd.Timedelta(days=h))
+        qty = ahead.merge(daily, on=SERIES_KEYS + ["day"], how="left")["qty"].to_numpy(dtype=np.float32)
+        known = (ahead["day"] <= last_day).to_numpy()
+        targets[f"target_h{h}"] = np.where(known, np.nan_to_num(qty, nan=0.0), np.nan).astype(np.float32)
+    return pd.DataFrame(targets, index=df.index)
+
+
+@flushes_logs
+def _train_horizon(buffer_path, horizon, rows, labels, params, num_boost_round, out_path):
+    """Worker: fit the model for one horizon on the shared matrix with its shifted target."""
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    dtrain = xgb.DMatrix(buffer_path).slice(rows)
+    dtrain.set_label(labels)
+    booster = xgb.train(params, dtrain, num_boost_round=num_boost_round)
+    booster.save_model(out_path)
+    return horizon, len(rows), time.perf_counter() - start
+
+
+def holdout_fold(dates: pd.Series, horizons=FORECAST_HORIZONS, holdout_days=BACKTEST_HORIZON_DAYS) -> dict:
+    """
+    Date-cut holdout for the horizon models: the last backtest fold
+    (make_folds) over the origins whose every horizon's target is known,
+    i.e. the last holdout_days days ending max(horizons) days before the
+    last date.
+    """
+    last_day = dates.max().normalize()
+    origins = dates.where(dates.dt.normalize() <= last_day - pd.Timedelta(days=max(horizons)))
+    folds = make_folds(origins, n_folds=1, horizon_days=holdout_days)
+    if not folds:
+        raise ValueError(f"No {holdout_days}-day holdout with known targets for horizons {list(horizons)}")
+    return folds[0]
+
+
+def train_horizon_models(path: str, horizons=FORECAST_HORIZONS, workers=HORIZON_WORKERS,
+                         model_dir=HORIZON_MODEL_DIR) -> dict:
+    """
+    Train one direct model per horizon on the rows before the holdout cutoff
+    (holdout_fold), concurrently (workers=0: one per horizon up to the CPU
+    count). A horizon trains only on rows whose target date is also before
+    the cutoff, so no label crosses it. All horizons share the cached feature
+    matrix and differ only in their target.
+    Returns the holdout RMSE per horizon.
+    """
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    data = load_training_data(path)
+    buffer_path = save_full_matrix(data)
+    raw = pd.read_csv(path, usecols=SERIES_KEYS + ["order_date", TARGET], parse_dates=["order_date"])
+    targets = horizon_targets(raw, horizons)
+    fold = holdout_fold(raw["order_date"], horizons)
+    days = raw["order_date"].dt.normalize().to_numpy()
+    logger.info(
+        f"Horizon holdout: {len(fold['test_rows'])} rows from {fold['cutoff'].date()} "
+        f"to {fold['test_end'].date()} (exclusive)"
+    )
+
+    workers = workers or min(len(horizons), os.cpu_count() or 1)
+    params, num_boost_round = training_params()
+    params = {**params, "nthread": max(1, (os.cpu_count() or 1) // workers)}
+    os.makedirs(model_dir, exist_ok=True)
+    logger.info(f"Direct horizons {list(horizons)}: {workers} workers x {params['nthread']} threads")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for h in horizons:
+            labels = targets[f"target_h{h}"].to_numpy()
+            train_rows = fold["train_rows"]
+            # the target date, h days on, must also fall before the cutoff
+            rows = train_rows[days[train_rows] + np.timedelta64(h, "D") < fold["cutoff"].to_datetime64()]
+            futures.append(pool.submit(
+                _train_horizon, buffer_path, h, rows, labels[rows], params, num_boost_round,
+                os.path.join(model_dir, f"h{h}.json"),
+            ))
+        for future in as_completed(futures):
+            h, rows, seconds = future.result()
+            logger.info(f"Horizon {h}d model: {rows} rows in {seconds:.1f}s")
+
+    with open(os.path.join(model_dir, "manifest.json"), "w") as f:
+        json.dump({
+            "horizons": list(horizons),
+            "feature_columns": data["feature_columns"],
+            "categories": data["categories"],
+            "dataset_hash": data["dataset_hash"],
+        }, f, indent=2)
+
+    report = {}
+    dtest = xgb.DMatrix(buffer_path).slice(fold["test_rows"])
+    for h in horizons:
+        labels = targets[f"target_h{h}"].to_numpy()[fold["test_rows"]]
+        booster = xgb.Booster(model_file=os.path.join(model_dir, f"h{h}.json"))
+        report[f"h{h}_rmse"] = float(np.sqrt(np.mean((booster.predict(dtest) - labels) ** 2)))
+    logger.info(
+        f"Horizon models saved to {model_dir} in {time.perf_counter() - start:.1f}s: "
+        + ", ".join(f"{k} {v:.4f}" for k, v in report.items())
+    )
+    return report
+
+
+def forecast_horizons(df: pd.DataFrame, model_dir=HORIZON_MODEL_DIR) -> pd.DataFrame:
+    """
+    Forecast every horizon for every series from its latest row: the origins
+    are encoded into one matrix that each horizon model scores in one batch.
+    """
+    import xgboost as xgb
+
+    with open(os.path.join(model_dir, "manifest.json"), "r") as f:
+        manifest = json.load(f)
+
+    origins = df.sort_values("order_date").drop_duplicates(SERIES_KEYS, keep="last").reset_index(drop=True)
+    origins = add_date_features(origins)
+    X, _, feature_types = encode_features(origins[manifest["feature_columns"]], manifest["categories"])
+    matrix = xgb.DMatrix(X, feature_types=feature_types, enable_categorical=True)
+
+    forecasts = []
+    for h in manifest["horizons"]:
+        booster = xgb.Booster(model_file=os.path.join(model_dir, f"h{h}.json"))
+        forecasts.append(pd.DataFrame({
+            "store_id": origins["store_id"],
+            "product_id": origins["product_id"],
+            "origin_date": origins["order_date"],
+            "horizon_days": h,
+            "forecast_date": origins["order_date"].dt.normalize() + pd.Timedelta(days=h),
+            "predicted_qty": booster.predict(matrix),
+        }))
+    return pd.concat(forecasts, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train direct multi-horizon models and forecast every horizon")
+    parser.add_argument("--workers", type=int, default=HORIZON_WORKERS)
+    parser.add_argument("--forecast-only", action="store_true", help="reuse the saved horizon models")
+    args = parser.parse_args()
+
+    import mlflow
+    from utils.mlflow_utils import init_mlflow
+
+    init_mlflow()
+    mlflow.set_experiment("store_brand_product_forecast")
+    with mlflow.start_run(run_name="direct_horizons"):
+        path = sampled_path(FINAL_DATA_PATH)
+        if not args.forecast_only:
+            mlflow.log_metrics(train_horizon_models(path, workers=args.workers))
+        forecast = forecast_horizons(read_typed_csv(path, "final_store_product"))
+        out_path = sampled_path(HORIZON_FORECAST_PATH)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        forecast.to_csv(out_path, index=False)
+        mlflow.log_param("prediction_horizon_days", max(FORECAST_HORIZONS))
+        mlflow.log_artifact(out_path)
+        logger.info(f"Horizon forecast saved: {out_path} ({len(forecast)} rows)")
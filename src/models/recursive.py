@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+from utils.sampling import sampled_path
+from data_pipeline.data_cleaning.typed_ingest import read_typed_csv
+from models.train import FINAL_DATA_PATH, load_booster
+from models.training_data import TARGET, add_date_features, encode_features
+from config.settings import RECURSIVE_STEPS, FORECAST_DIR, ARTIFACTS_DIR
+
+SERIES_KEYS = ["store_id", "product_id"]
+# Mirrors finalize_store_product: lags and windows over each series' previous rows
+LAGS = [1, 7, 14, 30]
+WINDOWS = [7, 14, 30]
+HISTORY = max(LAGS + WINDOWS)
+RECURSIVE_FORECAST_PATH = os.path.join(FORECAST_DIR, "store_product_recursive_forecast.csv")
+
+
+def series_state(df: pd.DataFrame) -> tuple:
+    """
+    Latest row of every (store_id, product_id) series plus its last HISTORY
+    quantities as an (n_series, HISTORY) array, newest in the last column.
+    """
+    df = df.sort_values(SERIES_KEYS + ["order_date"], kind="stable")
+    origins = df.drop_duplicates(SERIES_KEYS, keep="last").reset_index(drop=True)
+
+    tail = df.groupby(SERIES_KEYS, sort=True).tail(HISTORY)
+    series = tail.groupby(SERIES_KEYS, sort=True).ngroup().to_numpy()
+    age = tail.groupby(SERIES_KEYS, sort=True).cumcount(ascending=False).to_numpy()
+    history = np.full((len(origins), HISTORY), np.nan, dtype=np.float32)
+    history[series, HISTORY - 1 - age] = tail[TARGET].to_numpy(dtype=np.float32)
+    return origins, history
+
+
+def _calendar(dates: pd.DatetimeIndex) -> dict:
+    """Calendar features of both add_date_features and finalize_store_product."""
+    dayofweek = dates.dayofweek.to_numpy()
+    return {
+        "year": dates.year.to_numpy(),
+        "month": dates.month.to_numpy(),
+        "week": dates.isocalendar().week.to_numpy(dtype=np.int64),
+        "day": dates.day.to_numpy(),
+        "dayofweek": dayofweek,
+        "day_of_week": dayofweek,
+        "is_weekend": dayofweek >= 5,
+        "is_month_start": dates.is_month_start,
+        "is_month_end": dates.is_month_end,
+    }
+
+
+def _window_stats(history: np.ndarray, window: int) -> tuple:
+    """(mean, sum, std) over the last `window` known values, with pandas' min_periods rules."""
+    recent = history[:, -window:]
+    known = ~np.isnan(recent)
+    count = known.sum(axis=1)
+    values = np.where(known, recent, 0.0)
+    total = values.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, total / count, np.nan)
+        var = ((values ** 2).sum(axis=1) - total * mean) / (count - 1)
+        std = np.where(count > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+    return mean, np.where(count > 0, total, np.nan), std
+
+
+def recursive_forecast(model, df: pd.DataFrame, feature_columns: list, categories: dict,
+                       steps: int = RECURSIVE_STEPS) -> pd.DataFrame:
+    """
+    Forecast `steps` days ahead for every series by feeding each day's
+    predictions back as history. Lag, rolling and cumulative state is kept in
+    NumPy arrays for all series at once, so each step is one batched predict
+    on a matrix in feature_columns order. Predictions are clipped at zero.
+    """
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    origins, history = series_state(df)
+    n = len(origins)
+    # starts as each series' latest row: IDs stay fixed, and same-day aggregates
+    # unknown ahead of time (revenue, orders_count, prices) keep their last value
+    base, _, feature_types = encode_features(add_date_features(origins.copy())[feature_columns], categories)
+    base = base.to_numpy(dtype=np.float32, copy=True)
+    column = {c: i for i, c in enumerate(feature_columns)}
+
+    def put(name, values):
+        if name in column:
+            base[:, column[name]] = values
+
+    origin_days = pd.DatetimeIndex(origins["order_date"].dt.normalize())
+    cumulative_qty = origins["cumulative_qty"].to_numpy(dtype=np.float64, copy=True)
+    cumulative_revenue = origins["cumulative_revenue"].to_numpy(dtype=np.float64, copy=True)
+    daily_revenue = origins["daily_revenue"].to_numpy(dtype=np.float64)
+
+    forecasts = []
+    for step in range(1, steps + 1):
+        dates = origin_days + pd.Timedelta(days=step)
+        for name, values in _calendar(dates).items():
+            put(name, values)
+        for lag in LAGS:
+            put(f"lag_{lag}_qty", history[:, -lag])
+        for window in WINDOWS:
+            mean, total, std = _window_stats(history, window)
+            put(f"rolling_{window}_mean_qty", mean)
+            put(f"rolling_{window}_sum_qty", total)
+            if window == 30:
+                put("rolling_30_std_qty", std)
+        # today's quantity is what is being predicted: cumulative and growth features use the days before it
+        put("cumulative_qty", cumulative_qty)
+        put("cumulative_revenue", cumulative_revenue)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            growth = history[:, -1] / history[:, -2] - 1
+        put("qty_growth_rate", np.where(np.isinf(growth), 0.0, growth))
+
+        matrix = xgb.DMatrix(base, feature_names=feature_columns, feature_types=feature_types, enable_categorical=True)
+        preds = np.maximum(model.predict(matrix), 0.0)
+
+        history = np.roll(history, -1, axis=1)
+        history[:, -1] = preds
+        cumulative_qty += preds
+        cumulative_revenue += daily_revenue
+        forecasts.append(pd.DataFrame({
+            "store_id": origins["store_id"],
+            "product_id": origins["product_id"],
+            "step": step,
+            "forecast_date": dates,
+            "predicted_qty": preds,
+        }))
+
+    logger.info(f"Recursive forecast: {n} series x {steps} days in {time.perf_counter() - start:.2f}s")
+    return pd.concat(forecasts, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recursive multi-day forecast for all series with the current model")
+    parser.add_argument("--steps", type=int, default=RECURSIVE_STEPS)
+    args = parser.parse_args()
+
+    model, _ = load_booster()
+    if model is None:
+        raise SystemExit("No saved model; train one first (python model.py)")
+    with open(os.path.join(ARTIFACTS_DIR, "feature_columns.json"), "r") as f:
+        feature_columns = json.load(f)
+    with open(os.path.join(ARTIFACTS_DIR, "categories.json"), "r") as f:
+        categories = json.load(f)
+
+    df = read_typed_csv(sampled_path(FINAL_DATA_PATH), "final_store_product")
+    forecast = recursive_forecast(model, df, feature_columns, categories, args.steps)
+    out_path = sampled_path(RECURSIVE_FORECAST_PATH)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    forecast.to_csv(out_path, index=False)
+    logger.info(f"Recursive forecast saved: {out_path} ({len(forecast)} rows)")
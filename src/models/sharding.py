@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.logger import logger, flushes_logs
+from utils.sampling import sampled_path
+from models.train import FINAL_DATA_PATH, training_params
+from models.training_data import load_training_data, encode_features
+from models.backtest import make_folds, save_full_matrix
+from config.settings import (
+    SHARD_KEY, SHARD_STORE_CLUSTERS, SHARD_PRODUCTS_PATH, SHARD_MIN_ROWS, SHARD_WORKERS, SHARD_BUNDLE_DIR,
+    BACKTEST_HORIZON_DAYS,
+)
+
+GLOBAL_SHARD = "__global__"
+
+
+def shard_key_map(key: str, products_path: str = SHARD_PRODUCTS_PATH) -> dict:
+    """Lookup table a shard key needs beyond the final dataset (product_id -> category)."""
+    if key != "category":
+        return {}
+    if not os.path.exists(products_path):
+        raise FileNotFoundError(
+            f"Sharding by category needs the cleaned products table, not found at {products_path}; "
+            "run clean_data or set SHARD_PRODUCTS_PATH"
+        )
+    products = pd.read_csv(products_path, usecols=["product_id", "category"])
+    return {str(p): str(c) for p, c in zip(products["product_id"], products["category"])}
+
+
+def shard_keys(df: pd.DataFrame, key: str, key_map: dict, n_clusters: int = SHARD_STORE_CLUSTERS) -> np.ndarray:
+    """
+    Shard of every row: the product's category, a store cluster (store_id
+    bucket), or the value of any other column. Unknown products map to "",
+    which no shard is trained for.
+    """
+    if key == "category":
+        return df["product_id"].astype(str).map(key_map).fillna("").to_numpy()
+    if key == "store_cluster":
+        return ("store-" + (df["store_id"] % n_clusters).astype(str)).to_numpy()
+    return df[key].astype(str).to_numpy()
+
+
+def _encoded_rows(data: dict, rows: np.ndarray) -> tuple:
+    """(X, y) of ascending dataset positions, from load_training_data's train/test frames."""
+    n_train = len(data["X_train"])
+    head, tail = rows[rows < n_train], rows[rows >= n_train] - n_train
+    X = pd.concat([data["X_train"].iloc[head], data["X_test"].iloc[tail]])
+    y = np.concatenate([data["y_train"].to_numpy()[head], data["y_test"].to_numpy()[tail]])
+    return X, y
+
+
+@flushes_logs
+def _train_shard(buffer_path, name, rows, params, num_boost_round, out_path):
+    """Worker: fit one shard's model on its rows of the shared matrix and save it."""
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    full = xgb.DMatrix(buffer_path)
+    booster = xgb.train(params, full.slice(rows), num_boost_round=num_boost_round)
+    booster.save_model(out_path)
+    return name, len(rows), time.perf_counter() - start
+
+
+class ShardRouter:
+    """Serves a shard bundle: rows are batched per shard, cold shards go to the global model."""
+
+    def __init__(self, bundle_path: str):
+        import xgboost as xgb
+
+        with open(os.path.join(bundle_path, "manifest.json"), "r") as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest["version"]
+        self.models = {
+            name: xgb.Booster(model_file=os.path.join(bundle_path, shard["file"]))
+            for name, shard in self.manifest["shards"].items()
+        }
+
+    @classmethod
+    def latest(cls, bundle_dir: str = SHARD_BUNDLE_DIR):
+        with open(os.path.join(bundle_dir, "LATEST"), "r") as f:
+            return cls(os.path.join(bundle_dir, f.read().strip()))
+
+    def predict_encoded(self, X: pd.DataFrame, keys: np.ndarray) -> np.ndarray:
+        import xgboost as xgb
+
+        preds = np.empty(len(X), dtype=np.float32)
+        cold = np.zeros(len(X), dtype=bool)
+        groups = pd.Series(np.arange(len(X))).groupby(keys).indices
+        for value, rows in groups.items():
+            model = self.models.get(value) if value != GLOBAL_SHARD else None
+            if model is None:
+                cold[rows] = True
+                continue
+            batch = xgb.DMatrix(X.iloc[rows], feature_types=model.feature_types, enable_categorical=True)
+            preds[rows] = model.predict(batch)
+        if cold.any():
+            model = self.models[GLOBAL_SHARD]
+            batch = xgb.DMatrix(X[cold], feature_types=model.feature_types, enable_categorical=True)
+            preds[cold] = model.predict(batch)
+        return preds
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Predict raw final-dataset rows (date features added, as for training)."""
+        manifest = self.manifest
+        keys = shard_keys(df, manifest["key"], manifest["key_map"], manifest["n_clusters"])
+        X, _, _ = encode_features(df[manifest["feature_columns"]], manifest["categories"])
+        return self.predict_encoded(X, keys)
+
+
+def train_sharded(path: str, key: str = SHARD_KEY, workers: int = SHARD_WORKERS, min_rows: int = SHARD_MIN_ROWS,
+                  bundle_dir: str = SHARD_BUNDLE_DIR) -> tuple:
+    """
+    Train one model per shard of the rows before the holdout cutoff plus a
+    global model for shards with fewer than min_rows rows, concurrently
+    (workers=0: one per CPU; largest first, with the CPU threads split
+    between workers), and save them as a new bundle version under bundle_dir.
+    The holdout is the last BACKTEST_HORIZON_DAYS of order_date, cut like
+    the last backtest fold (make_folds).
+    Returns (bundle path, {sharded_rmse, global_rmse}) on the holdout.
+    """
+    start = time.perf_counter()
+    data = load_training_data(path)
+    buffer_path = save_full_matrix(data)
+
+    key_map = shard_key_map(key)
+    key_columns = ["store_id", "product_id"] + ([key] if key not in ("category", "store_cluster") else [])
+    columns = pd.read_csv(path, usecols=key_columns + ["order_date"], parse_dates=["order_date"])
+    keys = shard_keys(columns, key, key_map)
+    folds = make_folds(columns["order_date"], n_folds=1, horizon_days=BACKTEST_HORIZON_DAYS)
+    if not folds:
+        raise ValueError(f"No {BACKTEST_HORIZON_DAYS}-day holdout with data for sharded training")
+    train_rows, test_rows = folds[0]["train_rows"], folds[0]["test_rows"]
+    logger.info(f"Shard holdout: {len(test_rows)} rows from {folds[0]['cutoff'].date()}")
+
+    groups = pd.Series(train_rows).groupby(keys[train_rows]).indices
+    jobs = {GLOBAL_SHARD: train_rows}
+    jobs.update({value: train_rows[rows] for value, rows in groups.items() if value and len(rows) >= min_rows})
+    cold = {value: len(rows) for value, rows in groups.items() if value not in jobs}
+
+    workers = workers or (os.cpu_count() or 1)
+    params, num_boost_round = training_params()
+    params = {**params, "nthread": max(1, (os.cpu_count() or 1) // workers)}
+    version = f"{datetime.now():%Y%m%dT%H%M%S}"
+    tmp_path = os.path.join(bundle_dir, f".{version}.tmp")
+    os.makedirs(tmp_path, exist_ok=True)
+    logger.info(
+        f"Sharded training by {key}: {len(jobs) - 1} shards + global, {len(cold)} cold shards, "
+        f"{workers} workers x {params['nthread']} threads"
+    )
+
+    files = {name: f"shard-{i:03d}.json" for i, name in enumerate(jobs)}
+    shards = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_train_shard, buffer_path, name, rows, params, num_boost_round, os.path.join(tmp_path, files[name]))
+            for name, rows in sorted(jobs.items(), key=lambda job: len(job[1]), reverse=True)
+        ]
+        for future in as_completed(futures):
+            name, rows, seconds = future.result()
+            shards[name] = {"file": files[name], "rows": rows}
+            logger.info(f"Shard {name}: {rows} rows in {seconds:.1f}s")
+
+    manifest = {
+        "version": version,
+        "key": key,
+        "key_map": key_map,
+        "n_clusters": SHARD_STORE_CLUSTERS,
+        "min_rows": min_rows,
+        "dataset_hash": data["dataset_hash"],
+        "feature_columns": data["feature_columns"],
+        "categories": data["categories"],
+        "shards": shards,
+        "cold_shards": cold,
+    }
+    with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    bundle_path = os.path.join(bundle_dir, version)
+    shutil.rmtree(bundle_path, ignore_errors=True)
+    os.replace(tmp_path, bundle_path)
+    with open(os.path.join(bundle_dir, "LATEST"), "w") as f:
+        f.write(version)
+
+    router = ShardRouter(bundle_path)
+    X_test, y_test = _encoded_rows(data, test_rows)
+    sharded = router.predict_encoded(X_test, keys[test_rows])
+    global_only = router.predict_encoded(X_test, np.full(len(y_test), GLOBAL_SHARD))
+    report = {
+        "sharded_rmse": float(np.sqrt(np.mean((sharded - y_test) ** 2))),
+        "global_rmse": float(np.sqrt(np.mean((global_only - y_test) ** 2))),
+    }
+    logger.info(
+        f"Shard bundle {version} saved in {time.perf_counter() - start:.1f}s: "
+        f"holdout RMSE sharded {report['sharded_rmse']:.4f} vs global {report['global_rmse']:.4f}"
+    )
+    return bundle_path, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train per-shard models as one versioned bundle")
+    parser.add_argument("--key", default=SHARD_KEY, help='"category", "store_cluster" or a column of the final dataset')
+    parser.add_argument("--workers", type=int, default=SHARD_WORKERS)
+    parser.add_argument("--min-rows", type=int, default=SHARD_MIN_ROWS)
+    args = parser.parse_args()
+
+    import mlflow
+    from utils.mlflow_utils import init_mlflow
+
+    init_mlflow()
+    mlflow.set_experiment("store_brand_product_forecast")
+    with mlflow.start_run(run_name="sharded_train"):
+        bundle_path, report = train_sharded(sampled_path(FINAL_DATA_PATH), args.key, args.workers, args.min_rows)
+        mlflow.log_param("shard_key", args.key)
+        mlflow.log_param("shard_min_rows", args.min_rows)
+        mlflow.log_param("shard_bundle", os.path.basename(bundle_path))
+        mlflow.log_metrics(report)
+        mlflow.log_artifacts(bundle_path, "shard_bundle")
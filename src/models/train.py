@@ -1,24 +1,197 @@
 import pandas as pd
-from xgboost import XGBRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-import json, os, mlflow, pickle
+import json, os
 from utils.logger import logger
+from utils.sampling import sampled_path
+from data_pipeline.data_cleaning.typed_ingest import read_typed_csv
+from models.training_data import add_date_features, load_training_data
+from models.feature_matrix import prepare_feature_matrix
+from config.settings import (
+    SAMPLE_RATE, SAMPLE_SEED, TRAIN_NATIVE_CATEGORICAL, TRAIN_EXTERNAL_MEMORY, TRAIN_USE_TUNED_PARAMS,
+    TUNE_BEST_PARAMS_PATH, MODEL_PATH, FINAL_DATA_PATH, ARTIFACTS_DIR,
+)
+
+# Same model as the XGBRegressor below, in xgb.train terms
+NATIVE_PARAMS = {
+    "objective": "reg:squarederror",
+    "tree_method": "hist",
+    "eta": 0.05,
+    "max_depth": 8,
+    "subsample": 0.9,
+    "colsample_bytree": 0.9,
+    "seed": 42,
+}
+NUM_BOOST_ROUND = 300
+
+
+def training_params() -> tuple:
+    """(params, num_boost_round): the tuned ones when enabled and saved, else the defaults."""
+    if TRAIN_USE_TUNED_PARAMS and os.path.exists(TUNE_BEST_PARAMS_PATH):
+        with open(TUNE_BEST_PARAMS_PATH, "r") as f:
+            tuned = json.load(f)
+        logger.info(f"Using tuned parameters from {TUNE_BEST_PARAMS_PATH}")
+        return {**NATIVE_PARAMS, **tuned["params"]}, tuned["num_boost_round"]
+    return NATIVE_PARAMS, NUM_BOOST_ROUND
+
+
+def save_booster(model, kind: str = "full", **meta) -> None:
+    """
+    Save the Booster as the current model (MODEL_PATH), with its metadata
+    next to it. kind is "full" for a retrain from scratch, "update" for a
+    warm-started continuation; the full-retrain time carries over to updates.
+    Callers pass trained_through, the last order_date the model has seen.
+    """
+    from datetime import datetime
+
+    meta_path = os.path.splitext(MODEL_PATH)[0] + "_meta.json"
+    previous = {}
+    if kind == "update" and os.path.exists(meta_path):
+        with open(meta_path, "r") as f:
+            previous = json.load(f)
+
+    now = datetime.now().isoformat(timespec="seconds")
+    meta = {
+        **previous,
+        **meta,
+        "kind": kind,
+        "trained_at": now,
+        "num_boosted_rounds": model.num_boosted_rounds(),
+    }
+    if kind == "full":
+        meta["full_trained_at"] = now
+
+    os.makedirs(os.path.dirname(MODEL_PATH) or ".", exist_ok=True)
+    model.save_model(MODEL_PATH)
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    logger.info(f"Model saved: {MODEL_PATH} ({kind}, {meta['num_boosted_rounds']} rounds)")
+
+
+def trained_through(path: str, n_rows: int) -> str:
+    """Last order_date among the first n_rows of the dataset (the training rows), in ISO format."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        dates = pq.read_table(path, columns=["order_date"]).slice(0, n_rows).column("order_date").to_pandas()
+    else:
+        dates = pd.read_csv(path, usecols=["order_date"], nrows=n_rows)["order_date"]
+    return pd.to_datetime(dates).max().isoformat()
+
+
+def load_booster():
+    """The current model and its metadata, or (None, {}) if none was saved."""
+    import xgboost as xgb
+
+    meta_path = os.path.splitext(MODEL_PATH)[0] + "_meta.json"
+    if not os.path.exists(MODEL_PATH) or not os.path.exists(meta_path):
+        return None, {}
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    return xgb.Booster(model_file=MODEL_PATH), meta
+
 
 def train_model():
+    if TRAIN_EXTERNAL_MEMORY:
+        return train_model_external()
+    if TRAIN_NATIVE_CATEGORICAL:
+        return train_model_native()
+    return train_model_label_encoded()
+
+
+def train_model_native():
+    """
+    Train on native categorical features with hist, from the cached training
+    matrix of the final dataset. Returns (Booster, X_test, y_test).
+    """
+    import mlflow
+    import mlflow.xgboost
+    import xgboost as xgb
+
     logger.info("Loading final dataset...")
-    df = pd.read_csv("D:/demand_forecasting_system/data/final_data/final_store_product.csv")
+    path = sampled_path(FINAL_DATA_PATH)
+    data = load_training_data(path)
+    # evaluate and forecast map the same matrix and reuse predictions on it
+    matrix = prepare_feature_matrix(data, path)
+
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    with open(os.path.join(ARTIFACTS_DIR, "feature_columns.json"), "w") as f:
+        json.dump(data["feature_columns"], f)
+    with open(os.path.join(ARTIFACTS_DIR, "categories.json"), "w") as f:
+        json.dump(data["categories"], f)
+
+    params, num_boost_round = training_params()
+    logger.info("Training model...")
+    model = xgb.train(params, data["dtrain"], num_boost_round=num_boost_round)
+
+    mlflow.log_params(params)
+    mlflow.log_param("num_boost_round", num_boost_round)
+    mlflow.log_param("categorical_columns", list(data["categories"]))
+    mlflow.log_param("train_shape", data["X_train"].shape)
+    mlflow.log_param("test_shape", data["X_test"].shape)
+    mlflow.log_param("dataset_hash", data["dataset_hash"])
+    mlflow.log_param("sample_rate", SAMPLE_RATE)
+    mlflow.log_param("sample_seed", SAMPLE_SEED)
+    mlflow.xgboost.log_model(model, "xgb_model")
+    save_booster(model, trained_through=trained_through(path, len(data["X_train"])))
+
+    return model, matrix["X_test"], matrix["y_test"]
+
+
+def train_model_external():
+    """
+    Train like train_model_native, but stream the Parquet final dataset
+    through an iterator-based DMatrix paged to TRAIN_EXTERNAL_CACHE_DIR, so
+    the training rows never sit in memory at once. Returns (Booster, test set,
+    None): the test set yields (X, y) batches, which evaluate_model scores one
+    at a time.
+    """
+    import mlflow
+    import mlflow.xgboost
+    import xgboost as xgb
+    from models.external_memory import load_external_training_data, external_tree_method
+
+    parquet_path = os.path.splitext(sampled_path(FINAL_DATA_PATH))[0] + ".parquet"
+    logger.info(f"Streaming final dataset from {parquet_path}...")
+    data = load_external_training_data(parquet_path)
+
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    with open(os.path.join(ARTIFACTS_DIR, "feature_columns.json"), "w") as f:
+        json.dump(data["feature_columns"], f)
+    with open(os.path.join(ARTIFACTS_DIR, "categories.json"), "w") as f:
+        json.dump(data["categories"], f)
+
+    params, num_boost_round = training_params()
+    params = {**params, "tree_method": external_tree_method()}
+    logger.info(f"Training model (external memory, {params['tree_method']})...")
+    model = xgb.train(params, data["dtrain"], num_boost_round=num_boost_round)
+
+    mlflow.log_params(params)
+    mlflow.log_param("num_boost_round", num_boost_round)
+    mlflow.log_param("external_memory", True)
+    mlflow.log_param("categorical_columns", list(data["categories"]))
+    mlflow.log_param("train_rows", data["train_rows"])
+    mlflow.log_param("test_rows", len(data["test_set"]))
+    mlflow.log_param("sample_rate", SAMPLE_RATE)
+    mlflow.log_param("sample_seed", SAMPLE_SEED)
+    mlflow.xgboost.log_model(model, "xgb_model")
+    save_booster(model, trained_through=trained_through(parquet_path, data["train_rows"]))
+
+    return model, data["test_set"], None
+
+
+def train_model_label_encoded():
+    # heavy ML libraries load on first use, not when the module is imported
+    import mlflow
+    from xgboost import XGBRegressor
+    from sklearn.model_selection import train_test_split
+    from models.encoders import fit_encoders, transform, save_encoders
+
+    logger.info("Loading final dataset...")
+    df = read_typed_csv(sampled_path(FINAL_DATA_PATH), "final_store_product")
 
     # -------------------------------
     # Feature Engineering
     # -------------------------------
-    df["order_date"] = pd.to_datetime(df["order_date"])
-    df["year"] = df["order_date"].dt.year
-    df["month"] = df["order_date"].dt.month
-    df["week"] = df["order_date"].dt.isocalendar().week.astype(int)
-    df["day"] = df["order_date"].dt.day
-    df["dayofweek"] = df["order_date"].dt.dayofweek
-    df["is_weekend"] = (df["dayofweek"] >= 5).astype(int)
+    df = add_date_features(df)
 
     df = df.drop(columns=["order_date"])
 
@@ -28,20 +201,15 @@ def train_model():
     # -------------------------------
     # Label Encoding
     # -------------------------------
-    cat_cols = X.select_dtypes(include=['object']).columns.tolist()
-    encoders = {}
-
-    for c in cat_cols:
-        le = LabelEncoder()
-        X.loc[:, c] = le.fit_transform(X[c])
-        encoders[c] = le
+    cat_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
+    encoders = fit_encoders(X, cat_cols)
+    X = transform(X, encoders)
 
-    os.makedirs("artifacts", exist_ok=True)
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
 
-    with open("artifacts/label_encoders.pkl", "wb") as f:
-        pickle.dump(encoders, f)
+    save_encoders(encoders)
 
-    with open("artifacts/feature_columns.json", "w") as f:
+    with open(os.path.join(ARTIFACTS_DIR, "feature_columns.json"), "w") as f:
         json.dump(X.columns.tolist(), f)
 
     # -------------------------------
@@ -73,6 +241,8 @@ def train_model():
     mlflow.log_param("categorical_columns", cat_cols)
     mlflow.log_param("train_shape", X_train.shape)
     mlflow.log_param("test_shape", X_test.shape)
+    mlflow.log_param("sample_rate", SAMPLE_RATE)
+    mlflow.log_param("sample_seed", SAMPLE_SEED)
 
     # -------------------------------
     # Log model to MLflow
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+
+from utils.logger import logger
+from data_pipeline.data_cleaning.typed_ingest import read_typed_csv
+from config.settings import TRAIN_CACHE_DIR, TRAIN_MAX_BIN, TRAIN_MAX_CATEGORIES
+
+TARGET = "daily_qty"
+# ID columns XGBoost splits on as categories (up to TRAIN_MAX_CATEGORIES
+# distinct values), next to any string/categorical columns
+CATEGORICAL_FEATURES = ["store_id", "product_id"]
+TEST_SIZE = 0.2
+# Bump when the features built here change, so cached matrices are rebuilt
+FEATURE_VERSION = 1
+
+# Training matrices built in this process, by dataset hash (reused by repeated/tuning runs)
+_matrices = {}
+
+
+def add_date_features(df: pd.DataFrame) -> pd.DataFrame:
+    df["year"] = df["order_date"].dt.year
+    df["month"] = df["order_date"].dt.month
+    df["week"] = df["order_date"].dt.isocalendar().week.astype(int)
+    df["day"] = df["order_date"].dt.day
+    df["dayofweek"] = df["order_date"].dt.dayofweek
+    df["is_weekend"] = (df["dayofweek"] >= 5).astype(int)
+    return df
+
+
+def dataset_hash(path: str) -> str:
+    """Hash of the dataset file plus everything that shapes the matrices built from it."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(
+        f"v{FEATURE_VERSION}|{TEST_SIZE}|{','.join(CATEGORICAL_FEATURES)}|{TRAIN_MAX_BIN}|{TRAIN_MAX_CATEGORIES}".encode()
+    )
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def categorical_columns(X: pd.DataFrame) -> list:
+    return [
+        c for c in X.columns
+        if X[c].dtype == object or isinstance(X[c].dtype, pd.CategoricalDtype)
+        or (c in CATEGORICAL_FEATURES and X[c].nunique() <= TRAIN_MAX_CATEGORIES)
+    ]
+
+
+def encode_features(X: pd.DataFrame, categories: dict = None):
+    """
+    Return (float32 frame, categories, feature_types) for XGBoost. Categorical
+    columns become codes into `categories` (derived from X when not given, as
+    in training); missing or unseen values become NaN.
+    """
+    if categories is None:
+        cat_cols = categorical_columns(X)
+        categories = {c: sorted({str(v) for v in X[c].dropna().unique()}) for c in cat_cols}
+    else:
+        cat_cols = list(categories)
+
+    columns = {}
+    for c in X.columns:
+        if c in cat_cols:
+            codes, uniques = pd.factorize(X[c])
+            position = {value: i for i, value in enumerate(categories[c])}
+            # trailing -1 maps factorize's missing code (-1) to missing
+            lookup = np.array([position.get(str(v), -1) for v in uniques] + [-1], dtype=np.int64)
+            mapped = lookup[codes]
+            column = mapped.astype(np.float32)
+            column[mapped < 0] = np.nan
+            columns[c] = column
+        else:
+            columns[c] = X[c].to_numpy(dtype=np.float32, na_value=np.nan)
+
+    encoded = pd.DataFrame(columns, index=X.index)
+    feature_types = ["c" if c in cat_cols else "q" for c in X.columns]
+    return encoded, categories, feature_types
+
+
+def build_matrix(X: pd.DataFrame, y=None, feature_types=None, ref=None):
+    """QuantileDMatrix when this XGBoost has it, else a DMatrix; categorical columns are native."""
+    import xgboost as xgb
+
+    matrix_cls = getattr(xgb, "QuantileDMatrix", None)
+    if matrix_cls is not None:
+        return matrix_cls(X, y, feature_types=feature_types, enable_categorical=True, max_bin=TRAIN_MAX_BIN, ref=ref)
+    return xgb.DMatrix(X, y, feature_types=feature_types, enable_categorical=True)
+
+
+def predict(model, X: pd.DataFrame):
+    """Predict with a Booster on an encoded frame, or with an sklearn-style model."""
+    import xgboost as xgb
+
+    if isinstance(model, xgb.Booster):
+        return model.predict(xgb.DMatrix(X, feature_types=model.feature_types, enable_categorical=True))
+    return model.predict(X)
+
+
+def _build_features(path: str):
+    df = read_typed_csv(path, "final_store_product")
+    df = add_date_features(df).drop(columns=["order_date"])
+    y = df[TARGET].astype(np.float32)
+    X, categories, feature_types = encode_features(df.drop(columns=[TARGET]))
+    return X, y, categories, feature_types
+
+
+def load_training_data(path: str, cache_dir: str = TRAIN_CACHE_DIR) -> dict:
+    """
+    Encoded train/test split of the final dataset with the training matrix
+    built once. The encoded frame (and, with XGBoost versions lacking
+    QuantileDMatrix, the binary DMatrix) is cached under cache_dir by dataset
+    hash, so repeated runs skip CSV parsing, feature building and encoding.
+    """
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    key = dataset_hash(path)
+    entry_dir = os.path.join(cache_dir, key)
+    frame_path = os.path.join(entry_dir, "features.feather")
+    meta_path = os.path.join(entry_dir, "meta.json")
+    buffer_path = os.path.join(entry_dir, "train.buffer")
+
+    from_cache = os.path.exists(meta_path)
+    if from_cache:
+        import pyarrow.feather as feather
+
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        frame = feather.read_table(frame_path, memory_map=True).to_pandas()
+        y = frame.pop(TARGET)
+        X = frame
+    else:
+        X, y, categories, feature_types = _build_features(path)
+        meta = {
+            "categories": categories,
+            "feature_columns": X.columns.tolist(),
+            "feature_types": feature_types,
+            "n_train": int(len(X) * (1 - TEST_SIZE)),
+        }
+
+    n_train = meta["n_train"]
+    X_train, X_test = X.iloc[:n_train], X.iloc[n_train:]
+    y_train, y_test = y.iloc[:n_train], y.iloc[n_train:]
+
+    dtrain = _matrices.get(key)
+    if dtrain is None and os.path.exists(buffer_path):
+        dtrain = xgb.DMatrix(buffer_path)
+    if dtrain is None:
+        dtrain = build_matrix(X_train, y_train, meta["feature_types"])
+    _matrices[key] = dtrain
+
+    if not from_cache:
+        _write_cache(entry_dir, X, y, meta, dtrain)
+
+    logger.info(
+        f"Training data {key[:12]} ({'cached' if from_cache else 'built'}): "
+        f"{len(X_train)} train / {len(X_test)} test rows, {len(meta['feature_columns'])} features "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return {
+        "dtrain": dtrain,
+        "X_train": X_train,
+        "y_train": y_train,
+        "X_test": X_test,
+        "y_test": y_test,
+        "categories": meta["categories"],
+        "feature_columns": meta["feature_columns"],
+        "feature_types": meta["feature_types"],
+        "dataset_hash": key,
+    }
+
+
+def _write_cache(entry_dir, X, y, meta, dtrain):
+    import xgboost as xgb
+    import pyarrow.feather as feather
+
+    tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    feather.write_feather(X.assign(**{TARGET: y}), os.path.join(tmp_dir, "features.feather"), compression="uncompressed")
+    # QuantileDMatrix is rebuilt from the frame; a plain DMatrix can be reloaded as is
+    if type(dtrain) is xgb.DMatrix:
+        dtrain.save_binary(os.path.join(tmp_dir, "train.buffer"))
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # another run cached the same dataset first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from utils.logger import logger, flushes_logs
+from utils.sampling import sampled_path
+from models.train import FINAL_DATA_PATH, NATIVE_PARAMS
+from models.backtest import prepare_folds
+from config.settings import (
+    TUNE_TRIALS, TUNE_WORKERS, TUNE_THREADS_PER_TRIAL, TUNE_MAX_ROUNDS, TUNE_EARLY_STOPPING_ROUNDS,
+    TUNE_PRUNE_AFTER_FOLDS, TUNE_PRUNE_MIN_TRIALS, TUNE_SEED, TUNE_BEST_PARAMS_PATH, TUNE_VALIDATION_DAYS,
+)
+
+# (distribution, low, high) per tuned parameter; the rest come from NATIVE_PARAMS
+SEARCH_SPACE = {
+    "eta": ("log", 0.01, 0.3),
+    "max_depth": ("int", 3, 10),
+    "min_child_weight": ("log", 1.0, 50.0),
+    "subsample": ("uniform", 0.5, 1.0),
+    "colsample_bytree": ("uniform", 0.5, 1.0),
+    "lambda": ("log", 0.1, 10.0),
+}
+
+
+def sample_params(rng: np.random.Generator) -> dict:
+    params = dict(NATIVE_PARAMS)
+    for name, (kind, low, high) in SEARCH_SPACE.items():
+        if kind == "int":
+            params[name] = int(rng.integers(low, high + 1))
+        elif kind == "log":
+            params[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+
+@flushes_logs
+def _run_trial(trial_id, buffer_path, folds, params, max_rounds, early_stopping_rounds, prune_after, prune_bar):
+    """
+    Worker: fit one parameter set on every fold, early-stopping on the tail of
+    the fold's training window and scoring the fold's untouched test rows.
+    Stops after prune_after folds when their mean RMSE is worse than
+    prune_bar (the median of finished trials on the same folds).
+    """
+    import xgboost as xgb
+
+    start = time.perf_counter()
+    full = xgb.DMatrix(buffer_path)
+    params = {**params, "eval_metric": "rmse"}
+    fold_rmse, fold_mae, fold_rounds = [], [], []
+    status = "complete"
+
+    for i, fold in enumerate(folds):
+        dtrain = full.slice(fold["fit_rows"])
+        dval = full.slice(fold["val_rows"])
+        dtest = full.slice(fold["test_rows"])
+        booster = xgb.train(
+            params, dtrain, num_boost_round=max_rounds, evals=[(dval, "val")],
+            early_stopping_rounds=early_stopping_rounds, verbose_eval=False,
+        )
+        rounds = booster.best_iteration + 1
+        errors = booster.predict(dtest, iteration_range=(0, rounds)) - dtest.get_label()
+        fold_rmse.append(float(np.sqrt(np.mean(errors ** 2))))
+        fold_mae.append(float(np.mean(np.abs(errors))))
+        fold_rounds.append(rounds)
+
+        if i + 1 == prune_after and np.mean(fold_rmse) > prune_bar:
+            status = "pruned"
+            break
+
+    return {
+        "trial": trial_id,
+        "params": params,
+        "status": status,
+        "fold_rmse": fold_rmse,
+        "rmse": float(np.mean(fold_rmse)),
+        "mae": float(np.mean(fold_mae)),
+        "num_boost_round": int(np.median(fold_rounds)),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _prune_bar(results: list, prune_after: int, min_trials: int) -> float:
+    """Median early-fold RMSE of the finished trials, once there are enough of them."""
+    early = [np.mean(r["fold_rmse"][:prune_after]) for r in results if len(r["fold_rmse"]) >= prune_after]
+    return float(np.median(early)) if len(early) >= min_trials else float("inf")
+
+
+def _log_trial(result: dict) -> None:
+    import mlflow
+
+    with mlflow.start_run(run_name=f"trial-{result['trial']:03d}", nested=True):
+        mlflow.log_params({k: v for k, v in result["params"].items() if k in SEARCH_SPACE})
+        mlflow.log_param("status", result["status"])
+        mlflow.log_param("num_boost_round", result["num_boost_round"])
+        for step, rmse in enumerate(result["fold_rmse"]):
+            mlflow.log_metric("fold_rmse", rmse, step=step)
+        mlflow.log_metric("rmse", result["rmse"])
+        mlflow.log_metric("mae", result["mae"])
+        mlflow.log_metric("seconds", result["seconds"])
+
+
+def tune(path: str, n_trials=TUNE_TRIALS, workers=TUNE_WORKERS, threads_per_trial=TUNE_THREADS_PER_TRIAL,
+         max_rounds=TUNE_MAX_ROUNDS, early_stopping_rounds=TUNE_EARLY_STOPPING_ROUNDS,
+         prune_after=TUNE_PRUNE_AFTER_FOLDS, prune_min_trials=TUNE_PRUNE_MIN_TRIALS, seed=TUNE_SEED,
+         log_to_mlflow=True) -> dict:
+    """
+    Random search over SEARCH_SPACE on the rolling-origin backtest folds,
+    each holding out its last TUNE_VALIDATION_DAYS of training for early stopping.
+    Trials run concurrently in a process pool, each with threads_per_trial
+    XGBoost threads (0: the CPU count split between workers). Trials are
+    handed out one at a time so the pruning bar tracks finished trials.
+    Every finished trial is logged as a nested MLflow run of the active run.
+    Returns the best complete trial.
+    """
+    buffer_path, folds = prepare_folds(path, validation_days=TUNE_VALIDATION_DAYS)
+    workers = workers or (os.cpu_count() or 1)
+    threads = threads_per_trial or max(1, (os.cpu_count() or 1) // workers)
+    rng = np.random.default_rng(seed)
+    pending_params = [{**sample_params(rng), "nthread": threads} for _ in range(n_trials)]
+    logger.info(f"Tuning: {n_trials} trials on {len(folds)} folds, {workers} workers x {threads} threads")
+
+    start = time.perf_counter()
+    results, running = [], set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        next_trial = 0
+        while next_trial < n_trials or running:
+            while next_trial < n_trials and len(running) < workers:
+                bar = _prune_bar(results, prune_after, prune_min_trials)
+                running.add(pool.submit(
+                    _run_trial, next_trial, buffer_path, folds, pending_params[next_trial],
+                    max_rounds, early_stopping_rounds, prune_after, bar,
+                ))
+                next_trial += 1
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                logger.info(
+                    f"Trial {result['trial']} {result['status']}: RMSE {result['rmse']:.4f} "
+                    f"over {len(result['fold_rmse'])} folds, {result['num_boost_round']} rounds in {result['seconds']:.1f}s"
+                )
+                if log_to_mlflow:
+                    _log_trial(result)
+
+    complete = [r for r in results if r["status"] == "complete"]
+    best = min(complete, key=lambda r: r["rmse"])
+    logger.info(
+        f"Tuning done in {time.perf_counter() - start:.1f}s: {len(complete)} complete, "
+        f"{len(results) - len(complete)} pruned; best trial {best['trial']} RMSE {best['rmse']:.4f}"
+    )
+    return best
+
+
+def save_best_params(best: dict, out_path: str = TUNE_BEST_PARAMS_PATH) -> None:
+    params = {k: v for k, v in best["params"].items() if k not in ("nthread", "eval_metric")}
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump({"params": params, "num_boost_round": best["num_boost_round"], "rmse": best["rmse"]}, f, indent=2)
+    logger.info(f"Best parameters saved: {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search over the backtest folds")
+    parser.add_argument("--trials", type=int, default=TUNE_TRIALS)
+    parser.add_argument("--workers", type=int, default=TUNE_WORKERS)
+    parser.add_argument("--threads-per-trial", type=int, default=TUNE_THREADS_PER_TRIAL)
+    parser.add_argument("--seed", type=int, default=TUNE_SEED)
+    args = parser.parse_args()
+
+    import mlflow
+    from utils.mlflow_utils import init_mlflow
+
+    init_mlflow()
+    mlflow.set_experiment("store_brand_product_forecast")
+    with mlflow.start_run(run_name="tune"):
+        best = tune(sampled_path(FINAL_DATA_PATH), args.trials, args.workers, args.threads_per_trial, seed=args.seed)
+        mlflow.log_params({f"best_{k}": v for k, v in best["params"].items() if k in SEARCH_SPACE})
+        mlflow.log_metric("best_rmse", best["rmse"])
+        save_best_params(best)
+        mlflow.log_artifact(TUNE_BEST_PARAMS_PATH)
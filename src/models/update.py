@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from utils.logger import logger
+from utils.sampling import sampled_path
+from data_pipeline.data_cleaning.typed_ingest import read_typed_csv
+from models.train import FINAL_DATA_PATH, train_model, training_params, save_booster, load_booster
+from models.training_data import TARGET, add_date_features, encode_features
+from models.backtest import prepare_folds
+from config.settings import (
+    UPDATE_WINDOW_DAYS, UPDATE_ROUNDS, UPDATE_MAX_ROUNDS, UPDATE_CHECK_EVERY_DAYS, UPDATE_HOLDOUT_DAYS,
+    UPDATE_MAX_DEGRADATION, ARTIFACTS_DIR, TRAIN_NATIVE_CATEGORICAL, TRAIN_EXTERNAL_MEMORY,
+)
+
+
+def _rmse(booster, dmatrix) -> float:
+    return float(np.sqrt(np.mean((booster.predict(dmatrix) - dmatrix.get_label()) ** 2)))
+
+
+def rows_after(path: str, trained_through: str):
+    """
+    The final dataset's rows dated after trained_through, encoded like the
+    current model's training data, and their last order_date (ISO); (None,
+    None) when there are none.
+    """
+    import xgboost as xgb
+
+    with open(os.path.join(ARTIFACTS_DIR, "feature_columns.json"), "r") as f:
+        feature_columns = json.load(f)
+    with open(os.path.join(ARTIFACTS_DIR, "categories.json"), "r") as f:
+        categories = json.load(f)
+
+    df = read_typed_csv(path, "final_store_product")
+    df = df[df["order_date"] > pd.Timestamp(trained_through)]
+    if df.empty:
+        return None, None
+    last_date = df["order_date"].max().isoformat()
+    df = add_date_features(df)
+    X, _, feature_types = encode_features(df[feature_columns], categories)
+    dnew = xgb.DMatrix(X, df[TARGET].astype(np.float32), feature_types=feature_types, enable_categorical=True)
+    return dnew, last_date
+
+
+def check_warm_start(path: str, window_days=UPDATE_WINDOW_DAYS, rounds=UPDATE_ROUNDS,
+                     holdout_days=UPDATE_HOLDOUT_DAYS) -> dict:
+    """
+    Backtest warm-starting against a full retrain on the newest holdout_days:
+    a model fitted on the history before the last window_days, continued for
+    `rounds` on that window, versus a fresh fit on all of it.
+    """
+    import xgboost as xgb
+
+    params, num_boost_round = training_params()
+    buffer_path, (history,) = prepare_folds(path, 1, holdout_days, "expanding")
+    _, (window,) = prepare_folds(path, 1, holdout_days, "sliding", window_days)
+    full = xgb.DMatrix(buffer_path)
+    holdout = full.slice(history["test_rows"])
+    base_rows = np.setdiff1d(history["train_rows"], window["train_rows"]).astype(np.int32)
+
+    full_model = xgb.train(params, full.slice(history["train_rows"]), num_boost_round=num_boost_round)
+    base = xgb.train(params, full.slice(base_rows), num_boost_round=num_boost_round)
+    base_rmse = _rmse(base, holdout)
+    warm = xgb.train(params, full.slice(window["train_rows"]), num_boost_round=rounds, xgb_model=base)
+
+    report = {"full_rmse": _rmse(full_model, holdout), "warm_rmse": _rmse(warm, holdout), "base_rmse": base_rmse}
+    report["degradation"] = report["warm_rmse"] / report["full_rmse"] - 1
+    logger.info(
+        f"Warm-start check on {len(history['test_rows'])} holdout rows: warm RMSE {report['warm_rmse']:.4f} vs "
+        f"full retrain {report['full_rmse']:.4f} ({report['degradation']:+.1%}), no update {report['base_rmse']:.4f}"
+    )
+    return report
+
+
+def update_model(path: str, force_check: bool = False):
+    """
+    Daily update: continue the current model for UPDATE_ROUNDS on the rows
+    dated after the last order_date it was trained on (trained_through in its
+    metadata), and skip the update when there are none. Falls back to a full
+    retrain when there is no saved model or training date, the model would
+    exceed UPDATE_MAX_ROUNDS, or the warm-start check shows more than
+    UPDATE_MAX_DEGRADATION against a full retrain. The check runs every
+    UPDATE_CHECK_EVERY_DAYS with an update, and whenever force_check is set,
+    new rows or not.
+    Only native categorical (or external-memory) training saves the Booster
+    this continues; raises ValueError with the label-encoded path.
+    Logs to the active MLflow run; returns the new (or unchanged) Booster.
+    """
+    import mlflow
+    import mlflow.xgboost
+    import xgboost as xgb
+
+    if not (TRAIN_NATIVE_CATEGORICAL or TRAIN_EXTERNAL_MEMORY):
+        raise ValueError(
+            "Daily updates continue the Booster saved by native categorical training; the label-encoded "
+            "model (TRAIN_NATIVE_CATEGORICAL=false) saves none. Set TRAIN_NATIVE_CATEGORICAL=true or "
+            "retrain with models.train instead."
+        )
+
+    start = time.perf_counter()
+    booster, meta = load_booster()
+    reason = None
+    dnew = None
+    if booster is None:
+        reason = "no saved model"
+    elif "trained_through" not in meta:
+        reason = "saved model has no training date"
+    else:
+        dnew, last_date = rows_after(path, meta["trained_through"])
+        if dnew is not None and booster.num_boosted_rounds() + UPDATE_ROUNDS > UPDATE_MAX_ROUNDS:
+            reason = f"would exceed {UPDATE_MAX_ROUNDS} rounds"
+
+    last_check = meta.get("checked_at") or meta.get("full_trained_at")
+    # without new rows there is nothing to warm-start, so only a forced check runs
+    check_due = force_check or (dnew is not None and (
+        last_check is None
+        or (datetime.now() - datetime.fromisoformat(last_check)).days >= UPDATE_CHECK_EVERY_DAYS
+    ))
+    check = None
+    if reason is None and check_due:
+        check = check_warm_start(path)
+        mlflow.log_metrics({f"check_{k}": v for k, v in check.items()})
+        if check["degradation"] > UPDATE_MAX_DEGRADATION:
+            reason = f"warm start {check['degradation']:+.1%} vs full retrain"
+
+    if reason is not None:
+        logger.info(f"Full retrain instead of update: {reason}")
+        mlflow.log_param("update_mode", "full")
+        model, _, _ = train_model()
+        return model
+
+    if dnew is None:
+        logger.info(f"No update: no new days after {meta['trained_through']}")
+        mlflow.log_param("update_mode", "none")
+        return booster
+
+    params, _ = training_params()
+    model = xgb.train(params, dnew, num_boost_round=UPDATE_ROUNDS, xgb_model=booster)
+    checked = {"checked_at": datetime.now().isoformat(timespec="seconds")} if check else {}
+    save_booster(model, "update", trained_through=last_date, **checked)
+
+    mlflow.log_param("update_mode", "warm_start")
+    mlflow.log_param("update_rows", dnew.num_row())
+    mlflow.log_metric("num_boosted_rounds", model.num_boosted_rounds())
+    mlflow.xgboost.log_model(model, "xgb_model")
+    logger.info(
+        f"Updated model on {dnew.num_row()} rows after {meta['trained_through']} (through {last_date}): "
+        f"{booster.num_boosted_rounds()} -> {model.num_boosted_rounds()} rounds in {time.perf_counter() - start:.1f}s"
+    )
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm-start the current model on the newest data")
+    parser.add_argument("--check", action="store_true", help="run the warm-start vs full retrain check now")
+    args = parser.parse_args()
+
+    import mlflow
+    from utils.mlflow_utils import init_mlflow
+
+    init_mlflow()
+    mlflow.set_experiment("store_brand_product_forecast")
+    with mlflow.start_run(run_name="daily_update"):
+        update_model(sampled_path(FINAL_DATA_PATH), force_check=args.check)
@@ -1,11 +1,15 @@
 # src/tasks/extract_mssql.py
 
+import re
+import threading
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from config.db_config import get_mssql_connection
 from config.db_schema import get_all_tables
+from config.settings import PUSHDOWN_WINDOW_DAYS
 from utils.logger import logger
+from utils.sampling import series_sample_predicate
 
 
 def fetch_table_data(table_name):
@@ -24,6 +28,255 @@ def fetch_table_data(table_name):
         return None
 
 
+def iter_table_chunks(table_name, chunksize):
+    """
+    Yield a table from the DB as DataFrames of at most `chunksize` rows,
+    keeping a single connection open while streaming.
+    """
+    conn = get_mssql_connection()
+    try:
+        query = f"SELECT * FROM {table_name};"
+        for chunk in pd.read_sql(query, conn, chunksize=chunksize):
+            yield chunk
+    finally:
+        conn.close()
+
+
+# ----------------- Aggregate / Distinct Pushdown -----------------
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_AGGREGATES = {"MIN", "MAX", "COUNT", "SUM", "AVG"}
+_OPERATORS = {"=", "<>", "<", "<=", ">", ">="}
+
+# Results are memoized for the run; call clear_query_cache() to refetch
+_query_cache = {}
+_query_cache_lock = threading.Lock()
+
+
+def _quote(identifier):
+    if not _IDENTIFIER.match(identifier):
+        raise ValueError(f"Invalid SQL identifier: '{identifier}'")
+    return f"[{identifier}]"
+
+
+def _build_where(filters):
+    """
+    Build a parameterized WHERE clause from {column: value} or
+    {column: (operator, value)}. Returns (sql, params).
+    """
+    if not filters:
+        return "", []
+    clauses, params = [], []
+    for column, condition in filters.items():
+        op, value = condition if isinstance(condition, tuple) else ("=", condition)
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported filter operator: '{op}'")
+        clauses.append(f"{_quote(column)} {op} ?")
+        params.append(value)
+    return " WHERE " + " AND ".join(clauses), params
+
+
+def _freeze(filters):
+    return tuple(sorted((filters or {}).items()))
+
+
+def _run_memoized(cache_key, sql, params, fetch):
+    with _query_cache_lock:
+        if cache_key in _query_cache:
+            return _query_cache[cache_key]
+
+    conn = get_mssql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, *params)
+        result = fetch(cursor)
+    finally:
+        conn.close()
+
+    with _query_cache_lock:
+        _query_cache[cache_key] = result
+    return result
+
+
+def fetch_aggregates(table_name, aggregates, filters=None):
+    """
+    Compute aggregates in the database instead of transferring the table.
+    aggregates: {alias: (function, column)}, e.g. {"min_date": ("MIN", "order_date")}.
+    Returns {alias: value}, or None if the query fails.
+    """
+    select = []
+    for alias, (func, column) in aggregates.items():
+        func = func.upper()
+        if func not in _AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: '{func}'")
+        select.append(f"{func}({_quote(column)}) AS {_quote(alias)}")
+
+    where, params = _build_where(filters)
+    sql = f"SELECT {', '.join(select)} FROM {_quote(table_name)}{where};"
+    cache_key = ("aggregate", table_name, tuple(aggregates.items()), _freeze(filters))
+
+    try:
+        row = _run_memoized(cache_key, sql, params, lambda cursor: tuple(cursor.fetchone()))
+        result = dict(zip(aggregates.keys(), row))
+        logger.info(f"Fetched aggregates {list(aggregates)} from table '{table_name}' (DB)")
+        return result
+    except Exception as e:
+        logger.error(f"Failed to fetch aggregates from '{table_name}': {e}")
+        return None
+
+
+def fetch_distinct(table_name, column, filters=None):
+    """
+    Return the distinct non-null values of a column, computed in the database.
+    Returns None if the query fails.
+    """
+    where, params = _build_where(filters)
+    not_null = f"{_quote(column)} IS NOT NULL"
+    where = f"{where} AND {not_null}" if where else f" WHERE {not_null}"
+    sql = f"SELECT DISTINCT {_quote(column)} FROM {_quote(table_name)}{where};"
+    cache_key = ("distinct", table_name, column, _freeze(filters))
+
+    try:
+        values = _run_memoized(cache_key, sql, params, lambda cursor: [row[0] for row in cursor.fetchall()])
+        logger.info(f"Fetched {len(values)} distinct '{column}' values from table '{table_name}' (DB)")
+        return values
+    except Exception as e:
+        logger.error(f"Failed to fetch distinct '{column}' from '{table_name}': {e}")
+        return None
+
+
+def clear_query_cache():
+    with _query_cache_lock:
+        _query_cache.clear()
+
+
+# ----------------- Store-Product Daily Pushdown -----------------
+# Mirrors clean_orders / clean_order_items (dedup, fills, IQR filter on
+# order_total) and finalize_store_product's daily groupby, so the DB returns
+# one row per (store_id, product_id, order_date) instead of every item.
+_ORDER_TOTAL_QUARTILES_SQL = """
+WITH orders AS (
+    SELECT order_total,
+           ROW_NUMBER() OVER (PARTITION BY order_id ORDER BY (SELECT NULL)) AS rn
+    FROM blinkit_orders
+)
+SELECT DISTINCT
+    PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY order_total) OVER () AS q1,
+    PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY order_total) OVER () AS q3
+FROM orders
+WHERE rn = 1;
+"""
+
+_UNIT_PRICE_Q75_SQL = """
+WITH items AS (
+    SELECT ISNULL(unit_price, 0) AS unit_price,
+           ROW_NUMBER() OVER (PARTITION BY order_id, product_id ORDER BY (SELECT NULL)) AS rn
+    FROM blinkit_order_items
+    WHERE order_id IS NOT NULL AND product_id IS NOT NULL
+)
+SELECT DISTINCT PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY unit_price) OVER () AS q75
+FROM items
+WHERE rn = 1;
+"""
+
+_STORE_PRODUCT_DAILY_SQL = """
+WITH orders AS (
+    SELECT order_id, store_id, order_date, order_total,
+           ROW_NUMBER() OVER (PARTITION BY order_id ORDER BY (SELECT NULL)) AS rn
+    FROM blinkit_orders
+    WHERE order_date >= ? AND order_date < ?
+),
+items AS (
+    SELECT order_id, product_id,
+           CAST(ISNULL(quantity, 0) AS INT) AS quantity,
+           CAST(ISNULL(unit_price, 0) AS FLOAT) AS unit_price,
+           ROW_NUMBER() OVER (PARTITION BY order_id, product_id ORDER BY (SELECT NULL)) AS rn
+    FROM blinkit_order_items
+    WHERE order_id IS NOT NULL AND product_id IS NOT NULL
+)
+SELECT o.store_id,
+       i.product_id,
+       o.order_date,
+       SUM(CAST(i.quantity AS FLOAT)) AS daily_qty,
+       SUM(i.quantity * i.unit_price) AS daily_revenue,
+       COUNT(DISTINCT o.order_id) AS orders_count,
+       AVG(CASE WHEN i.unit_price >= ? THEN 1.0 ELSE 0.0 END) AS high_value_item_ratio
+FROM items i
+JOIN orders o ON o.order_id = i.order_id
+WHERE o.rn = 1
+  AND i.rn = 1
+  AND o.order_total BETWEEN ? AND ?
+  AND {series_filter}
+GROUP BY o.store_id, i.product_id, o.order_date;
+"""
+
+
+def fetch_store_product_daily(start_date=None, end_date=None, window_days=PUSHDOWN_WINDOW_DAYS):
+    """
+    Fetch the store-product daily aggregate computed in the database,
+    one date window at a time. Returns a DataFrame sorted by
+    (store_id, product_id, order_date), or None if the query fails.
+    avg_unit_price is not queried: callers derive it with
+    finalize_store_product.add_avg_unit_price, as the pandas path does.
+    Sampled runs filter series in the query (series_sample_predicate), so
+    only the sampled series are transferred.
+    """
+    try:
+        if start_date is None or end_date is None:
+            bounds = fetch_aggregates(
+                "blinkit_orders",
+                {"min_date": ("MIN", "order_date"), "max_date": ("MAX", "order_date")},
+            )
+            if bounds is None or bounds["min_date"] is None:
+                logger.error("No orders available for store-product pushdown")
+                return None
+            start_date = start_date or bounds["min_date"]
+            end_date = end_date or bounds["max_date"]
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+
+        conn = get_mssql_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(_ORDER_TOTAL_QUARTILES_SQL)
+            q1, q3 = cursor.fetchone()
+            iqr = q3 - q1
+            lower_limit, upper_limit = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+            cursor.execute(_UNIT_PRICE_Q75_SQL)
+            price_threshold = cursor.fetchone()[0]
+
+            series_filter, sample_params = series_sample_predicate("o.store_id", "i.product_id")
+            query = _STORE_PRODUCT_DAILY_SQL.format(series_filter=series_filter)
+
+            chunks = []
+            window_start = start
+            while window_start < end:
+                window_end = min(window_start + pd.Timedelta(days=window_days), end)
+                chunk = pd.read_sql(
+                    query,
+                    conn,
+                    params=[
+                        window_start.to_pydatetime(), window_end.to_pydatetime(),
+                        price_threshold, lower_limit, upper_limit, *sample_params,
+                    ],
+                )
+                chunks.append(chunk)
+                logger.info(f"Fetched {len(chunk)} store-product daily rows for {window_start.date()} -> {window_end.date()}")
+                window_start = window_end
+        finally:
+            conn.close()
+
+        daily_df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        if not daily_df.empty:
+            daily_df["order_date"] = pd.to_datetime(daily_df["order_date"])
+            daily_df = daily_df.sort_values(["store_id", "product_id", "order_date"]).reset_index(drop=True)
+        logger.info(f"Fetched {len(daily_df)} store-product daily rows (DB pushdown)")
+        return daily_df
+    except Exception as e:
+        logger.error(f"Failed to fetch store-product daily aggregate: {e}")
+        return None
+
+
 def fetch_all_tables_parallel(max_workers=5):
     """
     Fetch all tables in parallel from DB.
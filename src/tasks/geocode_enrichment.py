@@ -1,39 +1,39 @@
 # src/tasks/geocode_enrichment.py
 
 import time
-import requests
-import pyodbc
-import redis
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from utils.logger import logger
-from config.settings import DB_SERVER, DB_NAME, USER_AGENT, GEOCODE_URL, REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_KEY
-from tasks.extract_mssql import fetch_table_data
+from config.settings import DB_SERVER, DB_NAME, USER_AGENT, GEOCODE_URL, REDIS_KEY, GEOCODE_CACHE_TTL
+from tasks.extract_mssql import fetch_distinct
+from utils.cache_client import get_set_cache
+from utils.http_cache import cached_get_json, get_response_cache
 
 
 def get_connection():
+    import pyodbc  # driver loads on first connection
+
     conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={DB_SERVER};DATABASE={DB_NAME};Trusted_Connection=yes"
     return pyodbc.connect(conn_str)
 
 
-r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
-
 def get_new_areas(areas):
-    """Return areas not yet cached in Redis"""
-    return [area for area in areas if not r.sismember(REDIS_KEY, area)]
+    """Return areas not yet cached, checked in a single batched lookup"""
+    cached = get_set_cache().contains_many(REDIS_KEY, areas)
+    return [area for area, is_cached in zip(areas, cached) if not is_cached]
 
 def update_area_cache(areas):
-    """Add areas to Redis cache"""
-    for area in areas:
-        r.sadd(REDIS_KEY, area)
+    """Add areas to the cache in a single batched insert"""
+    get_set_cache().add_many(REDIS_KEY, areas)
 
 
 def fetch_distinct_areas():
-    df = fetch_table_data("blinkit_customers")
-    if df is None or "area" not in df.columns:
+    values = fetch_distinct("blinkit_customers", "area")
+    if values is None:
         logger.error("No customers data or 'area' column missing")
         return []
-    areas = df["area"].dropna().map(lambda x: x.strip().title()).unique().tolist()
+    # normalize after DISTINCT, then dedupe again since casing/whitespace variants collapse
+    areas = list(dict.fromkeys(value.strip().title() for value in values))
     return areas
 
 def create_geocode_table():
@@ -53,16 +53,16 @@ def create_geocode_table():
 
 
 def geocode_area(area):
+    from_cache = False
     try:
         headers = {"User-Agent": USER_AGENT, "Accept-Language": "en"}
-        response = requests.get(
+        data, from_cache = cached_get_json(
             GEOCODE_URL,
             params={"q": area, "format": "json", "limit": 1},
             headers=headers,
             timeout=10,
+            ttl=GEOCODE_CACHE_TTL,
         )
-        response.raise_for_status()
-        data = response.json()
         if data:
             lat, lon = float(data[0]["lat"]), float(data[0]["lon"])
             logger.info(f"Geocoded '{area}' -> lat: {lat}, lon: {lon}")
@@ -74,7 +74,8 @@ def geocode_area(area):
         logger.error(f"Error geocoding '{area}': {e}")
         return area, None, None
     finally:
-        time.sleep(1.1)  # respect API rate limit
+        if not from_cache:
+            time.sleep(1.1)  # respect API rate limit
 
 def store_geocode(area, lat, lon):
     conn = get_connection()
@@ -92,7 +93,7 @@ def store_geocode(area, lat, lon):
             """, area, lat, lon)
         conn.commit()
         logger.info(f"Stored '{area}' -> lat: {lat}, lon: {lon}")
-        # Add to Redis cache after successful store
+        # Add to area cache after successful store
         update_area_cache([area])
     except Exception as e:
         logger.error(f"Failed to store geocode for '{area}': {e}")
@@ -104,6 +105,8 @@ MAX_THREADS = 3
 
 def run_geocode_pipeline():
     logger.info("Starting geocode enrichment pipeline")
+    # the response cache is shared by the process; count this run only
+    get_response_cache().reset_stats()
     create_geocode_table()
 
     areas = fetch_distinct_areas()
@@ -111,9 +114,9 @@ def run_geocode_pipeline():
         logger.info("No areas to geocode. Exiting.")
         return
 
-    # Filter areas using Redis cache
+    # Filter areas using the area cache
     new_areas = get_new_areas(areas)
-    logger.info(f"{len(new_areas)} new areas to geocode (not in Redis cache)")
+    logger.info(f"{len(new_areas)} new areas to geocode (not in area cache)")
 
     if not new_areas:
         logger.info("All areas already geocoded. Exiting.")
@@ -129,4 +132,5 @@ def run_geocode_pipeline():
             else:
                 logger.warning(f"Skipped storing '{area}' due to missing geocode")
 
+    get_response_cache().log_stats("Geocode response cache")
     logger.info("Geocode enrichment pipeline completed")
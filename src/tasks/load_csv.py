@@ -32,6 +32,12 @@ def load_all_csv(data_folder="D:\\demand_forecasting_system\\data\\raw_data"):
     return all_data
 
 
+def iter_csv_chunks(file_path, chunksize):
+    """Yield a CSV file as DataFrames of at most `chunksize` rows."""
+    for chunk in pd.read_csv(file_path, chunksize=chunksize):
+        yield chunk
+
+
 if __name__ == "__main__":
     logger.info("Loading all CSVs from data folder...")
     data = load_all_csv()
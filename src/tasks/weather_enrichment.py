@@ -1,31 +1,32 @@
 # src/tasks/weather_fetch.py
 
 import time
-import requests
-import pyodbc
-import redis
 import pandas as pd
 from datetime import date, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from utils.logger import logger
 from config.settings import (
-    DB_SERVER, DB_NAME, USER_AGENT,
-    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_KEY
+    DB_SERVER, DB_NAME, USER_AGENT, REDIS_KEY, WEATHER_FORECAST_CACHE_TTL
 )
-from tasks.extract_mssql import fetch_table_data
+from tasks.extract_mssql import fetch_table_data, fetch_aggregates
 from tasks.geocode_enrichment import get_connection
- 
-r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, decode_responses=True)
+from utils.cache_client import get_set_cache
+from utils.http_cache import cached_get_json, get_response_cache
+
+WEATHER_CACHE_KEY = f"{REDIS_KEY}_weather"
 
 
 def fetch_date_range():
-    df = fetch_table_data("blinkit_orders")   # using orders table
-    if df is None or "order_date" not in df.columns:
+    result = fetch_aggregates(   # using orders table
+        "blinkit_orders",
+        {"min_date": ("MIN", "order_date"), "max_date": ("MAX", "order_date")},
+    )
+    if result is None or result["min_date"] is None:
         logger.error("No orders data or 'order_date' column missing")
         return None, None
-    df["order_date"] = pd.to_datetime(df["order_date"], errors="coerce")
-    min_date, max_date = df["order_date"].min().date(), df["order_date"].max().date()
+    min_date = pd.to_datetime(result["min_date"], errors="coerce").date()
+    max_date = pd.to_datetime(result["max_date"], errors="coerce").date()
     logger.info(f"Fetched date range: {min_date} -> {max_date}")
     return min_date, max_date
 
@@ -76,22 +77,37 @@ def get_weather_url(start_date, end_date):
         return None
 
 
+def get_stored_dates(area, date_strs):
+    """Return the subset of date_strs already stored, checking cache and DB in one batch each"""
+    date_strs = list(date_strs)
+    if not date_strs:
+        return set()
+    cached = get_set_cache().contains_many(
+        WEATHER_CACHE_KEY, [f"{area}:{date_str}" for date_str in date_strs]
+    )
+    cached_dates = [date_str for date_str, is_cached in zip(date_strs, cached) if is_cached]
+    if not cached_dates:
+        return set()
+
+    # Check DB too
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT date FROM blinkit_weather_data WHERE area=? AND date BETWEEN ? AND ?",
+            area, min(cached_dates), max(cached_dates)
+        )
+        db_dates = {str(row[0])[:10] for row in cursor.fetchall()}
+        conn.close()
+        return {date_str for date_str in cached_dates if date_str in db_dates}
+    except Exception:
+        # DB missing table, rely on cache
+        return set(cached_dates)
+
+
 def is_record_stored(area, date_str):
-    """Check if record exists in DB or Redis"""
-    cache_key = f"{area}:{date_str}"
-    if r.sismember(f"{REDIS_KEY}_weather", cache_key):
-        # Check DB too
-        try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM blinkit_weather_data WHERE area=? AND date=?", area, date_str)
-            exists = cursor.fetchone() is not None
-            conn.close()
-            return exists
-        except Exception:
-            # DB missing table, rely on Redis
-            return True
-    return False
+    """Check if record exists in DB or cache"""
+    return date_str in get_stored_dates(area, [date_str])
 
 def fetch_weather(area, lat, lon, start_date, end_date):
     all_records = []
@@ -108,22 +124,22 @@ def fetch_weather(area, lat, lon, start_date, end_date):
         return []
 
     headers = {"User-Agent": USER_AGENT}
+    # archive data is immutable, forecast-range data is refreshed after a short TTL
+    cache_ttl = None if "archive" in url else WEATHER_FORECAST_CACHE_TTL
 
     for s, e in split_date_range(start_date, end_date, 365):
-        missing_dates = []
-        # Pre-check Redis & DB for missing dates
-        current = s
-        while current <= e:
-            if not is_record_stored(area, current.strftime("%Y-%m-%d")):
-                missing_dates.append(current)
-            current += timedelta(days=1)
+        # Pre-check cache & DB for missing dates
+        chunk_dates = [s + timedelta(days=i) for i in range((e - s).days + 1)]
+        stored_dates = get_stored_dates(area, [d.strftime("%Y-%m-%d") for d in chunk_dates])
+        missing_dates = [d for d in chunk_dates if d.strftime("%Y-%m-%d") not in stored_dates]
 
         if not missing_dates:
             logger.info(f"All data exists for '{area}' {s}->{e}, skipped API call")
             continue
 
-        # Hit API for missing range
-        api_start, api_end = missing_dates[0], missing_dates[-1]
+        # Request the whole chunk so the cached response is reused on reruns
+        api_start, api_end = s, e
+        from_cache = False
         try:
             params = {
                 "latitude": lat,
@@ -133,9 +149,7 @@ def fetch_weather(area, lat, lon, start_date, end_date):
                 "daily": ["temperature_2m_max", "precipitation_sum"],
                 "timezone": "auto",
             }
-            response = requests.get(url, params=params, headers=headers, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data, from_cache = cached_get_json(url, params=params, headers=headers, timeout=15, ttl=cache_ttl)
             if "daily" not in data:
                 logger.warning(f"No daily weather found for {area} {api_start}->{api_end}")
                 continue
@@ -145,15 +159,18 @@ def fetch_weather(area, lat, lon, start_date, end_date):
                 data["daily"]["temperature_2m_max"],
                 data["daily"]["precipitation_sum"]
             ):
-                cache_key = f"{area}:{date_str}"
-                if not is_record_stored(area, date_str):
+                if date_str not in stored_dates:
                     all_records.append((area, date_str, temp, rain))
 
-            logger.info(f"Fetched weather for '{area}' {api_start}->{api_end} ({len(data['daily']['time'])} days)")
+            logger.info(
+                f"Fetched weather for '{area}' {api_start}->{api_end}",
+                extra={"stage": "weather_enrichment", "rows": len(data["daily"]["time"])},
+            )
         except Exception as e:
             logger.error(f"Error fetching weather for '{area}' {api_start}->{api_end}: {e}")
         finally:
-            time.sleep(1.1)
+            if not from_cache:
+                time.sleep(1.1)
 
     return all_records
 
@@ -175,9 +192,14 @@ def store_weather(records):
                     INSERT INTO blinkit_weather_data (area, date, temperature, precipitation)
                     VALUES (?, ?, ?, ?)
                 """, area, date_str, temp, rain)
-            r.sadd(f"{REDIS_KEY}_weather", f"{area}:{date_str}")
         conn.commit()
-        logger.info(f"Stored {len(records)} weather records")
+        get_set_cache().add_many(
+            WEATHER_CACHE_KEY, [f"{area}:{date_str}" for area, date_str, _, _ in records]
+        )
+        logger.info(
+            f"Stored {len(records)} weather records",
+            extra={"stage": "weather_enrichment", "table": "blinkit_weather_data", "rows": len(records)},
+        )
     except Exception as e:
         logger.error(f"Failed to store weather records: {e}")
     finally:
@@ -188,6 +210,8 @@ MAX_THREADS = 3
 
 def run_weather_pipeline():
     logger.info("Starting weather enrichment pipeline")
+    # the response cache is shared by the process; count this run only
+    get_response_cache().reset_stats()
     create_weather_table()
 
     min_date, max_date = fetch_date_range()
@@ -210,4 +234,5 @@ def run_weather_pipeline():
             if records:
                 store_weather(records)
 
+    get_response_cache().log_stats("Weather response cache")
     logger.info("Weather enrichment pipeline completed")
@@ -0,0 +1,155 @@
+# src/utils/cache_client.py
+
+import os
+import sqlite3
+import threading
+
+from utils.logger import logger
+from config.settings import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_MAX_CONNECTIONS, REDIS_SOCKET_TIMEOUT,
+    CACHE_BACKEND, CACHE_SQLITE_PATH, CACHE_BATCH_SIZE
+)
+
+_lock = threading.RLock()
+_redis_client = None
+_set_cache = None
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def get_redis_client():
+    """Return a shared Redis client backed by a connection pool, created on first use."""
+    global _redis_client
+    if _redis_client is None:
+        with _lock:
+            if _redis_client is None:
+                import redis
+                pool = redis.ConnectionPool(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    decode_responses=True,
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+                )
+                _redis_client = redis.Redis(connection_pool=pool)
+    return _redis_client
+
+
+class RedisSetCache:
+    """Set membership cache stored in Redis, one round trip per batch."""
+
+    name = "redis"
+
+    def __init__(self, client):
+        self.client = client
+
+    def contains_many(self, key, members):
+        import redis
+
+        members = list(members)
+        flags = []
+        for batch in _chunks(members, CACHE_BATCH_SIZE):
+            try:
+                flags.extend(bool(f) for f in self.client.smismember(key, batch))
+            except redis.ResponseError:
+                # SMISMEMBER needs Redis >= 6.2, pipeline SISMEMBER instead
+                pipe = self.client.pipeline(transaction=False)
+                for member in batch:
+                    pipe.sismember(key, member)
+                flags.extend(bool(f) for f in pipe.execute())
+        return flags
+
+    def add_many(self, key, members):
+        for batch in _chunks(list(members), CACHE_BATCH_SIZE):
+            self.client.sadd(key, *batch)
+
+
+class SQLiteSetCache:
+    """Set membership cache persisted in a local SQLite file."""
+
+    name = "sqlite"
+
+    # stay below SQLite's default limit on bound parameters
+    _max_params = 500
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS set_members (
+                set_key TEXT NOT NULL,
+                member TEXT NOT NULL,
+                PRIMARY KEY (set_key, member)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def contains_many(self, key, members):
+        members = list(members)
+        found = set()
+        with self._lock:
+            for batch in _chunks(members, self._max_params):
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT member FROM set_members WHERE set_key = ? AND member IN ({placeholders})",
+                    [key, *batch],
+                )
+                found.update(row[0] for row in rows)
+        return [member in found for member in members]
+
+    def add_many(self, key, members):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO set_members (set_key, member) VALUES (?, ?)",
+                ((key, member) for member in members),
+            )
+            self._conn.commit()
+
+
+class MemorySetCache:
+    """In-process set membership cache, lost when the process exits."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sets = {}
+
+    def contains_many(self, key, members):
+        with self._lock:
+            cached = self._sets.get(key, set())
+            return [member in cached for member in members]
+
+    def add_many(self, key, members):
+        with self._lock:
+            self._sets.setdefault(key, set()).update(members)
+
+
+def _create_set_cache():
+    if CACHE_BACKEND == "memory":
+        return MemorySetCache()
+    if CACHE_BACKEND == "redis":
+        try:
+            client = get_redis_client()
+            client.ping()
+            return RedisSetCache(client)
+        except Exception as e:
+            logger.warning(f"Redis unavailable ({e}), falling back to SQLite cache at '{CACHE_SQLITE_PATH}'")
+    return SQLiteSetCache(CACHE_SQLITE_PATH)
+
+
+def get_set_cache():
+    """Return the shared set cache, choosing the backend on first use."""
+    global _set_cache
+    if _set_cache is None:
+        with _lock:
+            if _set_cache is None:
+                _set_cache = _create_set_cache()
+                logger.info(f"Using '{_set_cache.name}' set cache")
+    return _set_cache
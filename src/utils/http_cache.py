@@ -0,0 +1,152 @@
+# src/utils/http_cache.py
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+from utils.logger import logger
+from config.settings import HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES
+
+_lock = threading.Lock()
+_cache = None
+
+
+def _normalize_params(params):
+    """Sort keys and stringify scalar values so equal requests map to the same key."""
+    normalized = {}
+    for key in sorted(params or {}):
+        value = params[key]
+        if isinstance(value, (list, tuple)):
+            normalized[key] = [str(v) for v in value]
+        else:
+            normalized[key] = str(value)
+    return normalized
+
+
+def make_cache_key(endpoint, params):
+    payload = json.dumps([endpoint, _normalize_params(params)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Content-addressed store for JSON API responses, backed by SQLite.
+    Entries are zlib-compressed, expire after their TTL (None = never) and are
+    evicted least-recently-used first once the store exceeds max_bytes.
+    """
+
+    def __init__(self, path, max_bytes):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] < now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, endpoint, data, ttl=None):
+        body = zlib.compress(json.dumps(data).encode("utf-8"))
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, body, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, len(body), expires_at, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # evict down to 90% of the budget so the next inserts don't evict again
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        if evicted:
+            logger.info(f"HTTP cache evicted {evicted} least recently used entries")
+
+    def reset_stats(self):
+        """Start counting hits and misses afresh, e.g. at the start of a pipeline run."""
+        self.hits = 0
+        self.misses = 0
+
+    def log_stats(self, label="HTTP cache"):
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        logger.info(f"{label}: {self.hits} hits, {self.misses} misses (hit ratio {ratio:.1%})")
+
+
+def get_response_cache():
+    """Return the shared response cache, opened on first use."""
+    global _cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = ResponseCache(HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES)
+    return _cache
+
+
+def cached_get_json(url, params=None, headers=None, timeout=10, ttl=None):
+    """
+    GET a JSON endpoint through the response cache.
+    Returns (data, from_cache); only successful, non-empty responses are
+    stored, so an empty result (e.g. a transient geocode miss) is retried.
+    """
+    import requests
+
+    cache = get_response_cache()
+    key = make_cache_key(url, params)
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+
+    response = requests.get(url, params=params, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    if data:
+        cache.put(key, url, data, ttl=ttl)
+    return data, False
@@ -0,0 +1,83 @@
+# src/utils/import_time.py
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+from config.settings import IMPORT_TIME_BUDGET_MS
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points and worker-facing modules that must stay cheap to import
+ENTRY_POINTS = [
+    "clean_data",
+    "main_features",
+    "fetch_data",
+    "model",
+    "models.train",
+    "models.forecast",
+    "tasks.geocode_enrichment",
+    "tasks.weather_enrichment",
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module: str) -> dict:
+    """
+    Import `module` in a fresh interpreter under `python -X importtime` and
+    return its cumulative time plus the self time of every module it pulled in.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=SRC_DIR,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        return {"module": module, "error": error}
+
+    self_times = {}
+    cumulative_ms = None
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        self_times[name] = int(self_us) / 1000
+        if name == module:
+            cumulative_ms = int(cumulative_us) / 1000
+    return {"module": module, "cumulative_ms": cumulative_ms, "self_ms": self_times}
+
+
+def check_import_budget(modules=ENTRY_POINTS, budget_ms=IMPORT_TIME_BUDGET_MS, top=10) -> bool:
+    """Print import times per module and its slowest imports; True if all fit the budget."""
+    within_budget = True
+    for module in modules:
+        report = measure_import(module)
+        if "error" in report:
+            print(f"{module}: import failed ({report['error']})")
+            within_budget = False
+            continue
+
+        cumulative_ms = report["cumulative_ms"] or 0.0
+        status = "ok" if cumulative_ms <= budget_ms else "OVER BUDGET"
+        print(f"{module}: {cumulative_ms:.1f} ms (budget {budget_ms} ms) {status}")
+        if cumulative_ms > budget_ms:
+            within_budget = False
+        slowest = sorted(report["self_ms"].items(), key=lambda item: item[1], reverse=True)[:top]
+        for name, ms in slowest:
+            print(f"    {ms:8.1f} ms  {name}")
+    return within_budget
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check entry-point import times against a budget")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--budget-ms", type=int, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports shown per module")
+    args = parser.parse_args()
+    sys.exit(0 if check_import_budget(args.modules, args.budget_ms, args.top) else 1)
@@ -1,7 +1,13 @@
 import logging
+import logging.handlers
+import atexit
+import functools
+import itertools
+import json
 import os
+import queue
 import sys
-from config.settings import LOG_PATH
+from config.settings import LOG_PATH, LOG_LEVEL, LOG_FORMAT, LOG_MODULE_LEVELS, LOG_SAMPLE_RATES
 
 # --- 1. Force UTF-8 output for Windows consoles ---
 try:
@@ -15,26 +21,143 @@ os.makedirs(LOG_PATH, exist_ok=True)
 # --- 3. Define log file path ---
 log_file = os.path.join(LOG_PATH, "pipeline.log")
 
-# --- 4. Create file + console handlers ---
+# Structured fields callers can attach with extra={...}
+STRUCTURED_FIELDS = ("stage", "table", "rows", "duration")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any structured fields present."""
+
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            if hasattr(record, field):
+                payload[field] = getattr(record, field)
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def _parse_mapping(spec, convert):
+    """Parse "module=value,module=value" settings."""
+    mapping = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        module, value = item.split("=", 1)
+        mapping[module.strip()] = convert(value.strip())
+    return mapping
+
+
+class ModuleFilter(logging.Filter):
+    """
+    Per-module minimum levels (keyed by the calling module's file name) and
+    deterministic sampling of records below WARNING: with rate r, every 1/r-th
+    record from that module is kept.
+    """
+
+    def __init__(self, default_level, levels, sample_rates):
+        super().__init__()
+        self.default_level = default_level
+        self.levels = levels
+        self.sample_rates = sample_rates
+        self.counters = {module: itertools.count(1) for module in sample_rates}
+
+    def filter(self, record):
+        if record.levelno < self.levels.get(record.module, self.default_level):
+            return False
+        rate = self.sample_rates.get(record.module)
+        if rate is not None and record.levelno < logging.WARNING:
+            n = next(self.counters[record.module])
+            return int(n * rate) != int((n - 1) * rate)
+        return True
+
+
+# --- 4. Create file + console handlers, written by a background listener ---
 file_handler = logging.FileHandler(log_file, encoding='utf-8')
 console_handler = logging.StreamHandler(sys.stdout)
 
-# --- 5. Define a consistent formatter ---
+# --- 5. Define formatters ---
 formatter = logging.Formatter(
     "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
 )
 
-file_handler.setFormatter(formatter)
+file_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else formatter)
 console_handler.setFormatter(formatter)
 
-# --- 6. Configure root logger ---
+# --- 6. Configure root logger: callers only enqueue records ---
+default_level = logging.getLevelName(LOG_LEVEL.upper())
+module_levels = _parse_mapping(LOG_MODULE_LEVELS, lambda v: logging.getLevelName(v.upper()))
+
 logger = logging.getLogger("data_pipeline")
-logger.setLevel(logging.INFO)
+logger.setLevel(min([default_level, *module_levels.values()]))
+
+_listener = None
+# whether _listener's thread runs: stop_logging may be called more than once
+_listening = False
+
+
+def _start_listener():
+    """Route the queue handler to a fresh queue drained by a background thread."""
+    global _listener, _listening
+    log_queue = queue.SimpleQueue()
+    queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    _listening = True
+
+
+def stop_logging():
+    """Flush queued records and stop the background writer."""
+    global _listening
+    if _listening:
+        _listening = False
+        _listener.stop()
+
+
+def flush_logging():
+    """Write every record queued so far and keep logging through a new writer."""
+    if not _listening:
+        return
+    previous = _listener
+    # new records go to a fresh queue while the previous one is drained
+    _start_listener()
+    previous.stop()
+
+
+def flushes_logs(task):
+    """
+    Decorator for process pool tasks: flush the log queue when the task ends.
+    Pool workers can exit without running atexit handlers, which would lose
+    the records still queued.
+    """
+    @functools.wraps(task)
+    def wrapper(*args, **kwargs):
+        try:
+            return task(*args, **kwargs)
+        finally:
+            flush_logging()
+    return wrapper
+
 
 # Avoid duplicate handlers if re-imported
 if not logger.handlers:
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(ModuleFilter(
+        default_level, module_levels, _parse_mapping(LOG_SAMPLE_RATES, float)
+    ))
+    logger.addHandler(queue_handler)
+    _start_listener()
+    atexit.register(stop_logging)
+    # forked workers (process pools) don't inherit the listener thread
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_start_listener)
 
 # --- 7. Utility function for module-level loggers ---
 def get_logger(name: str):
@@ -1,7 +1,8 @@
-import mlflow
 import os
 
 def init_mlflow():
+    import mlflow
+
     tracking_dir = r"D:/demand_forecasting_system/mlruns"
     os.makedirs(tracking_dir, exist_ok=True)
 
@@ -0,0 +1,226 @@
+# src/utils/parallel_validation.py
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.logger import logger, flushes_logs
+from utils.schema_validator import SchemaValidator, SchemaValidationError
+from config.settings import VALIDATION_WORKERS
+
+# One validator per worker process, reused across its row groups
+_validators = {}
+
+
+def _get_validator(schema_path):
+    if schema_path not in _validators:
+        _validators[schema_path] = SchemaValidator(schema_path)
+    return _validators[schema_path]
+
+
+def _key_hashes(df: pd.DataFrame, columns: list) -> np.ndarray:
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+@flushes_logs
+def _validate_row_group(schema_path, parquet_path, row_group, key_sets, partitions, spill_dir):
+    """
+    Worker: validate one row group without uniqueness checks, summarise it per
+    column and spill its unique-key hashes, partitioned by hash, to spill_dir.
+    """
+    import pyarrow.parquet as pq
+
+    chunk = pq.ParquetFile(parquet_path).read_row_group(row_group).to_pandas()
+    chunk, violations, _ = _get_validator(schema_path).check_frame(chunk, check_unique=False)
+
+    summary = {}
+    for col in chunk.columns:
+        series = chunk[col]
+        non_null = series.dropna()
+        summary[col] = {
+            "nulls": int(len(series) - len(non_null)),
+            "min": non_null.min() if len(non_null) else None,
+            "max": non_null.max() if len(non_null) else None,
+        }
+
+    # (row_group << 32 | row) lets a duplicate be traced back to its rows
+    locators = (np.int64(row_group) << np.int64(32)) | np.arange(len(chunk), dtype=np.int64)
+    for name, columns in key_sets.items():
+        hashes = _key_hashes(chunk, columns)
+        partition_of = hashes % np.uint64(partitions)
+        for p in range(partitions):
+            mask = partition_of == p
+            np.save(os.path.join(spill_dir, f"{name}.p{p}.rg{row_group}.hashes.npy"), hashes[mask])
+            np.save(os.path.join(spill_dir, f"{name}.p{p}.rg{row_group}.rows.npy"), locators[mask])
+
+    return row_group, len(chunk), summary, violations
+
+
+def _confirm_duplicates(parquet_path, columns, candidates):
+    """
+    Re-read the key columns of the rows whose hashes collide and return the
+    locators of rows whose key values repeat an earlier row's, so a 64-bit
+    hash collision between distinct keys is not reported as a duplicate.
+    """
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(parquet_path)
+    candidates = np.sort(candidates)
+    candidate_groups = candidates >> 32
+    keys = []
+    for row_group in np.unique(candidate_groups):
+        rows = candidates[candidate_groups == row_group] & 0xFFFFFFFF
+        keys.append(parquet.read_row_group(int(row_group), columns=columns).take(rows).to_pandas())
+    duplicated = pd.concat(keys, ignore_index=True).duplicated(keep="first").to_numpy()
+    return candidates[duplicated]
+
+
+@flushes_logs
+def _check_key_partition(parquet_path, spill_dir, name, columns, partition, row_groups, max_examples):
+    """Worker: find duplicate keys within one hash partition, confirming hash matches on the key values."""
+    hashes = np.concatenate([
+        np.load(os.path.join(spill_dir, f"{name}.p{partition}.rg{rg}.hashes.npy")) for rg in row_groups
+    ])
+    rows = np.concatenate([
+        np.load(os.path.join(spill_dir, f"{name}.p{partition}.rg{rg}.rows.npy")) for rg in row_groups
+    ])
+    order = np.argsort(hashes, kind="stable")
+    hashes, rows = hashes[order], rows[order]
+    # every row sharing its hash with another one is a candidate
+    repeated = hashes[1:] == hashes[:-1]
+    collided = np.zeros(len(hashes), dtype=bool)
+    collided[1:] |= repeated
+    collided[:-1] |= repeated
+    if not collided.any():
+        return name, 0, []
+
+    duplicates = _confirm_duplicates(parquet_path, columns, rows[collided])
+    examples = [(int(r >> 32), int(r & 0xFFFFFFFF)) for r in duplicates[:max_examples]]
+    return name, len(duplicates), examples
+
+
+def _merge_summaries(total, summary):
+    for col, stats in summary.items():
+        merged = total.setdefault(col, {"nulls": 0, "min": None, "max": None})
+        merged["nulls"] += stats["nulls"]
+        if stats["min"] is not None:
+            merged["min"] = stats["min"] if merged["min"] is None else min(merged["min"], stats["min"])
+            merged["max"] = stats["max"] if merged["max"] is None else max(merged["max"], stats["max"])
+
+
+def validate_parquet(parquet_path, schema_path, workers=VALIDATION_WORKERS, spill_dir=None):
+    """
+    Validate a Parquet dataset row group by row group in a process pool, so the
+    full frame is never loaded. Per-chunk rules (dtype, min/max, allowed values,
+    regex) run in the workers; unique columns and the primary key are checked
+    by spilling 64-bit key hashes into hash partitions and checking each
+    partition in parallel; rows with colliding hashes are confirmed on their
+    key values. Returns the merged report (rows, per-column nulls/min/max);
+    raises SchemaValidationError with all violations found.
+    """
+    import pyarrow.parquet as pq
+
+    validator = SchemaValidator(schema_path)
+    workers = workers or os.cpu_count()
+    num_row_groups = pq.ParquetFile(parquet_path).num_row_groups
+    row_groups = list(range(num_row_groups))
+
+    key_sets = {col: [col] for col, rules in validator.columns_schema.items() if rules.get("unique", False)}
+    if validator.primary_key:
+        key_sets["primary_key"] = list(validator.primary_key)
+
+    logger.info(
+        f"Validating {parquet_path}: {num_row_groups} row groups, {workers} workers, "
+        f"{len(key_sets)} key checks"
+    )
+    own_spill_dir = spill_dir is None
+    spill_dir = spill_dir or tempfile.mkdtemp(prefix="validation_keys_")
+    os.makedirs(spill_dir, exist_ok=True)
+
+    report = {"rows": 0, "columns": {}}
+    violations = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_validate_row_group, schema_path, parquet_path, rg, key_sets, workers, spill_dir)
+                for rg in row_groups
+            ]
+            for future in futures:
+                row_group, rows, summary, chunk_violations = future.result()
+                report["rows"] += rows
+                _merge_summaries(report["columns"], summary)
+                for v in chunk_violations:
+                    v["examples"] = [f"row group {row_group}: {e}" for e in v["examples"]]
+                violations.extend(chunk_violations)
+
+            key_futures = [
+                pool.submit(
+                    _check_key_partition, parquet_path, spill_dir, name, key_sets[name], p, row_groups,
+                    validator.max_examples,
+                )
+                for name in key_sets for p in range(workers)
+            ]
+            duplicates = {}
+            for future in key_futures:
+                name, count, examples = future.result()
+                found = duplicates.setdefault(name, [0, []])
+                found[0] += count
+                found[1].extend(examples)
+    finally:
+        if own_spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    for name, (count, examples) in duplicates.items():
+        if count:
+            rule = "duplicate primary key" if name == "primary_key" else "duplicate values in unique column"
+            column = ",".join(key_sets[name])
+            violations.append({
+                "column": column, "rule": rule, "count": count,
+                "examples": [f"row group {rg}, row {row}" for rg, row in examples],
+            })
+
+    violations = _bound_violations(violations, validator.max_examples)
+    if violations:
+        for v in violations:
+            logger.error(f"Schema violation - {v['column']}: {v['rule']} ({v['count']}), e.g. {v['examples']}")
+        raise SchemaValidationError(violations)
+
+    logger.info(f"Parallel schema validation passed: {report['rows']} rows in {num_row_groups} row groups")
+    return report
+
+
+def _bound_violations(violations, max_examples):
+    """Merge the same (column, rule) across row groups, keeping counts and a few examples."""
+    merged = {}
+    for v in violations:
+        key = (v["column"], v["rule"])
+        if key not in merged:
+            merged[key] = {**v, "examples": list(v["examples"])}
+            continue
+        # structural violations (missing/unexpected columns) repeat in every row group
+        if v["column"] != "*" and v["rule"] != "missing required column":
+            merged[key]["count"] += v["count"]
+            merged[key]["examples"].extend(v["examples"])
+    for v in merged.values():
+        v["examples"] = v["examples"][:max_examples]
+    return list(merged.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate a Parquet dataset against a schema in parallel")
+    parser.add_argument("parquet_path")
+    parser.add_argument("--schema", default=os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "data_pipeline", "feature_engineering", "final_schema.yaml",
+    ))
+    parser.add_argument("--workers", type=int, default=VALIDATION_WORKERS)
+    args = parser.parse_args()
+    try:
+        validate_parquet(args.parquet_path, args.schema, workers=args.workers)
+    except SchemaValidationError:
+        sys.exit(1)
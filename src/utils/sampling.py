@@ -0,0 +1,105 @@
+# src/utils/sampling.py
+
+import os
+import numpy as np
+import pandas as pd
+
+from config.settings import SAMPLE_RATE, SAMPLE_SEED
+
+SERIES_KEYS = ["store_id", "product_id"]
+
+
+def is_sampling_enabled(rate=SAMPLE_RATE):
+    return rate < 1.0
+
+
+# Series hash, computed with the same integer arithmetic in pandas and in SQL
+# (series_sample_predicate), so DB pushdown queries sample the same series.
+# Operands stay below HASH_PRIME (2**31 - 1), so no product reaches 2**63.
+HASH_PRIME = 2_147_483_647
+_STORE_MULTIPLIER = 1_103_515_245
+_PRODUCT_MULTIPLIER = 1_500_450_271
+
+
+def _series_hash(store_ids: np.ndarray, product_ids: np.ndarray, seed: int) -> np.ndarray:
+    h = (
+        np.abs(store_ids) % HASH_PRIME * _STORE_MULTIPLIER
+        + np.abs(product_ids) % HASH_PRIME * _PRODUCT_MULTIPLIER
+        + seed % HASH_PRIME
+    ) % HASH_PRIME
+    # squaring mixes the linear combination, so neighbouring IDs land far apart
+    return (h * h + _STORE_MULTIPLIER) % HASH_PRIME
+
+
+def series_in_sample(store_ids, product_ids, rate=SAMPLE_RATE, seed=SAMPLE_SEED):
+    """
+    Deterministic per-series sampling mask: a (store_id, product_id) pair is
+    either always in or always out for a given rate and seed.
+    Rows with a missing key are never in the sample.
+    """
+    store_ids = pd.to_numeric(pd.Series(store_ids), errors="coerce").reset_index(drop=True)
+    product_ids = pd.to_numeric(pd.Series(product_ids), errors="coerce").reset_index(drop=True)
+    if not is_sampling_enabled(rate):
+        return np.ones(len(store_ids), dtype=bool)
+
+    valid = (store_ids.notna() & product_ids.notna()).to_numpy()
+    hashes = _series_hash(
+        store_ids.fillna(-1).to_numpy(dtype=np.int64), product_ids.fillna(-1).to_numpy(dtype=np.int64), seed
+    )
+    # hash mapped to [0, 1)
+    unit = hashes.astype(np.float64) / HASH_PRIME
+    return valid & (unit < rate)
+
+
+def series_sample_predicate(store_col, product_col, rate=SAMPLE_RATE, seed=SAMPLE_SEED):
+    """
+    (SQL predicate, params) keeping the rows whose series series_in_sample
+    keeps, for queries that sample in the database; ("1 = 1", []) when
+    sampling is off. Columns must be integer typed.
+    """
+    if not is_sampling_enabled(rate):
+        return "1 = 1", []
+    h = (
+        f"((ABS(CAST({store_col} AS BIGINT)) % {HASH_PRIME}) * {_STORE_MULTIPLIER}"
+        f" + (ABS(CAST({product_col} AS BIGINT)) % {HASH_PRIME}) * {_PRODUCT_MULTIPLIER}"
+        f" + {seed % HASH_PRIME}) % {HASH_PRIME}"
+    )
+    predicate = (
+        f"{store_col} IS NOT NULL AND {product_col} IS NOT NULL"
+        f" AND CAST((({h}) * ({h}) + {_STORE_MULTIPLIER}) % {HASH_PRIME} AS FLOAT) / {HASH_PRIME} < ?"
+    )
+    return predicate, [float(rate)]
+
+
+def sample_series(df, rate=SAMPLE_RATE, seed=SAMPLE_SEED):
+    """Keep rows of a frame with store_id/product_id whose series is in the sample."""
+    if not is_sampling_enabled(rate) or df is None or df.empty:
+        return df
+    mask = series_in_sample(df["store_id"], df["product_id"], rate, seed)
+    return df[mask].reset_index(drop=True)
+
+
+def sample_order_items(order_items_df, orders_df, rate=SAMPLE_RATE, seed=SAMPLE_SEED):
+    """Keep order items whose (order's store_id, product_id) series is in the sample."""
+    if not is_sampling_enabled(rate) or order_items_df is None or order_items_df.empty:
+        return order_items_df
+    store_by_order = orders_df.drop_duplicates(subset="order_id").set_index("order_id")["store_id"]
+    store_ids = order_items_df["order_id"].map(store_by_order)
+    mask = series_in_sample(store_ids, order_items_df["product_id"], rate, seed)
+    return order_items_df[mask].reset_index(drop=True)
+
+
+def sample_orders(orders_df, order_items_df, rate=SAMPLE_RATE):
+    """Keep orders referenced by the (already sampled) order items."""
+    if not is_sampling_enabled(rate) or orders_df is None or orders_df.empty:
+        return orders_df
+    keep = orders_df["order_id"].isin(order_items_df["order_id"].unique())
+    return orders_df[keep].reset_index(drop=True)
+
+
+def sampled_path(path, rate=SAMPLE_RATE, seed=SAMPLE_SEED):
+    """Suffix output paths of sampled runs so they never overwrite full-run outputs."""
+    if not is_sampling_enabled(rate):
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_sample{rate:g}_seed{seed}{ext}"
@@ -1,111 +1,210 @@
 import pandas as pd
+import numpy as np
 import yaml
 import re
+import zlib
+from collections import OrderedDict
+from pandas.api.types import is_datetime64_any_dtype
 from utils.logger import logger
+from config.settings import SCHEMA_VALIDATION_MODE, SCHEMA_SAMPLE_ROWS, SCHEMA_MAX_EXAMPLES
+
+# Fingerprints of frames that already passed validation, per schema file
+_validated_cache = OrderedDict()
+_CACHE_SIZE = 32
+
+
+class SchemaValidationError(ValueError):
+    """Raised with every violation found, each summarised with a bounded list of examples."""
+
+    def __init__(self, violations: list):
+        self.violations = violations
+        lines = [
+            f"{v['column']}: {v['rule']} ({v['count']} values, e.g. {v['examples']})"
+            for v in violations
+        ]
+        super().__init__("Schema validation failed:\n  " + "\n  ".join(lines))
 
 
 class SchemaValidator:
     """
     Validates a dataframe using rules defined in a YAML schema file.
-    Supports dtype, min/max, required, unique, allowed_values, and regex validation.
+    Supports dtype, min/max, required, unique, primary_key, allowed_values, and regex validation.
+
+    The schema is compiled once into a per-column plan that validate() runs in a
+    single pass over the columns; allowed_values and regex are checked on unique
+    values only. In "fast" mode min/max/allowed_values/regex run on a fixed
+    sample of sample_rows rows. All violations are collected before raising.
     """
 
-    def __init__(self, schema_path: str):
+    def __init__(self, schema_path: str, mode: str = SCHEMA_VALIDATION_MODE,
+                 sample_rows: int = SCHEMA_SAMPLE_ROWS, max_examples: int = SCHEMA_MAX_EXAMPLES):
         logger.info(f"Loading schema from: {schema_path}")
 
         with open(schema_path, "r") as f:
             self.schema = yaml.safe_load(f)
 
+        if mode not in ("full", "fast"):
+            raise ValueError(f"Unsupported validation mode: '{mode}'")
+        self.schema_path = schema_path
+        self.mode = mode
+        self.sample_rows = sample_rows
+        self.max_examples = max_examples
         self.columns_schema = self.schema.get("columns", {})
         self.allow_extra_columns = self.schema.get("allow_extra_columns", False)
+        self.primary_key = self.schema.get("primary_key", [])
+        self.plan = self._compile()
 
+    def _compile(self):
+        plan = []
+        for col, rules in self.columns_schema.items():
+            allowed = rules.get("allowed_values")
+            pattern = rules.get("regex")
+            plan.append({
+                "column": col,
+                "required": rules.get("required", False),
+                "dtype": rules.get("dtype"),
+                "min": rules.get("min"),
+                "max": rules.get("max"),
+                "unique": rules.get("unique", False),
+                "allowed": frozenset(allowed) if allowed is not None else None,
+                "regex": re.compile(pattern) if pattern is not None else None,
+            })
+        return plan
+
+    def _fingerprint(self, df: pd.DataFrame):
+        """Schema, column names, dtypes and a CRC32 of every column's values."""
+        checksums = []
+        for col in df.columns:
+            values = df[col].to_numpy()
+            if values.dtype.kind not in "biufcmM":
+                values = pd.util.hash_pandas_object(df[col], index=False).to_numpy()
+            checksums.append(zlib.crc32(np.ascontiguousarray(values).view(np.uint8)))
+        return (
+            self.schema_path, self.mode, len(df), tuple(df.columns),
+            tuple(str(t) for t in df.dtypes), tuple(checksums),
+        )
 
     def validate(self, df: pd.DataFrame):
-        logger.info("Running schema validation...")
-
-        self._check_required_columns(df)
-        self._check_unexpected_columns(df)
-        self._validate_column_types(df)
-        self._validate_value_constraints(df)
-        self._validate_unique(df)
-        self._validate_allowed_values(df)
-        self._validate_regex(df)
-
-        logger.info("Schema validation passed successfully.")
+        """Return df with schema dtypes applied; raise SchemaValidationError on violations."""
+        fingerprint = self._fingerprint(df)
+        if fingerprint in _validated_cache:
+            _validated_cache.move_to_end(fingerprint)
+            logger.info("Schema validation skipped: identical frame already validated.")
+            return df
+
+        logger.info(f"Running schema validation ({self.mode} mode)...")
+        df, violations, coerced = self.check_frame(df)
+
+        if violations:
+            for v in violations:
+                logger.error(f"Schema violation - {v['column']}: {v['rule']} ({v['count']}), e.g. {v['examples']}")
+            raise SchemaValidationError(violations)
+
+        # the frame only changed if columns were coerced
+        _validated_cache[self._fingerprint(df) if coerced else fingerprint] = True
+        while len(_validated_cache) > _CACHE_SIZE:
+            _validated_cache.popitem(last=False)
+
+        logger.info(f"Schema validation passed successfully ({coerced} columns coerced).")
         return df
 
-
-    def _check_required_columns(self, df):
-        for col, rules in self.columns_schema.items():
-            if rules.get("required", False) and col not in df.columns:
-                raise ValueError(f"Missing required column: {col}")
-        logger.info("✓ Required column check passed")
-
-
-    def _check_unexpected_columns(self, df):
-        if self.allow_extra_columns:
-            return
-        unexpected = set(df.columns) - set(self.columns_schema.keys())
-        if unexpected:
-            raise ValueError(f"Unexpected columns found: {unexpected}")
-        logger.info("✓ Unexpected column check passed")
-
-    def _validate_column_types(self, df):
-        for col, rules in self.columns_schema.items():
-            if col not in df.columns:
-                continue
-
-            expected_type = rules.get("dtype", None)
-            if expected_type is None:
-                continue
-
-            try:
-                if expected_type == "datetime":
-                    df[col] = pd.to_datetime(df[col], errors="raise")
-                else:
-                    df[col] = df[col].astype(expected_type)
-            except Exception:
-                raise TypeError(f"Column {col} has invalid dtype. Expected: {expected_type}")
-
-        logger.info("✓ Data type validation passed")
-
-
-    def _validate_value_constraints(self, df):
-        for col, rules in self.columns_schema.items():
+    def check_frame(self, df: pd.DataFrame, check_unique: bool = True):
+        """
+        Run the compiled plan over df without raising.
+        Returns (df with dtypes coerced, violations, number of coerced columns).
+        check_unique=False skips unique/primary-key checks, for callers that
+        check them across chunks themselves.
+        """
+        violations = []
+
+        if not self.allow_extra_columns:
+            unexpected = sorted(set(df.columns) - set(self.columns_schema))
+            if unexpected:
+                violations.append(self._violation("*", "unexpected columns", unexpected, len(unexpected)))
+
+        sample = None
+        if self.mode == "fast" and len(df) > self.sample_rows:
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(len(df), size=self.sample_rows, replace=False))
+
+        casts = {}
+        for check in self.plan:
+            col = check["column"]
             if col not in df.columns:
+                if check["required"]:
+                    violations.append(self._violation(col, "missing required column", [], 0))
                 continue
-            if "min" in rules and df[col].min() < rules["min"]:
-                raise ValueError(f"Column {col} has values below minimum {rules['min']}")
-            if "max" in rules and df[col].max() > rules["max"]:
-                raise ValueError(f"Column {col} has values above maximum {rules['max']}")
-        logger.info("✓ Value constraint check passed")
 
-    def _validate_unique(self, df):
-        for col, rules in self.columns_schema.items():
-            if col not in df.columns:
-                continue
-            if rules.get("unique", False) and not df[col].is_unique:
-                raise ValueError(f"Column {col} must be unique but contains duplicates")
-        logger.info("✓ Unique constraint check passed")
-
-    def _validate_allowed_values(self, df):
-        for col, rules in self.columns_schema.items():
-            if col not in df.columns:
-                continue
-            allowed_values = rules.get("allowed_values", None)
-            if allowed_values is not None:
-                invalid = set(df[col].dropna()) - set(allowed_values)
+            series = df[col]
+            if check["dtype"] is not None:
+                series, changed, error = self._coerce(series, check["dtype"])
+                if error is not None:
+                    violations.append(error)
+                    continue
+                if changed:
+                    casts[col] = series
+
+            values = series if sample is None else series.iloc[sample]
+            violations.extend(self._check_values(col, check, series, values, check_unique))
+
+        if casts:
+            df = df.assign(**casts)
+
+        if check_unique and self.primary_key and set(self.primary_key) <= set(df.columns):
+            duplicated = df.duplicated(subset=self.primary_key)
+            if duplicated.any():
+                examples = df.loc[duplicated, self.primary_key].head(self.max_examples)
+                violations.append(self._violation(
+                    ",".join(self.primary_key), "duplicate primary key",
+                    examples.itertuples(index=False, name=None), duplicated.sum(),
+                ))
+
+        return df, violations, len(casts)
+
+    def _violation(self, col, rule, examples, count):
+        return {"column": col, "rule": rule, "count": int(count), "examples": list(examples)[:self.max_examples]}
+
+    def _coerce(self, series, expected_type):
+        """Cast only when the dtype differs; returns (series, changed, violation or None)."""
+        try:
+            if expected_type == "datetime":
+                if is_datetime64_any_dtype(series):
+                    return series, False, None
+                return pd.to_datetime(series, errors="raise"), True, None
+            if series.dtype == expected_type:
+                return series, False, None
+            return series.astype(expected_type), True, None
+        except Exception:
+            violation = self._violation(series.name, f"invalid dtype, expected {expected_type}", [str(series.dtype)], len(series))
+            return series, False, violation
+
+    def _check_values(self, col, check, series, values, check_unique=True):
+        violations = []
+
+        if check["min"] is not None:
+            below = values < check["min"]
+            if below.any():
+                violations.append(self._violation(col, f"below minimum {check['min']}", values[below].head(self.max_examples), below.sum()))
+        if check["max"] is not None:
+            above = values > check["max"]
+            if above.any():
+                violations.append(self._violation(col, f"above maximum {check['max']}", values[above].head(self.max_examples), above.sum()))
+
+        if check["unique"] and check_unique:
+            duplicated = series.duplicated()
+            if duplicated.any():
+                violations.append(self._violation(col, "duplicate values in unique column", series[duplicated].head(self.max_examples), duplicated.sum()))
+
+        if check["allowed"] is not None or check["regex"] is not None:
+            uniques = pd.Series(values.unique())
+            if check["allowed"] is not None:
+                invalid = [v for v in uniques.dropna() if v not in check["allowed"]]
                 if invalid:
-                    raise ValueError(f"Column {col} contains invalid values: {invalid}")
-        logger.info("✓ Allowed values check passed")
+                    violations.append(self._violation(col, "values outside allowed_values", invalid, values.isin(invalid).sum()))
+            if check["regex"] is not None:
+                matches = uniques.astype(str).map(lambda v: check["regex"].match(v) is not None)
+                invalid = uniques[~matches.to_numpy()].tolist()
+                if invalid:
+                    violations.append(self._violation(col, f"values not matching regex '{check['regex'].pattern}'", invalid, values.isin(invalid).sum()))
 
-    def _validate_regex(self, df):
-        for col, rules in self.columns_schema.items():
-            if col not in df.columns:
-                continue
-            pattern = rules.get("regex", None)
-            if pattern is not None:
-                invalid_rows = df[~df[col].astype(str).str.match(pattern)]
-                if not invalid_rows.empty:
-                    raise ValueError(f"Column {col} has values not matching regex '{pattern}': {invalid_rows[col].tolist()}")
-        logger.info("✓ Regex pattern check passed")
+        return violations
@@ -0,0 +1,170 @@
+# src/utils/streaming_stats.py
+
+import numpy as np
+import pandas as pd
+
+# KLL sketch accuracy: normalized rank error is roughly 1.65% at k=200 and
+# 0.85% at k=400 with 99% confidence (Karnin, Lang & Liberty 2016). A value
+# returned for quantile q has a true rank within q +/- that error.
+DEFAULT_SKETCH_K = 200
+
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch (KLL). Memory stays O(k log(n/k))
+    regardless of how many values are added.
+    """
+
+    def __init__(self, k=DEFAULT_SKETCH_K, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size < self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # keep one item back when the count is odd so weight is preserved
+            leftover = items[:1] if items.size % 2 else items[:0]
+            paired = items[leftover.size:]
+            offset = self._rng.integers(2)
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], paired[offset::2]])
+            self.levels[level] = leftover
+            # a new top level shrinks the capacity of all lower levels
+            level = 0
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(lv.size, 2.0 ** h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum_weights = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum_weights, q * cum_weights[-1], side="left")
+        return float(items[min(idx, items.size - 1)])
+
+
+class ExactQuantiles:
+    """Keeps every value of a single column; exact but O(n) memory for that column."""
+
+    def __init__(self):
+        self.parts = []
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.parts.append(values[~np.isnan(values)])
+
+    def merge(self, other):
+        self.parts.extend(other.parts)
+
+    def quantile(self, q):
+        values = np.concatenate(self.parts) if self.parts else np.empty(0)
+        # same linear interpolation as pandas Series.quantile
+        return float(np.quantile(values, q)) if values.size else np.nan
+
+
+class RunningMean:
+    """Mergeable mean that skips NaN, like pandas Series.mean."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.total += float(values.sum())
+        self.count += values.size
+
+    def merge(self, other):
+        self.total += other.total
+        self.count += other.count
+
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+
+def compute_stats(df: pd.DataFrame, spec: dict) -> dict:
+    """
+    Resolve a stats spec exactly on an in-memory frame.
+    spec: {name: ("quantile", column, q) | ("mean", column)}
+    """
+    stats = {}
+    for name, (kind, column, *args) in spec.items():
+        if kind == "quantile":
+            stats[name] = df[column].quantile(args[0])
+        elif kind == "mean":
+            stats[name] = df[column].mean()
+        else:
+            raise ValueError(f"Unsupported statistic: '{kind}'")
+    return stats
+
+
+class StatsCollector:
+    """
+    Accumulates a stats spec across chunks. mode="exact" keeps the quantile
+    columns in memory; mode="approx" uses KLL sketches with bounded memory.
+    Collectors built from the same spec can be merged.
+    """
+
+    def __init__(self, spec: dict, mode: str = "exact", k: int = DEFAULT_SKETCH_K):
+        if mode not in ("exact", "approx"):
+            raise ValueError(f"Unsupported stats mode: '{mode}'")
+        self.spec = spec
+        self.mode = mode
+        self.quantiles = {}
+        self.means = {}
+        for kind, column, *_ in spec.values():
+            if kind == "quantile" and column not in self.quantiles:
+                self.quantiles[column] = KLLSketch(k) if mode == "approx" else ExactQuantiles()
+            elif kind == "mean" and column not in self.means:
+                self.means[column] = RunningMean()
+
+    def update(self, df: pd.DataFrame):
+        for column, acc in self.quantiles.items():
+            acc.update(pd.to_numeric(df[column], errors="coerce"))
+        for column, acc in self.means.items():
+            acc.update(pd.to_numeric(df[column], errors="coerce"))
+
+    def merge(self, other):
+        for column, acc in self.quantiles.items():
+            acc.merge(other.quantiles[column])
+        for column, acc in self.means.items():
+            acc.merge(other.means[column])
+
+    def result(self) -> dict:
+        stats = {}
+        for name, (kind, column, *args) in self.spec.items():
+            if kind == "quantile":
+                stats[name] = self.quantiles[column].quantile(args[0])
+            else:
+                stats[name] = self.means[column].mean()
+        return stats
@@ -0,0 +1,139 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+os.environ.setdefault("LOG_PATH", os.path.join(tempfile.gettempdir(), "demand_forecasting_test_logs"))
+
+from data_pipeline import enable_copy_on_write  # noqa: E402
+
+# Rows per synthetic table; large enough that frame buffers dominate fixed overheads
+SYNTHETIC_ROWS = int(os.getenv("SYNTHETIC_ROWS", 500_000))
+
+
+def pytest_configure(config):
+    enable_copy_on_write()
+
+
+def _dates(rng, n, fmt, with_time=False):
+    start = np.datetime64("2023-01-01T00:00:00")
+    seconds = rng.integers(0, 2 * 365 * 86400, n)
+    values = pd.Series(start + seconds.astype("timedelta64[s]"))
+    if not with_time:
+        values = values.dt.normalize()
+    return values.dt.strftime(fmt)
+
+
+def _with_missing(rng, values, rate=0.02):
+    values = pd.Series(values)
+    return values.mask(rng.random(len(values)) < rate)
+
+
+def synthetic_raw_tables(n: int = SYNTHETIC_ROWS, seed: int = 0) -> dict:
+    """Raw source tables as the DB/CSV readers return them: untyped, with duplicates and gaps."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n + 1)
+    ids[rng.random(n) < 0.01] = 1  # duplicate keys
+
+    order_times = pd.to_datetime(_dates(rng, n, "%Y-%m-%d %H:%M:%S", with_time=True))
+    promised = order_times + pd.to_timedelta(rng.integers(10, 60, n), unit="min")
+    actual = promised + pd.to_timedelta(rng.integers(-5, 30, n), unit="min")
+    orders = pd.DataFrame({
+        "order_id": ids,
+        "customer_id": rng.integers(1, n // 10 + 2, n),
+        "order_date": order_times.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "order_total": rng.gamma(2.0, 400.0, n),
+        "payment_method": _with_missing(rng, rng.choice(["cod", "card", "upi", "wallet", "cash", "cc", "dc"], n)),
+        "store_id": rng.integers(1, 5000, n),
+        "promised_delivery_time": promised.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "actual_delivery_time": _with_missing(rng, actual.dt.strftime("%Y-%m-%d %H:%M:%S")),
+        "delivery_time_minutes": rng.integers(5, 90, n).astype(float),
+        "delivery_partner_id": rng.integers(1, 1000, n),
+        "delivery_status": _with_missing(
+            rng, rng.choice(["on time", "slightly delayed", " significantly delayed"], n)
+        ),
+    })
+
+    order_items = pd.DataFrame({
+        "order_id": rng.integers(1, n + 1, n),
+        "product_id": rng.integers(1, 5000, n),
+        "quantity": _with_missing(rng, rng.integers(1, 8, n).astype(float)),
+        "unit_price": _with_missing(rng, rng.gamma(2.0, 150.0, n)),
+    })
+
+    customers = pd.DataFrame({
+        "customer_id": ids,
+        "customer_name": pd.Series(rng.integers(0, 100_000, n)).map("Customer {}".format),
+        "email": pd.Series(ids).map("c{}@example.com".format),
+        "area": _with_missing(rng, pd.Series(rng.integers(0, 200, n)).map("Area {}".format)),
+        "pincode": rng.integers(100000, 999999, n),
+        "registration_date": _dates(rng, n, "%Y-%m-%d"),
+        "customer_segment": _with_missing(rng, rng.choice(["New", "Regular", "Premium", "Inactive"], n)),
+        "total_orders": _with_missing(rng, rng.integers(1, 100, n).astype(float)),
+        "avg_order_value": _with_missing(rng, rng.gamma(2.0, 500.0, n)),
+    })
+
+    categories = ["Baby Care", "Dairy & Breakfast", "Fruits & Vegetables", "Grocery & Staples", "Pet Care", "Pharmacy"]
+    price = rng.gamma(2.0, 100.0, n)
+    products = pd.DataFrame({
+        "product_id": ids,
+        "product_name": _with_missing(rng, pd.Series(rng.integers(0, 2000, n)).map("Product {}".format)),
+        "category": _with_missing(rng, rng.choice(categories, n)),
+        "brand": _with_missing(rng, pd.Series(rng.integers(0, 300, n)).map("Brand {}".format)),
+        "price": price,
+        "mrp": price * rng.uniform(1.0, 1.5, n),
+        "margin_percentage": _with_missing(rng, rng.uniform(5, 40, n)),
+        "shelf_life_days": rng.integers(1, 720, n),
+        "min_stock_level": rng.integers(5, 50, n),
+        "max_stock_level": rng.integers(50, 500, n),
+    })
+
+    marketing = pd.DataFrame({
+        "campaign_id": rng.integers(1, n // 5 + 2, n),
+        "campaign_name": _with_missing(rng, pd.Series(rng.integers(0, 50, n)).map("Campaign {}".format)),
+        "date": _dates(rng, n, "%d-%m-%Y"),
+        "target_audience": rng.choice(["All", "New Users", "Premium"], n),
+        "channel": _with_missing(rng, rng.choice(["App", "Email", "SMS", "Social Media"], n)),
+        "impressions": _with_missing(rng, rng.integers(100, 10000, n).astype(float)),
+        "clicks": _with_missing(rng, rng.integers(0, 1000, n).astype(float)),
+        "conversions": _with_missing(rng, rng.integers(0, 100, n).astype(float)),
+        "spend": _with_missing(rng, rng.gamma(2.0, 1000.0, n)),
+        "revenue_generated": _with_missing(rng, rng.gamma(2.0, 1500.0, n)),
+        "roas": rng.uniform(0, 5, n),
+    })
+
+    weather = pd.DataFrame({
+        "area": _with_missing(rng, pd.Series(rng.integers(0, 200, n)).map("Area {}".format)),
+        "date": _dates(rng, n, "%Y-%m-%d"),
+        "temperature": _with_missing(rng, rng.normal(27, 6, n)),
+        "precipitation": _with_missing(rng, rng.exponential(3.0, n)),
+        "humidity": rng.uniform(20, 100, n),
+    })
+
+    inventory = pd.DataFrame({
+        "product_id": rng.integers(1, 5000, n),
+        "date": _dates(rng, n, "%Y-%m-%d"),
+        "stock_received": _with_missing(rng, rng.integers(0, 200, n).astype(float)),
+        "damaged_stock": _with_missing(rng, rng.integers(0, 10, n).astype(float)),
+    })
+
+    return {
+        "orders": orders,
+        "order_items": order_items,
+        "customers": customers,
+        "products": products,
+        "marketing": marketing,
+        "weather": weather,
+        "inventory": inventory,
+    }
+
+
+@pytest.fixture(scope="session")
+def raw_tables() -> dict:
+    return synthetic_raw_tables()
@@ -0,0 +1,76 @@
+"""
+Chunked cleaning against in-memory cleaning, and the KLL sketch behind its
+"approx" statistics mode against exact quantiles.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import synthetic_raw_tables
+from utils.streaming_stats import KLLSketch
+from data_pipeline.data_cleaning.chunked_cleaning import run_chunked_cleaning
+from data_pipeline.data_cleaning.clean_orders import clean_orders
+from data_pipeline.data_cleaning.clean_orders_items import clean_order_items
+from data_pipeline.data_cleaning.clean_customer_data import clean_customers
+from data_pipeline.data_cleaning.clean_marketing import clean_marketing_data
+from data_pipeline.data_cleaning.clean_products_data import clean_products_data
+from data_pipeline.data_cleaning.clean_weather import clean_weather_data
+from data_pipeline.data_cleaning.clean_inventory import clean_inventory_data
+
+# normalized rank error documented for k=200 in utils/streaming_stats.py
+KLL_RANK_ERROR = 0.0165
+
+# source table -> (synthetic table, cleaner)
+TABLES = {
+    "blinkit_orders": ("orders", clean_orders),
+    "blinkit_order_items": ("order_items", clean_order_items),
+    "blinkit_customers": ("customers", clean_customers),
+    "blinkit_marketing_performance": ("marketing", clean_marketing_data),
+    "blinkit_products": ("products", clean_products_data),
+    "blinkit_weather_data": ("weather", clean_weather_data),
+    "blinkit_inventory": ("inventory", clean_inventory_data),
+}
+
+
+@pytest.fixture(scope="module")
+def small_raw_tables() -> dict:
+    return synthetic_raw_tables(20_000, seed=1)
+
+
+@pytest.mark.parametrize("table", TABLES)
+def test_exact_chunked_cleaning_matches_in_memory(small_raw_tables, tmp_path, table):
+    name, cleaner = TABLES[table]
+    df = small_raw_tables[name]
+    cleaner(df).to_csv(tmp_path / "in_memory.csv", index=False)
+
+    def make_chunks():
+        return (df.iloc[start:start + 3_000] for start in range(0, len(df), 3_000))
+
+    run_chunked_cleaning(table, cleaner, make_chunks, str(tmp_path / "chunked.csv"), mode="exact")
+
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "chunked.csv"), pd.read_csv(tmp_path / "in_memory.csv"))
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "lognormal", "discrete"])
+def test_kll_quantiles_within_rank_error(distribution):
+    rng = np.random.default_rng(3)
+    n = 200_000
+    values = {
+        "uniform": lambda: rng.uniform(0, 1_000, n),
+        "lognormal": lambda: rng.lognormal(3, 1.5, n),
+        "discrete": lambda: rng.integers(0, 50, n).astype(float),
+    }[distribution]()
+
+    # chunked updates into two sketches, merged, as chunked cleaning collects them
+    sketch, other = KLLSketch(k=200, seed=0), KLLSketch(k=200, seed=1)
+    for i, chunk in enumerate(np.array_split(values, 40)):
+        (sketch if i % 2 else other).update(chunk)
+    sketch.merge(other)
+
+    ordered = np.sort(values)
+    for q in np.linspace(0.01, 0.99, 99):
+        estimate = sketch.quantile(q)
+        # the estimate's rank range (ties included) must come within the bound of q
+        low = np.searchsorted(ordered, estimate, side="left") / n
+        high = np.searchsorted(ordered, estimate, side="right") / n
+        assert low - KLL_RANK_ERROR <= q <= high + KLL_RANK_ERROR, f"q={q:.2f}: rank {low:.4f}-{high:.4f}"
@@ -0,0 +1,87 @@
+"""
+Memory budget of the cleaning and feature functions on the synthetic tables.
+
+The budget is checked against the peak memory a call allocates
+(tracemalloc), returned frame included. Cleaners must peak under
+MEMORY_BUDGET times their input frame's memory, so they may not hold a copy
+of their input alongside their result.
+
+Feature generators add columns, so their output alone can be larger than
+their input (generate_order_items_features: about 3x, with seven float64
+columns derived from four narrow ones). Their peak may exceed the cleaners'
+budget by the size of the frame they return, and no more.
+"""
+import gc
+import tracemalloc
+
+import pytest
+
+from data_pipeline.data_cleaning.clean_orders import clean_orders
+from data_pipeline.data_cleaning.clean_orders_items import clean_order_items
+from data_pipeline.data_cleaning.clean_customer_data import clean_customers
+from data_pipeline.data_cleaning.clean_marketing import clean_marketing_data
+from data_pipeline.data_cleaning.clean_products_data import clean_products_data
+from data_pipeline.data_cleaning.clean_weather import clean_weather_data
+from data_pipeline.data_cleaning.clean_inventory import clean_inventory_data
+from data_pipeline.feature_engineering.customer_features import generate_customer_features
+from data_pipeline.feature_engineering.orders_features import generate_orders_features
+from data_pipeline.feature_engineering.orders_items_features import generate_order_items_features
+from data_pipeline.feature_engineering.products_features import generate_products_features
+from data_pipeline.feature_engineering.inventory_features import generate_inventory_features
+from data_pipeline.feature_engineering.marketing_features import generate_marketing_features
+from data_pipeline.feature_engineering.weather_features import generate_weather_features
+
+MEMORY_BUDGET = 1.5
+
+CLEANERS = {
+    "orders": clean_orders,
+    "order_items": clean_order_items,
+    "customers": clean_customers,
+    "marketing": clean_marketing_data,
+    "products": clean_products_data,
+    "weather": clean_weather_data,
+    "inventory": clean_inventory_data,
+}
+
+GENERATORS = {
+    "customers": generate_customer_features,
+    "orders": generate_orders_features,
+    "order_items": generate_order_items_features,
+    "products": generate_products_features,
+    "inventory": generate_inventory_features,
+    "marketing": generate_marketing_features,
+    "weather": generate_weather_features,
+}
+
+
+def peak_memory(func, df) -> tuple:
+    """Peak memory allocated by func(df) and the memory of its result, as multiples of df's memory."""
+    input_bytes = df.memory_usage(deep=True).sum()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(df)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(result.columns) > 0
+    return peak / input_bytes, result.memory_usage(deep=True).sum() / input_bytes
+
+
+@pytest.fixture(scope="session")
+def clean_tables(raw_tables) -> dict:
+    return {table: cleaner(raw_tables[table]) for table, cleaner in CLEANERS.items()}
+
+
+@pytest.mark.parametrize("table", CLEANERS)
+def test_cleaner_memory_budget(raw_tables, table):
+    peak, _ = peak_memory(CLEANERS[table], raw_tables[table])
+    assert peak < MEMORY_BUDGET, f"{CLEANERS[table].__name__} peaks at {peak:.2f}x its input"
+
+
+@pytest.mark.parametrize("table", GENERATORS)
+def test_feature_generator_memory_budget(clean_tables, table):
+    peak, output = peak_memory(GENERATORS[table], clean_tables[table])
+    assert peak < MEMORY_BUDGET + output, (
+        f"{GENERATORS[table].__name__} peaks at {peak:.2f}x its input, returning {output:.2f}x"
+    )
@@ -0,0 +1,69 @@
+"""
+The DB pushdown's store-product daily aggregate against the pandas path.
+
+The pushdown query returns the daily columns without avg_unit_price, which
+main_features derives after the fetch; these tests build a frame of that
+shape from the same item-level rows and compare it like verify_pushdown does.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_pipeline.feature_engineering.finalize_store_product import (
+    DAILY_KEYS,
+    add_avg_unit_price,
+    aggregate_store_product_daily,
+    compare_daily_aggregates,
+)
+
+# columns of _STORE_PRODUCT_DAILY_SQL in tasks/extract_mssql.py
+PUSHDOWN_COLUMNS = DAILY_KEYS + ["daily_qty", "daily_revenue", "orders_count", "high_value_item_ratio"]
+
+
+@pytest.fixture
+def merged_items() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    n = 5_000
+    quantity = rng.integers(0, 4, n)
+    unit_price = rng.uniform(5, 500, n).round(2)
+    return pd.DataFrame({
+        "order_id": rng.integers(0, 1_500, n),
+        "store_id": rng.integers(0, 5, n),
+        "product_id": rng.integers(0, 20, n),
+        "order_date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 30, n), unit="D"),
+        "quantity": quantity,
+        "total_price": quantity * unit_price,
+        "high_value_item": (unit_price >= 300).astype(int),
+    })
+
+
+def pushdown_frame(items: pd.DataFrame) -> pd.DataFrame:
+    """What the pushdown query returns for these rows: its columns, float quantities, unordered rows."""
+    daily = (
+        items.groupby(DAILY_KEYS)
+        .agg(
+            daily_qty=("quantity", "sum"),
+            daily_revenue=("total_price", "sum"),
+            orders_count=("order_id", "nunique"),
+            high_value_item_ratio=("high_value_item", "mean"),
+        )
+        .reset_index()
+        .astype({"daily_qty": float})
+    )
+    return daily[PUSHDOWN_COLUMNS].sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def test_pushdown_matches_pandas_path(merged_items):
+    expected = aggregate_store_product_daily(merged_items)
+    actual = add_avg_unit_price(pushdown_frame(merged_items))
+
+    assert (actual["daily_qty"] == 0).any()
+    assert compare_daily_aggregates(expected, actual)
+
+
+def test_pushdown_mismatch_is_reported(merged_items):
+    expected = aggregate_store_product_daily(merged_items)
+    actual = pushdown_frame(merged_items)
+    actual.loc[0, "daily_revenue"] += 1.0
+
+    assert not compare_daily_aggregates(expected, add_avg_unit_price(actual))
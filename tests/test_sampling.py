@@ -0,0 +1,26 @@
+"""Series sampling in pandas and in the DB pushdown query select the same series."""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sampling import series_in_sample, series_sample_predicate
+
+
+@pytest.mark.parametrize("rate,seed", [(0.1, 0), (0.25, 42), (0.5, 7)])
+def test_sql_predicate_matches_series_in_sample(rate, seed):
+    store_ids = np.repeat(np.arange(200), 300)
+    product_ids = np.tile(np.arange(300) * 997 + 100_000, 200)
+    mask = series_in_sample(store_ids, product_ids, rate, seed)
+
+    # sqlite evaluates the predicate's BIGINT and FLOAT arithmetic like SQL Server
+    with sqlite3.connect(":memory:") as conn:
+        pd.DataFrame({"row": np.arange(len(store_ids)), "store_id": store_ids, "product_id": product_ids}).to_sql(
+            "items", conn, index=False
+        )
+        predicate, params = series_sample_predicate("store_id", "product_id", rate, seed)
+        rows = pd.read_sql(f"SELECT row FROM items WHERE {predicate} ORDER BY row", conn, params=params)["row"]
+
+    np.testing.assert_array_equal(rows.to_numpy(), np.flatnonzero(mask))
+    assert abs(mask.mean() - rate) < 0.01
@@ -0,0 +1,36 @@
+"""
+Cleaning and feature functions without pandas Copy-on-Write: they must not
+warn about chained assignment and must leave their input frames untouched.
+"""
+import warnings
+
+import pandas as pd
+import pytest
+
+from conftest import synthetic_raw_tables
+from test_memory_budget import CLEANERS, GENERATORS
+
+
+@pytest.fixture(scope="module")
+def small_raw_tables() -> dict:
+    return synthetic_raw_tables(20_000, seed=2)
+
+
+def call_without_copy_on_write(func, df):
+    before = df.copy()
+    with pd.option_context("mode.copy_on_write", False), warnings.catch_warnings():
+        warnings.simplefilter("error", pd.errors.SettingWithCopyWarning)
+        result = func(df)
+    pd.testing.assert_frame_equal(df, before)
+    return result
+
+
+@pytest.mark.parametrize("table", CLEANERS)
+def test_cleaner_without_copy_on_write(small_raw_tables, table):
+    call_without_copy_on_write(CLEANERS[table], small_raw_tables[table])
+
+
+@pytest.mark.parametrize("table", GENERATORS)
+def test_feature_generator_without_copy_on_write(small_raw_tables, table):
+    clean = CLEANERS[table](small_raw_tables[table])
+    call_without_copy_on_write(GENERATORS[table], clean)